@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd
-from search_engine import get_search_engine
+from search_engine import get_search_engine, federated_venues, merge_results, ALL_VENUES, SUPPORTED_YEARS
+from result_cache import get_result_cache
+from prefetch_scheduler import get_prefetch_scheduler
+from search_service import get_remote_search_engine, RemotePrefetcher, SERVICE_URL
+import metrics
+from contextlib import contextmanager
 import time
 import base64
 import os
@@ -240,6 +245,65 @@ if 'final_keywords' not in st.session_state:
     st.session_state.final_keywords = []
 if 'keyword_cache' not in st.session_state:
     st.session_state.keyword_cache = {} # Format: {keyword: [list of papers]}
+if 'federated_results' not in st.session_state:
+    st.session_state.federated_results = []
+if 'semantic_results' not in st.session_state:
+    st.session_state.semantic_results = []
+
+# Card used by Basic and Cross-Venue Search result lists
+def render_paper_card(i, paper):
+    with st.container():
+        st.markdown(f"""
+        <div class="card">
+            <h3><a href="{paper['link']}" target="_blank">{i+1}. {paper['title']}</a></h3>
+            <div style="color:#5D4037; font-size:0.9em; margin-bottom:0.5em; font-style: italic;">
+                🖋️ {', '.join(paper['authors'][:5])}{' et al.' if len(paper['authors'])>5 else ''} | 🏛️ {paper['status']}
+            </div>
+        """, unsafe_allow_html=True)
+        
+        with st.expander("📖 Show Abstract"):
+            st.write(paper['abstract'] or "Abstract not available in list view")
+            
+        if paper.get('pdf'):
+            st.markdown(f"[📄 Download PDF]({paper['pdf']})")
+            
+        st.markdown("</div>", unsafe_allow_html=True)
+
+# Trace (and, if enabled in the sidebar, profile) one user action; shown under Diagnostics
+@contextmanager
+def instrumented(name):
+    profiling = st.session_state.get("profile_searches", False)
+    with metrics.trace(name) as trace, metrics.profile(name, enabled=profiling) as capture:
+        try:
+            yield
+        finally:
+            # Also runs when the block ends in st.rerun()
+            st.session_state.last_trace = trace
+            if capture is not None:
+                capture.profiler.disable()
+                st.session_state.last_profile = {"name": name, "text": capture.stats_text(), "path": capture.dump()}
+
+# Card used by the AI Smart Search recommendations (step 3)
+def render_recommendation_card(i, paper):
+    # Render card using markdown for custom styling
+    st.markdown(f"""
+    <div class="card">
+        <h3><a href="{paper['link']}" target="_blank" style="text-decoration:none; color:#1E3A8A;">{i+1}. {paper['title']}</a></h3>
+        <div style="color:#666; font-size:0.9em; margin-bottom:0.5em;">
+            {', '.join(paper['authors'][:5])}{' et al.' if len(paper['authors'])>5 else ''} | {paper['status']}
+        </div>
+        <div class="recommendation-reason">
+            <b>DeepSeek:</b> {paper.get('recommendation_reason', 'Matched via keyword.')}
+        </div>
+    """, unsafe_allow_html=True)
+    
+    with st.expander("Show Abstract"):
+        st.write(paper['abstract'] or "Abstract not available in list view")
+        
+    if paper.get('pdf'):
+        st.markdown(f"[Download PDF]({paper['pdf']})")
+        
+    st.markdown("</div>", unsafe_allow_html=True)
 
 # -----------------------------------------------------------------------------
 # Sidebar: Global Settings
@@ -271,12 +335,31 @@ status = "Accepted"
 if conference in ["ICLR", "NeurIPS", "ICML"]:
     status = st.sidebar.radio("Paper Status", ["Accepted", "Under Review"])
 
-# Initialize Engine with User Key
-engine = get_search_engine(deepseek_api_key)
+# Initialize Engine with User Key (a client of the shared search service when SEARCH_SERVICE_URL is set)
+if SERVICE_URL:
+    engine = get_remote_search_engine(SERVICE_URL, deepseek_api_key)
+else:
+    engine = get_search_engine(deepseek_api_key)
+# Keyword results shared by every session; session state only keeps references into it
+result_cache = get_result_cache()
+# Prometheus endpoint, only when SEARCH_METRICS_PORT is set
+metrics.start_metrics_server()
+# Background corpus warming: the picked venue first, then the conference's other years
+prefetcher = RemotePrefetcher(engine) if SERVICE_URL else get_prefetch_scheduler(engine)
+if st.session_state.get("prefetched_venue") != (conference, year, status):
+    st.session_state.prefetched_venue = (conference, year, status)
+    prefetcher.request_conference(conference, year, status, years=available_years)
 
 # Mode Selection
 st.sidebar.divider()
-search_mode = st.sidebar.radio("Search Mode", ["Basic Search", "AI Smart Search"])
+search_mode = st.sidebar.radio("Search Mode", ["Basic Search", "Semantic Search", "Cross-Venue Search", "AI Smart Search"])
+
+cache_stats = result_cache.stats()
+st.sidebar.caption(f"🗂️ Shared result cache: {cache_stats['entries']} queries, {cache_stats['hit_rate']:.0%} hit rate")
+prefetch_stats = prefetcher.stats()
+refreshed = prefetch_stats["last_refresh"].get((conference, year, status))
+refreshed_text = f"{conference} {year} refreshed {time.strftime('%H:%M', time.localtime(refreshed))}" if refreshed else f"{conference} {year} not prefetched yet"
+st.sidebar.caption(f"🔄 Prefetch queue: {prefetch_stats['queued']} waiting, {len(prefetch_stats['running'])} running · {refreshed_text}")
 
 if st.sidebar.button("Reset Session"):
     st.session_state.step = 1
@@ -284,6 +367,8 @@ if st.sidebar.button("Reset Session"):
     st.session_state.generated_keywords = []
     st.session_state.keyword_cache = {}
     st.session_state.search_results = []
+    st.session_state.federated_results = []
+    st.session_state.semantic_results = []
     st.rerun()
 
 # -----------------------------------------------------------------------------
@@ -301,42 +386,117 @@ if search_mode == "Basic Search":
     with col_btn:
         search_clicked = st.button("🔍 Search", type="primary", use_container_width=True)
         
+    streamed = False
     if search_clicked:
         if not query.strip():
             st.warning("Please enter a keyword.")
         else:
-            with st.spinner(f"📖 Searching {conference} {year} ({status})..."):
-                # Direct search using engine
-                results = engine.search(conference, year, query, status)
-                st.session_state.search_results = results
-                
-                if not results:
-                    st.warning("No papers found.")
+            summary = st.empty()
+            with instrumented("basic_search"):
+                version = engine.corpus_version(conference, year, status)
+                results = result_cache.get(conference, year, status, query, version)
+                if results is not None:
+                    for i, paper in enumerate(results):
+                        render_paper_card(i, paper)
                 else:
-                    st.success(f"Found {len(results)} papers.")
+                    results = []
+                    with st.spinner(f"📖 Searching {conference} {year} ({status})..."):
+                        # Render each paper as soon as the engine yields it
+                        for paper in engine.iter_search(conference, year, query, status):
+                            results.append(paper)
+                            summary.caption(f"{len(results)} papers so far...")
+                            render_paper_card(len(results) - 1, paper)
+                    # Only index-ordered results are shared; a cold venue streams in download order
+                    if version is not None:
+                        result_cache.put(conference, year, status, query, version, results)
+            st.session_state.search_results = results
+            streamed = True
+
+            if not results:
+                summary.warning("No papers found.")
+            else:
+                summary.success(f"Found {len(results)} papers.")
 
-    # Display results for Basic Search
-    if st.session_state.search_results and search_mode == "Basic Search":
+    # Display results for Basic Search (already on screen if they were just streamed)
+    if st.session_state.search_results and search_mode == "Basic Search" and not streamed:
         for i, paper in enumerate(st.session_state.search_results):
-            with st.container():
-                st.markdown(f"""
-                <div class="card">
-                    <h3><a href="{paper['link']}" target="_blank">{i+1}. {paper['title']}</a></h3>
-                    <div style="color:#5D4037; font-size:0.9em; margin-bottom:0.5em; font-style: italic;">
-                        🖋️ {', '.join(paper['authors'][:5])}{' et al.' if len(paper['authors'])>5 else ''} | 🏛️ {paper['status']}
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                with st.expander("📖 Show Abstract"):
-                    st.write(paper['abstract'])
-                    
-                if paper.get('pdf'):
-                    st.markdown(f"[📄 Download PDF]({paper['pdf']})")
-                    
-                st.markdown("</div>", unsafe_allow_html=True)
+            render_paper_card(i, paper)
+
+# =============================================================================
+# MODE 2: Semantic Search (local embeddings, no API key needed)
+# =============================================================================
+elif search_mode == "Semantic Search":
+    col_search, col_k, col_btn = st.columns([4, 1, 1])
+    with col_search:
+        sem_query = st.text_input("Describe what you are looking for", placeholder="e.g., score-based generative models for molecules", label_visibility="collapsed", key="sem_query")
+    with col_k:
+        sem_top_k = st.number_input("Top K", min_value=5, max_value=200, value=50, step=5, label_visibility="collapsed")
+    with col_btn:
+        sem_clicked = st.button("🧭 Search", type="primary", use_container_width=True)
+
+    if sem_clicked:
+        if not sem_query.strip():
+            st.warning("Please describe what you are looking for.")
+        else:
+            with st.spinner(f"🧭 Searching {conference} {year} ({status}) by meaning..."), instrumented("semantic_search"):
+                start = time.perf_counter()
+                st.session_state.semantic_results = engine.semantic_search(conference, year, sem_query, status, top_k=int(sem_top_k))
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            if not st.session_state.semantic_results:
+                st.warning("No papers found.")
+            else:
+                st.success(f"Top {len(st.session_state.semantic_results)} papers in {elapsed_ms:.0f} ms.")
+
+    for i, paper in enumerate(st.session_state.semantic_results):
+        render_paper_card(i, paper)
+        st.caption(f"Similarity: {paper['similarity']:.3f}")
 
 # =============================================================================
-# MODE 2: AI Smart Search (Step-by-Step Wizard)
+# MODE 3: Cross-Venue Search (Parallel fan-out over conferences x years)
+# =============================================================================
+elif search_mode == "Cross-Venue Search":
+    col_venues, col_years = st.columns([3, 2])
+    with col_venues:
+        fed_sources = st.multiselect("Conferences", ALL_VENUES, default=ALL_VENUES)
+    with col_years:
+        fed_years = st.multiselect("Years", SUPPORTED_YEARS, default=["2025", "2024", "2023"])
+
+    col_search, col_btn = st.columns([4, 1])
+    with col_search:
+        fed_query = st.text_input("Enter keywords", placeholder="e.g., diffusion model, reinforcement learning", label_visibility="collapsed", key="fed_query")
+    with col_btn:
+        fed_clicked = st.button("🔍 Search All", type="primary", use_container_width=True)
+
+    if fed_clicked:
+        venues = federated_venues(fed_sources, fed_years)
+        if not fed_query.strip():
+            st.warning("Please enter a keyword.")
+        elif not venues:
+            st.warning("Please select at least one conference and year.")
+        else:
+            per_venue = {}
+            with st.status(f"Searching {len(venues)} venues in parallel...", expanded=True) as status_box, \
+                    instrumented("cross_venue_search"):
+                # Venues report in as they finish; slow ones are skipped after their time budget
+                for source, venue_year, results in engine.iter_search_federated(venues, fed_query, status):
+                    if results is None:
+                        status_box.write(f"⏱️ {source} {venue_year}: timed out")
+                    else:
+                        status_box.write(f"{source} {venue_year}: {len(results)} papers")
+                        per_venue[(source, venue_year)] = results
+                status_box.update(label="Search Complete!", state="complete", expanded=False)
+
+            st.session_state.federated_results = merge_results(per_venue.get(v, []) for v in venues)
+            if not st.session_state.federated_results:
+                st.warning("No papers found.")
+            else:
+                st.success(f"Found {len(st.session_state.federated_results)} unique papers across {len(per_venue)} venues.")
+
+    for i, paper in enumerate(st.session_state.federated_results):
+        render_paper_card(i, paper)
+
+# =============================================================================
+# MODE 4: AI Smart Search (Step-by-Step Wizard)
 # =============================================================================
 elif search_mode == "AI Smart Search":
     
@@ -360,7 +520,7 @@ elif search_mode == "AI Smart Search":
                 st.warning("Please describe your intent first.")
             else:
                 st.session_state.user_intent = user_input
-                with st.spinner("☕ Brewing keywords with DeepSeek..."):
+                with st.spinner("☕ Brewing keywords with DeepSeek..."), instrumented("ai_step1_keywords"):
                     keywords = engine.extract_keywords_with_deepseek(user_input)
                     # Initialize keywords with 0 count or None
                     st.session_state.generated_keywords = [{"keyword": k, "active": True, "count": None} for k in keywords]
@@ -438,18 +598,29 @@ elif search_mode == "AI Smart Search":
                 st.session_state.generated_keywords = updated_keywords
                 
                 # Run search for each keyword (if active)
-                with st.status("Scanning keywords...", expanded=True) as status_box:
+                with st.status("Scanning keywords...", expanded=True) as status_box, instrumented("ai_step2_scan"):
+                    pending = []
                     for item in st.session_state.generated_keywords:
                         kw = item['keyword']
                         if item['active']:
                             # If not in cache or force update
                             if kw not in st.session_state.keyword_cache:
-                                status_box.write(f"Searching: {kw}...")
-                                results = engine.search(conference, year, kw, status)
-                                st.session_state.keyword_cache[kw] = results
-                                item['count'] = len(results)
+                                pending.append(kw)
                             else:
                                 status_box.write(f"Used cached: {kw} ({len(st.session_state.keyword_cache[kw])} papers)")
+
+                    # Scan all uncached keywords in one batch (the venue is fetched only once);
+                    # keywords another session already searched come from the shared cache
+                    if pending:
+                        status_box.write(f"Searching: {', '.join(pending)}...")
+                        found, hits = result_cache.search_many(engine, conference, year, pending, status)
+                        st.session_state.keyword_cache.update(found)
+                        if hits:
+                            status_box.write(f"{hits} of {len(pending)} answered from the shared cache")
+
+                    for item in st.session_state.generated_keywords:
+                        if item['active']:
+                            item['count'] = len(st.session_state.keyword_cache[item['keyword']])
                         else:
                             item['count'] = None # Skip inactive
                     status_box.update(label="Scan Complete!", state="complete", expanded=False)
@@ -505,11 +676,20 @@ elif search_mode == "AI Smart Search":
         else:
             # Check if we already reranked
             if not st.session_state.search_results:
-                with st.spinner(f"🧠 DeepSeek is analyzing {len(all_papers)} unique papers..."):
-                    # 2. AI Rerank
-                    reranked = engine.deepseek_rerank_papers(st.session_state.user_intent, all_papers, top_n=25)
-                    st.session_state.search_results = reranked
-                    st.rerun()
+                summary = st.empty()
+                reranked = []
+                with st.spinner(f"🧠 DeepSeek is analyzing {len(all_papers)} unique papers..."), instrumented("ai_step3_rerank"):
+                    # 1. Local pre-rank (BM25 + embeddings) so only the most promising papers reach the LLM.
+                    # The English keywords are included since the intent may be written in another language.
+                    prerank_query = " ".join([st.session_state.user_intent] + st.session_state.final_keywords)
+                    shortlist = engine.prerank_papers(prerank_query, all_papers, source=conference, year=year, status=status)
+                    # 2. AI Rerank, rendering each recommendation as soon as DeepSeek writes it
+                    for paper in engine.iter_rerank_papers(st.session_state.user_intent, shortlist, top_n=25):
+                        reranked.append(paper)
+                        summary.caption(f"{len(reranked)} recommendations so far...")
+                        render_recommendation_card(len(reranked) - 1, paper)
+                st.session_state.search_results = reranked or shortlist[:25]
+                st.rerun()
             
             # Display Results
             st.success(f"DeepSeek selected top {len(st.session_state.search_results)} papers from {len(all_papers)} candidates.")
@@ -529,28 +709,31 @@ elif search_mode == "AI Smart Search":
                     col_content, col_op = st.columns([10, 1])
                     
                     with col_content:
-                        # Render card using markdown for custom styling
-                        st.markdown(f"""
-                        <div class="card">
-                            <h3><a href="{paper['link']}" target="_blank" style="text-decoration:none; color:#1E3A8A;">{i+1}. {paper['title']}</a></h3>
-                            <div style="color:#666; font-size:0.9em; margin-bottom:0.5em;">
-                                {', '.join(paper['authors'][:5])}{' et al.' if len(paper['authors'])>5 else ''} | {paper['status']}
-                            </div>
-                            <div class="recommendation-reason">
-                                <b>DeepSeek:</b> {paper.get('recommendation_reason', 'Matched via keyword.')}
-                            </div>
-                        """, unsafe_allow_html=True)
-                        
-                        with st.expander("Show Abstract"):
-                            st.write(paper['abstract'])
-                            
-                        if paper.get('pdf'):
-                            st.markdown(f"[Download PDF]({paper['pdf']})")
-                            
-                        st.markdown("</div>", unsafe_allow_html=True)
+                        render_recommendation_card(i, paper)
 
                     with col_op:
                         st.markdown("<br><br>", unsafe_allow_html=True) # Spacing
                         if st.button("🗑️", key=f"del_{i}", help="Dismiss this paper"):
                             st.session_state.search_results.pop(i)
                             st.rerun()
+
+# -----------------------------------------------------------------------------
+# Sidebar: Diagnostics (rendered last so it shows the action that just ran)
+# -----------------------------------------------------------------------------
+with st.sidebar.expander("🔬 Diagnostics"):
+    st.checkbox("Profile searches (cProfile)", key="profile_searches", help="Capture a profile of each search action; adds overhead.")
+    last_trace = st.session_state.get("last_trace")
+    if last_trace is not None:
+        st.markdown(f"**Last action:** `{last_trace.name}` in {last_trace.duration:.2f} s")
+        st.dataframe(pd.DataFrame([{"stage": stage, "seconds": round(seconds, 3)} for stage, seconds in last_trace.summary().items()]),
+                     hide_index=True, use_container_width=True)
+        st.caption("Stages on worker threads overlap, so they can add up to more than the action.")
+    stage_totals = [{"stage": stage, "source": source, "count": count, "seconds": round(total, 3)}
+                    for (stage, source), (count, total) in sorted(metrics.STAGE_SECONDS.summary().items())]
+    if stage_totals:
+        st.markdown("**Since startup**")
+        st.dataframe(pd.DataFrame(stage_totals), hide_index=True, use_container_width=True)
+    last_profile = st.session_state.get("last_profile")
+    if last_profile is not None:
+        st.markdown(f"**Profile of `{last_profile['name']}`** (saved to `{last_profile['path']}`)")
+        st.code(last_profile["text"], language=None)
@@ -0,0 +1,429 @@
+import os
+import json
+import time
+import asyncio
+import xml.etree.ElementTree as ET
+
+import httpx
+from lxml import etree
+from openai import AsyncOpenAI
+
+import metrics
+from search_engine import (
+    SearchEngine, venue_family, venue_held, merge_results,
+    CORPUS_FAMILIES, CVF_VENUES, SOURCE_TIMEOUTS,
+    OPENREVIEW_PAGE_SIZE, OPENREVIEW_MAX_RETRIES,
+    DEEPSEEK_BASE_URL, CVF_HEADERS, ARXIV_API_URL, ARXIV_PAGE_SIZE, ARXIV_NS, ATOM_ENTRY, ATOM_TOTAL_RESULTS, AAAI_HARVEST_MAX,
+)
+
+# Connection limits shared by every venue download running on the event loop
+ASYNC_MAX_CONNECTIONS = 32
+ASYNC_MAX_KEEPALIVE = 16
+# Concurrent requests per OpenReview venue and concurrent DeepSeek calls
+ASYNC_OPENREVIEW_CONCURRENCY = 4
+ASYNC_LLM_CONCURRENCY = 4
+
+
+class AsyncSearchEngine:
+    """
+    Coroutine API of SearchEngine for callers that run an event loop.
+
+    Venue downloads (OpenReview, CVF, arXiv) go through one httpx.AsyncClient with connection limits
+    and DeepSeek calls through AsyncOpenAI, so many venues and LLM calls overlap on a single loop.
+    Corpus cache, indexes, prompts and parsers are shared with the wrapped SearchEngine, so both
+    APIs see the same cached venues and LLM responses, and both record the same metrics.
+    """
+
+    def __init__(self, api_key=None, engine=None, max_connections=ASYNC_MAX_CONNECTIONS):
+        self.engine = engine or SearchEngine(api_key)
+        self.api_key = api_key if api_key is not None else self.engine.api_key
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=ASYNC_MAX_KEEPALIVE),
+            timeout=httpx.Timeout(60, connect=15),
+            proxy=self.engine.proxy or None,
+            verify=False,
+            follow_redirects=True,
+        )
+        self._client = None
+        self._llm_slots = asyncio.Semaphore(ASYNC_LLM_CONCURRENCY)
+        # One download per venue at a time; concurrent callers wait for it and share the result
+        self._venue_locks = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.http.aclose()
+        if self._client is not None:
+            await self._client.close()
+
+    @property
+    def client(self):
+        if self._client is None:
+            api_key = self.api_key or os.getenv("DEEPSEEK_API_KEY", "")
+            self._client = AsyncOpenAI(api_key=api_key, base_url=DEEPSEEK_BASE_URL)
+        return self._client
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    async def search(self, source, year, keyword, status="Accepted"):
+        """Papers of a venue matching keyword, best first (same results as SearchEngine.search)."""
+        papers = await self.get_corpus(source, year, status)
+        if not papers:
+            return []
+        # Building the index is CPU work: keep it off the event loop
+        _, index = await asyncio.to_thread(self.engine._corpus_index, source, year, status, papers)
+        with metrics.stage("match", source):
+            return [papers[doc_id] for doc_id, _ in index.search(keyword)]
+
+    async def search_many(self, source, year, keywords, status="Accepted"):
+        """Search several keywords against one venue, downloading it at most once. Returns {keyword: results}."""
+        keywords = list(dict.fromkeys(keywords))
+        results = await asyncio.gather(*(self.search(source, year, kw, status) for kw in keywords))
+        return dict(zip(keywords, results))
+
+    async def search_federated(self, venues, keyword, status="Accepted", timeouts=None):
+        """
+        Search many (source, year) pairs concurrently and return one merged, deduplicated list.
+        Venues exceeding their source's time budget are left out (their download keeps running).
+        """
+        timeouts = dict(SOURCE_TIMEOUTS, **(timeouts or {}))
+        venues = [(source, str(year)) for source, year in venues]
+        tasks = {venue: asyncio.ensure_future(self.search(*venue, keyword, status)) for venue in venues}
+
+        per_venue = {}
+        started = time.monotonic()
+        for (source, year), task in tasks.items():
+            remaining = started + timeouts[venue_family(source)] - time.monotonic()
+            done, _ = await asyncio.wait([task], timeout=max(0, remaining))
+            if not done:
+                print(f"Federated search timed out for {source} {year}")
+                continue
+            try:
+                per_venue[(source, year)] = task.result()
+            except Exception as e:
+                print(f"Federated search failed for {source} {year}: {e}")
+        return merge_results(per_venue.get(venue, []) for venue in venues)
+
+    # ------------------------------------------------------------------
+    # Venue corpora
+    # ------------------------------------------------------------------
+    async def get_corpus(self, source, year, status="Accepted", refresh=False):
+        """Coroutine counterpart of SearchEngine.get_corpus, sharing its corpus cache."""
+        if venue_family(source) not in CORPUS_FAMILIES:
+            return None
+        if not venue_held(source, year):
+            return []
+        status = self.engine._corpus_status(source, status)
+        key = self.engine.corpus_cache.key(source, year, status)
+        lock = self._venue_locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            entry = await asyncio.to_thread(self.engine.corpus_cache.load, source, year, status)
+            hit = entry is not None and not refresh and await self._is_current(entry)
+            metrics.count_cache("corpus", hit)
+            if hit:
+                self.engine._maybe_enrich(entry)
+                return entry["papers"]
+
+            try:
+                papers, validator = await self._fetch_corpus(source, year, status)
+            except Exception as e:
+                print(f"Error fetching {source} {year} ({status}): {e}")
+                return entry["papers"] if entry is not None else []
+
+            return await asyncio.to_thread(self.engine._store_corpus, source, year, status, papers, validator, entry)
+
+    async def _is_current(self, entry):
+        if self.engine.corpus_cache.is_fresh(entry):
+            return True
+        try:
+            validator = await self._corpus_validator(entry["source"], entry["year"], entry["status"])
+        except Exception as e:
+            print(f"Could not revalidate {entry['source']} {entry['year']} ({entry['status']}): {e}")
+            return False
+        if validator and validator == entry.get("validator"):
+            await asyncio.to_thread(self.engine.corpus_cache.touch, entry)
+            return True
+        return False
+
+    async def _fetch_corpus(self, source, year, status):
+        if source in CVF_VENUES:
+            return await self._fetch_cvf_corpus(source, year)
+        if source == "AAAI":
+            return await self._fetch_aaai_corpus(year)
+        return await self._fetch_openreview_corpus(source, year, status)
+
+    async def _corpus_validator(self, source, year, status):
+        if source in CVF_VENUES:
+            return await self._cvf_validator(source, year)
+        if source == "AAAI":
+            return await self._aaai_validator(year)
+        return await self._openreview_validator(source, year, status)
+
+    # ------------------------------------------------------------------
+    # OpenReview
+    # ------------------------------------------------------------------
+    async def _openreview_validator(self, conference, year, status):
+        client = await asyncio.to_thread(self.engine._openreview_client, year)
+        for query in self.engine._openreview_queries(conference, year, status):
+            _, count = await self._get_openreview_page(client, query, limit=1, with_count=True)
+            if count:
+                return f"{json.dumps(query, sort_keys=True)}#{count}"
+        return None
+
+    async def _fetch_openreview_corpus(self, conference, year, status):
+        """All notes of the first venue query that returns any; later pages are fetched concurrently."""
+        # The openreview client is only used for its endpoint URL and headers
+        client = await asyncio.to_thread(self.engine._openreview_client, year)
+        normalize = self.engine._normalize_openreview_page
+        for query in self.engine._openreview_queries(conference, year, status):
+            print(f"Fetching {status.lower()} from {query}")
+            notes, count = await self._get_openreview_page(client, query, with_count=True)
+            if not notes:
+                continue
+
+            # Step by the page size the server actually returned; without a count, page until a short page
+            page_size = len(notes)
+            if count is None:
+                pages = [notes]
+                while len(pages[-1]) == page_size:
+                    pages.append((await self._get_openreview_page(client, query, offset=page_size * len(pages)))[0])
+                papers = [paper for page in pages for paper in normalize(page, conference, year, status)]
+                return papers, None
+
+            slots = asyncio.Semaphore(ASYNC_OPENREVIEW_CONCURRENCY)
+            async def fetch(offset):
+                async with slots:
+                    return (await self._get_openreview_page(client, query, offset=offset))[0]
+            pages = await asyncio.gather(*(fetch(offset) for offset in range(page_size, count, page_size)))
+
+            papers = [paper for page in [notes] + list(pages) for paper in normalize(page, conference, year, status)]
+            return papers, f"{json.dumps(query, sort_keys=True)}#{count}"
+        return [], None
+
+    async def _get_openreview_page(self, client, query, offset=None, limit=OPENREVIEW_PAGE_SIZE, with_count=False):
+        """Async SearchEngine._get_openreview_page: same projection fallback and retry policy."""
+        params = self.engine._openreview_params(client, query, offset, limit, with_count)
+        for attempt in range(OPENREVIEW_MAX_RETRIES):
+            with metrics.stage("fetch", "openreview"):
+                response = await self.http.get(client.notes_url, params=params, headers=client.headers)
+            metrics.count_request("openreview", response.status_code)
+            if response.status_code == 429 or response.status_code >= 500:
+                delay = self.engine._openreview_retry_delay(response, attempt)
+                print(f"OpenReview returned {response.status_code}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            if response.status_code == 400 and 'select' in params:
+                self.engine._openreview_unprojected.add(client.notes_url)
+                del params['select']
+                continue
+            response.raise_for_status()
+            with metrics.stage("parse", "openreview"):
+                data = response.json()
+            return data.get('notes', []), data.get('count')
+
+        response.raise_for_status()
+        raise RuntimeError(f"OpenReview request failed after {OPENREVIEW_MAX_RETRIES} attempts")
+
+    # ------------------------------------------------------------------
+    # CVF
+    # ------------------------------------------------------------------
+    async def _cvf_validator(self, conference, year):
+        for url in self.engine._cvf_listing_urls(conference, year):
+            response = await self.http.head(url, headers=CVF_HEADERS, timeout=15)
+            metrics.count_request("cvf", response.status_code)
+            if response.status_code == 200:
+                etag = response.headers.get('ETag') or response.headers.get('Last-Modified')
+                return f"{url}#{etag}" if etag else None
+        return None
+
+    async def _fetch_cvf_corpus(self, conference, year):
+        """Stream the CVF listing through lxml's pull parser as it downloads."""
+        failures = []
+        for url in self.engine._cvf_listing_urls(conference, year):
+            # Network reads and parsing interleave: fetch time is the download's time minus parsing
+            fetching, parsing = metrics.Stopwatch(), metrics.Stopwatch()
+            try:
+                with fetching:
+                    async with self.http.stream("GET", url, headers=CVF_HEADERS, timeout=15) as response:
+                        metrics.count_request("cvf", response.status_code)
+                        if response.status_code != 200:
+                            if response.status_code != 404:
+                                failures.append(f"{url} returned HTTP {response.status_code}")
+                            continue
+                        etag = response.headers.get('ETag') or response.headers.get('Last-Modified')
+                        parser = etree.HTMLPullParser(events=("end",), tag=("dt", "dd"), encoding=response.encoding or "utf-8")
+                        state = {"current": None}
+                        papers = []
+                        async for chunk in response.aiter_bytes(64 * 1024):
+                            with parsing:
+                                parser.feed(chunk)
+                                papers.extend(self.engine._drain_cvf_events(parser, state, conference, year))
+            except httpx.HTTPError as e:
+                print(f"Failed to fetch {url}: {e}")
+                metrics.count_request("cvf", "error")
+                failures.append(e)
+                continue
+
+            with parsing:
+                parser.close()
+                papers.extend(self.engine._drain_cvf_events(parser, state, conference, year))
+                if state["current"] is not None:
+                    papers.append(state["current"])
+            fetching.observe("fetch", "cvf", minus=parsing.elapsed)
+            parsing.observe("parse", "cvf")
+            metrics.PAPERS_PROCESSED.inc(len(papers), source="cvf")
+            return papers, (f"{url}#{etag}" if etag else None)
+        if failures:
+            raise RuntimeError(f"Could not fetch the {conference} {year} listing: {failures[-1]}")
+        return [], None
+
+    # ------------------------------------------------------------------
+    # AAAI (arXiv)
+    # ------------------------------------------------------------------
+    async def _arxiv_get(self, params):
+        # Shares the sync engine's limiter, so both APIs together respect arXiv's request spacing
+        delay = self.engine._arxiv_limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+        try:
+            with metrics.stage("fetch", "aaai"):
+                response = await self.http.get(ARXIV_API_URL, params=params, headers=headers, timeout=30)
+        except Exception:
+            metrics.count_request("arxiv", "error")
+            raise
+        metrics.count_request("arxiv", response.status_code)
+        return response
+
+    async def _aaai_validator(self, year):
+        query = self.engine._aaai_query(year)
+        response = await self._arxiv_get({'search_query': query, 'start': 0, 'max_results': 0})
+        response.raise_for_status()
+        total = ET.fromstring(response.content).findtext('opensearch:totalResults', '', ARXIV_NS)
+        return f"{query}#{total}" if total else None
+
+    async def _fetch_aaai_corpus(self, year):
+        """Page through the arXiv hits for the AAAI query, keeping confirmed AAAI papers of the year."""
+        query = self.engine._aaai_query(year)
+        papers = []
+        seen = set()
+        total = 0
+        start = 0
+        while start < AAAI_HARVEST_MAX:
+            response = await self._arxiv_get({
+                'search_query': query,
+                'start': start,
+                'max_results': ARXIV_PAGE_SIZE,
+                'sortBy': 'submittedDate',
+                'sortOrder': 'descending'
+            })
+            response.raise_for_status()
+
+            entries = 0
+            with metrics.stage("parse", "aaai"):
+                parser = ET.XMLPullParser(events=("start", "end"))
+                parser.feed(response.content)
+                root = None
+                for event, elem in parser.read_events():
+                    if root is None:
+                        root = elem
+                    if event != "end":
+                        continue
+                    if elem.tag == ATOM_TOTAL_RESULTS:
+                        total = int(elem.text or 0)
+                    elif elem.tag == ATOM_ENTRY:
+                        entries += 1
+                        paper = self.engine._parse_arxiv_entry(elem, year)
+                        root.remove(elem)
+                        if paper is not None and paper["link"] not in seen:
+                            seen.add(paper["link"])
+                            papers.append(paper)
+            metrics.PAPERS_PROCESSED.inc(entries, source="aaai")
+            if not entries:
+                break
+            start += entries
+            if start >= total:
+                break
+        return papers, f"{query}#{total}"
+
+    # ------------------------------------------------------------------
+    # DeepSeek
+    # ------------------------------------------------------------------
+    async def _complete(self, messages, model="deepseek-chat", purpose="chat"):
+        """JSON chat completion through the shared LLM cache."""
+        key = self.engine._llm_cache_key(model, messages)
+        if key is not None:
+            content = await asyncio.to_thread(self.engine.llm_cache.get, key)
+            metrics.count_cache("llm", content is not None)
+            if content is not None:
+                metrics.count_llm(purpose, cached=True)
+                return content
+
+        async with self._llm_slots:
+            with metrics.stage("llm", purpose):
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    response_format={ "type": "json_object" },
+                    stream=False
+                )
+        content = response.choices[0].message.content
+        self.engine._count_llm_tokens(purpose, messages, content, getattr(response, "usage", None))
+        json.loads(content)
+        if key is not None:
+            await asyncio.to_thread(self.engine.llm_cache.put, key, model, content)
+        return content
+
+    async def extract_keywords_with_deepseek(self, user_prompt):
+        """Coroutine counterpart of SearchEngine.extract_keywords_with_deepseek."""
+        try:
+            content = await self._complete(self.engine._keyword_messages(user_prompt), purpose="keywords")
+            return json.loads(content).get("keywords", [])
+        except Exception as e:
+            print(f"Error extracting keywords with DeepSeek: {e}")
+            return [user_prompt]
+
+    async def deepseek_rerank_papers(self, user_prompt, papers_list, top_n=25, chunk_size=None, token_budget=None):
+        """Coroutine counterpart of SearchEngine.deepseek_rerank_papers; chunk scoring calls overlap."""
+        if not papers_list:
+            return []
+        chunk_size = chunk_size or self.engine.rerank_chunk_size
+        token_budget = token_budget or self.engine.rerank_token_budget
+
+        try:
+            candidates = list(papers_list)
+            if len(candidates) > chunk_size:
+                with metrics.stage("rerank"):
+                    chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+                    chunk_scores = await asyncio.gather(*(self._score_chunk(user_prompt, chunk, token_budget) for chunk in chunks))
+                    scores = [score for chunk in chunk_scores for score in chunk]
+                    order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+                    candidates = [candidates[i] for i in order[:max(chunk_size, top_n)]]
+
+            messages = self.engine._rerank_messages(user_prompt, candidates, top_n, token_budget)
+            recommendations = json.loads(await self._complete(messages, purpose="rerank")).get("recommendations", [])
+
+            reranked_results = []
+            for idx, reason in self.engine._valid_picks(recommendations, len(candidates), top_n):
+                paper = candidates[idx].copy()
+                paper["recommendation_reason"] = reason
+                reranked_results.append(paper)
+            return reranked_results
+
+        except Exception as e:
+            print(f"Error reranking papers with DeepSeek: {e}")
+            return papers_list[:top_n]
+
+    async def _score_chunk(self, user_prompt, candidates, token_budget):
+        try:
+            content = await self._complete(self.engine._score_messages(user_prompt, candidates, token_budget), purpose="score")
+            return self.engine._parse_scores(content, len(candidates))
+        except Exception as e:
+            print(f"Error scoring a chunk with DeepSeek: {e}")
+            return [-1] * len(candidates)
@@ -0,0 +1,292 @@
+"""
+Headless batch search: run thousands of queries from a JSONL file against SearchEngine and stream
+the results to JSONL.
+
+Each input line is a JSON object with "conference", "year", optional "status" and "id", and one of
+    "keyword"  - keyword search (answered from the venue index, shared result cache)
+    "intent"   - AI Smart Search: keywords (DeepSeek, or given as "keywords"), scan, local pre-rank
+                 and, when an API key is available, a DeepSeek rerank
+    "semantic" - embedding search over the venue
+
+    python batch_search.py queries.jsonl -o results.jsonl --workers 8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from search_engine import get_search_engine, venue_held, ALL_VENUES, OPENREVIEW_VENUES
+from result_cache import get_result_cache
+
+BATCH_WORKERS = 8
+# Papers written per query (0 keeps every match)
+BATCH_RESULT_LIMIT = 50
+# Queries submitted ahead of the slowest unfinished one, per worker
+BATCH_WINDOW_PER_WORKER = 4
+PROGRESS_INTERVAL = 5.0
+
+
+class QueryError(ValueError):
+    pass
+
+
+def parse_query(line, line_number):
+    try:
+        query = json.loads(line)
+    except ValueError as e:
+        raise QueryError(f"invalid JSON: {e}")
+    if not isinstance(query, dict):
+        raise QueryError("query must be a JSON object")
+
+    conference = query.get("conference")
+    year = str(query.get("year", ""))
+    if conference not in ALL_VENUES:
+        raise QueryError(f"unknown conference: {conference!r}")
+    if not year.isdigit():
+        raise QueryError(f"invalid year: {year!r}")
+    if not venue_held(conference, year):
+        raise QueryError(f"{conference} is not held in {year}")
+    status = query.get("status") or "Accepted"
+    if status not in ("Accepted", "Under Review") or (status == "Under Review" and conference not in OPENREVIEW_VENUES):
+        raise QueryError(f"invalid status for {conference}: {status!r}")
+
+    modes = [mode for mode in ("keyword", "intent", "semantic") if str(query.get(mode) or "").strip()]
+    if len(modes) != 1:
+        raise QueryError('exactly one of "keyword", "intent" or "semantic" is required')
+    return dict(query, line=line_number, conference=conference, year=year, status=status, mode=modes[0])
+
+
+def paper_output(paper, fields):
+    record = dict(paper)
+    if fields:
+        record = {field: record.get(field) for field in fields}
+    return record
+
+
+class BatchRunner:
+    """Runs parsed queries against one engine; every query shares its corpus, index, result and LLM caches."""
+
+    def __init__(self, engine, result_cache=None, limit=BATCH_RESULT_LIMIT, fields=None, rerank=True):
+        self.engine = engine
+        self.result_cache = result_cache
+        self.limit = limit
+        self.fields = fields
+        self.rerank = rerank
+
+    def run(self, query):
+        started = time.perf_counter()
+        output = {"id": query.get("id", query["line"]), "line": query["line"], "mode": query["mode"]}
+        try:
+            results, extra = getattr(self, f"_run_{query['mode']}")(query)
+            total = len(results)
+            if self.limit:
+                results = results[:self.limit]
+            output.update(extra, count=total, results=[paper_output(p, self.fields) for p in results])
+        except Exception as e:
+            output["error"] = f"{type(e).__name__}: {e}"
+        output["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return output
+
+    def _search_many(self, query, keywords):
+        if self.result_cache is not None:
+            found, _ = self.result_cache.search_many(self.engine, query["conference"], query["year"], keywords, query["status"])
+            return found
+        return self.engine.search_many(query["conference"], query["year"], keywords, query["status"])
+
+    def _run_keyword(self, query):
+        keyword = query["keyword"]
+        return self._search_many(query, [keyword])[keyword], {}
+
+    def _run_semantic(self, query):
+        top_k = self.limit or 200
+        return self.engine.semantic_search(query["conference"], query["year"], query["semantic"], query["status"], top_k=top_k), {}
+
+    def _run_intent(self, query):
+        intent = query["intent"]
+        keywords = query.get("keywords") or self.engine.extract_keywords_with_deepseek(intent)
+        found = self._search_many(query, keywords)
+
+        candidates, seen = [], set()
+        for keyword in keywords:
+            for paper in found[keyword]:
+                if paper["link"] not in seen:
+                    seen.add(paper["link"])
+                    candidates.append(paper)
+
+        prerank_query = " ".join([intent] + list(keywords))
+        shortlist = self.engine.prerank_papers(prerank_query, candidates, source=query["conference"],
+                                               year=query["year"], status=query["status"])
+        extra = {"keywords": list(keywords), "candidates": len(candidates)}
+        if self.rerank and query.get("rerank", True):
+            top_n = self.limit or 25
+            return self.engine.deepseek_rerank_papers(intent, shortlist, top_n=top_n), extra
+        return shortlist, extra
+
+
+# Process workers inherit the runner (and its warm engine) through fork
+_process_runner = None
+
+def _run_in_process(query):
+    return _process_runner.run(query)
+
+
+def read_queries(lines):
+    """Yield (query, None) or (None, error output) for each non-blank input line."""
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield parse_query(line, line_number), None
+        except QueryError as e:
+            yield None, {"id": line_number, "line": line_number, "error": str(e)}
+
+
+def warm_venues(engine, queries, workers):
+    """Download and index every venue the batch needs, concurrently, before any query runs."""
+    venues = sorted({(q["conference"], q["year"], q["status"]) for q in queries})
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(venues) or 1))) as pool:
+        list(pool.map(lambda venue: engine.get_index(*venue), venues))
+    return venues
+
+
+def run_batch(runner, lines, out, workers=BATCH_WORKERS, processes=1, ordered=False, progress=None):
+    """
+    Execute every query read from lines and write one JSON line per query to out as soon as it
+    finishes (in input order with ordered). Returns throughput statistics.
+    """
+    global _process_runner
+    started = time.perf_counter()
+    parsed = list(read_queries(lines))
+    queries = [query for query, _ in parsed if query is not None]
+    venues = warm_venues(runner.engine, queries, workers)
+    warmed = time.perf_counter()
+
+    if processes > 1:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("--processes needs the fork start method")
+        _process_runner = runner
+        pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("fork"))
+        task, slots = _run_in_process, processes
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        task, slots = runner.run, workers
+
+    stats = {"queries": 0, "errors": 0, "latencies": []}
+    last_report = [time.perf_counter()]
+
+    def emit(output):
+        # Only the submitting thread writes, so no locking is needed
+        out.write(json.dumps(output, ensure_ascii=False) + "\n")
+        stats["queries"] += 1
+        if "error" in output:
+            stats["errors"] += 1
+        if "elapsed_ms" in output:
+            stats["latencies"].append(output["elapsed_ms"])
+        now = time.perf_counter()
+        if progress is not None and now - last_report[0] >= PROGRESS_INTERVAL:
+            last_report[0] = now
+            progress(f"{stats['queries']}/{len(parsed)} queries, {stats['queries'] / (now - warmed):.1f} q/s, "
+                     f"{stats['errors']} errors")
+
+    window = deque()
+    try:
+        for query, error in parsed:
+            # Invalid lines are reported in place without using a worker
+            window.append(error if query is None else pool.submit(task, query))
+            if len(window) >= slots * BATCH_WINDOW_PER_WORKER:
+                _drain(window, emit, ordered)
+        while window:
+            _drain(window, emit, ordered)
+    finally:
+        pool.shutdown(wait=True)
+        _process_runner = None
+    out.flush()
+
+    finished = time.perf_counter()
+    latencies = sorted(stats["latencies"])
+    summary = {
+        "queries": stats["queries"],
+        "errors": stats["errors"],
+        "venues": len(venues),
+        "warm_s": round(warmed - started, 3),
+        "run_s": round(finished - warmed, 3),
+        "qps": round(stats["queries"] / (finished - warmed), 2) if finished > warmed else None,
+        "p50_ms": latencies[len(latencies) // 2] if latencies else None,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+    }
+    if runner.result_cache is not None:
+        summary["result_cache"] = runner.result_cache.stats()
+    return summary
+
+
+def _drain(window, emit, ordered):
+    """Wait for progress and write out finished entries of window (only from its head when ordered)."""
+    if ordered:
+        if isinstance(window[0], Future):
+            window[0].result()
+        while window and (not isinstance(window[0], Future) or window[0].done()):
+            emit(_output(window.popleft()))
+        return
+    if all(isinstance(item, Future) and not item.done() for item in window):
+        wait(window, return_when=FIRST_COMPLETED)
+    for item in list(window):
+        if not isinstance(item, Future) or item.done():
+            window.remove(item)
+            emit(_output(item))
+
+
+def _output(item):
+    return item.result() if isinstance(item, Future) else item
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run search queries from a JSONL file and stream results as JSONL")
+    parser.add_argument("input", help="JSONL queries ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL results ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="worker threads")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes instead of threads, for CPU-bound keyword sweeps (forked after warm-up)")
+    parser.add_argument("--ordered", action="store_true", help="write results in input order")
+    parser.add_argument("--limit", type=int, default=BATCH_RESULT_LIMIT, help="papers written per query (0: all)")
+    parser.add_argument("--fields", help="comma-separated paper fields to write (default: all)")
+    parser.add_argument("--no-rerank", action="store_true", help="intent queries stop after the local pre-rank")
+    parser.add_argument("--api-key", default=os.getenv("DEEPSEEK_API_KEY"), help="DeepSeek API key (default: $DEEPSEEK_API_KEY)")
+    parser.add_argument("--stats", help="also write the run statistics as JSON to this file")
+    args = parser.parse_args(argv)
+
+    engine = get_search_engine(args.api_key)
+    # Background abstract enrichment would keep rewriting corpora mid-batch
+    engine.enrich_cvf = False
+    runner = BatchRunner(engine, get_result_cache(), limit=args.limit,
+                         fields=args.fields.split(",") if args.fields else None,
+                         rerank=bool(args.api_key) and not args.no_rerank)
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        # The engine logs with print(); keep stdout for results
+        stdout, sys.stdout = sys.stdout, sys.stderr
+        try:
+            summary = run_batch(runner, source, out, workers=args.workers, processes=args.processes,
+                                ordered=args.ordered, progress=lambda message: print(message, file=sys.stderr))
+        finally:
+            sys.stdout = stdout
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    print(json.dumps(summary), file=sys.stderr)
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Upstream fixtures for the benchmarks: OpenReview note pages, CVF listing HTML and arXiv Atom entries.
+
+Fixtures recorded from the real services (see `python -m benchmarks.run record`) are read from a
+directory; anything not recorded is synthesized deterministically in the same wire formats.
+"""
+import os
+import json
+import zlib
+import random
+import xml.etree.ElementTree as ET
+from html import escape
+
+# Papers per synthesized venue
+DEFAULT_SIZES = {"openreview": 5000, "cvf": 2500, "arxiv": 1000}
+QUICK_SIZES = {"openreview": 600, "cvf": 300, "arxiv": 120}
+
+TOPICS = [
+    "diffusion models", "graph neural networks", "reinforcement learning", "vision transformers",
+    "large language models", "contrastive learning", "neural radiance fields", "federated learning",
+    "knowledge distillation", "object detection", "semantic segmentation", "adversarial robustness",
+    "meta learning", "point clouds", "optical flow", "speech recognition", "causal inference",
+    "continual learning", "model compression", "image generation", "domain adaptation",
+    "representation learning", "question answering", "mixture of experts", "3d reconstruction",
+]
+ADJECTIVES = ["Efficient", "Scalable", "Robust", "Provable", "Sparse", "Self-Supervised", "Adaptive",
+              "Hierarchical", "Unified", "Lightweight", "Generalizable", "Interpretable"]
+TASKS = ["long-tailed recognition", "video understanding", "molecule design", "autonomous driving",
+         "medical imaging", "code generation", "few-shot classification", "robot manipulation",
+         "text-to-image synthesis", "time series forecasting", "recommendation", "pose estimation"]
+FILLER = ("we propose a novel approach that improves accuracy and reduces compute while remaining simple "
+          "to implement experiments on standard benchmarks show consistent gains over strong baselines "
+          "and ablations analyze the contribution of each component").split()
+NAMES = ["Alice Zhang", "Bob Li", "Carol Wang", "David Chen", "Eve Liu", "Frank Yang", "Grace Huang",
+         "Heidi Zhao", "Ivan Wu", "Judy Xu", "Mallory Sun", "Niaj Zhou", "Olivia Ma", "Peggy Hu"]
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+ARXIV_NS = "http://arxiv.org/schemas/atom"
+
+
+def _rng(*parts):
+    return random.Random(zlib.crc32("/".join(map(str, parts)).encode("utf-8")))
+
+
+def synthetic_paper(rng):
+    topic = rng.choice(TOPICS)
+    title = f"{rng.choice(ADJECTIVES)} {topic.title()} for {rng.choice(TASKS).title()}"
+    sentences = []
+    for _ in range(rng.randint(5, 8)):
+        words = rng.sample(FILLER, 12) + rng.choice(TOPICS).split()
+        rng.shuffle(words)
+        sentences.append(" ".join(words).capitalize() + ".")
+    abstract = f"We study {topic}. " + " ".join(sentences)
+    return {
+        "title": title,
+        "abstract": abstract,
+        "authors": rng.sample(NAMES, rng.randint(2, 6)),
+        "keywords": [topic] + rng.sample(TOPICS, 2),
+    }
+
+
+def openreview_notes(venue, year, status, n):
+    """Raw notes as returned by the notes endpoint (V2 wraps content values for 2023+)."""
+    rng = _rng("openreview", venue, year, status)
+    notes = []
+    for i in range(n):
+        paper = synthetic_paper(rng)
+        note_id = f"{venue[:2]}{year}{i:06d}"
+        content = dict(paper, pdf=f"/pdf/{note_id}.pdf")
+        if int(year) >= 2023:
+            content = {field: {"value": value} for field, value in content.items()}
+        notes.append({"id": note_id, "content": content})
+    return notes
+
+
+def cvf_listing(venue, year, n):
+    """An openaccess.thecvf.com "day=all" listing page with n papers."""
+    rng = _rng("cvf", venue, year)
+    rows = []
+    for i in range(n):
+        paper = synthetic_paper(rng)
+        stem = f"P{i:05d}_{venue}_{year}_paper"
+        authors = "\n".join(
+            f'<form id="form-{i}-{j}" action="/{venue}{year}" method="post" class="authsearch">'
+            f'<input type="hidden" name="query_author" value="{escape(name)}">'
+            f'<a href="#" onclick="document.getElementById(\'form-{i}-{j}\').submit();">{escape(name)}</a>,</form>'
+            for j, name in enumerate(paper["authors"]))
+        rows.append(
+            f'<dt class="ptitle"><br><a href="/content/{venue}{year}/html/{stem}.html">{escape(paper["title"])}</a></dt>\n'
+            f'<dd>\n{authors}\n</dd>\n'
+            f'<dd>[<a href="/content/{venue}{year}/papers/{stem}.pdf">pdf</a>]\n'
+            f'[<a href="/content/{venue}{year}/supplemental/{stem}-supp.pdf">supp</a>]</dd>'
+        )
+    body = "\n".join(rows)
+    return (f'<html><head><meta charset="utf-8"><title>{venue} {year} Open Access Repository</title></head>'
+            f'<body><div id="content"><dl>\n{body}\n</dl></div></body></html>').encode("utf-8")
+
+
+def arxiv_entries(year, n):
+    """Atom <entry> elements (as strings) for an AAAI harvest; a third are other venues."""
+    rng = _rng("arxiv", year)
+    entries = []
+    for i in range(n):
+        paper = synthetic_paper(rng)
+        arxiv_id = f"{str(year)[2:]}{i // 1000 + 1:02d}.{i:05d}"
+        venue = "AAAI" if i % 3 else "IJCAI"
+        authors = "".join(f"<author><name>{escape(name)}</name></author>" for name in paper["authors"])
+        entries.append(
+            f'<entry xmlns="{ATOM_NS}" xmlns:arxiv="{ARXIV_NS}">'
+            f'<id>http://arxiv.org/abs/{arxiv_id}v1</id>'
+            f'<title>{escape(paper["title"])}</title>'
+            f'<summary>  {escape(paper["abstract"])}\n</summary>{authors}'
+            f'<arxiv:comment>Accepted to {venue} {year}</arxiv:comment>'
+            f'<link href="http://arxiv.org/abs/{arxiv_id}v1" rel="alternate" type="text/html"/>'
+            f'<link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}v1" rel="related" type="application/pdf"/>'
+            f'</entry>'
+        )
+    return entries
+
+
+def atom_feed(entries, total):
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<feed xmlns="{ATOM_NS}" xmlns:arxiv="{ARXIV_NS}" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            f'<opensearch:totalResults>{total}</opensearch:totalResults>{"".join(entries)}</feed>').encode("utf-8")
+
+
+def split_feed(content):
+    """(total, entry strings) of a recorded Atom feed page."""
+    ET.register_namespace("", ATOM_NS)
+    ET.register_namespace("arxiv", ARXIV_NS)
+    root = ET.fromstring(content)
+    total = int(root.findtext("{http://a9.com/-/spec/opensearch/1.1/}totalResults") or 0)
+    return total, [ET.tostring(entry, encoding="unicode") for entry in root.findall(f"{{{ATOM_NS}}}entry")]
+
+
+class FixtureSet:
+    """
+    Upstream payloads by venue, served by the stand-in server. Recorded files in directory take
+    precedence; everything else is synthesized on first use with the given sizes.
+    """
+
+    def __init__(self, sizes=None, directory=None):
+        self.sizes = dict(DEFAULT_SIZES, **(sizes or {}))
+        self.directory = directory
+        self._cache = {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name) if self.directory else None
+
+    def _recorded(self, name, binary=False):
+        path = self._path(name)
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        return data if binary else json.loads(data)
+
+    def _get(self, key, name, synthesize, binary=False):
+        if key not in self._cache:
+            recorded = self._recorded(name, binary)
+            self._cache[key] = recorded if recorded is not None else synthesize()
+        return self._cache[key]
+
+    def openreview(self, venue, year, status):
+        name = f"openreview_{venue}_{year}_{status.replace(' ', '_').lower()}.json"
+        return self._get(("openreview", venue, year, status), name,
+                         lambda: openreview_notes(venue, year, status, self.sizes["openreview"]))
+
+    def cvf(self, venue, year):
+        return self._get(("cvf", venue, year), f"cvf_{venue}_{year}.html",
+                         lambda: cvf_listing(venue, year, self.sizes["cvf"]), binary=True)
+
+    def arxiv(self, year):
+        return self._get(("arxiv", year), f"arxiv_aaai_{year}.json",
+                         lambda: arxiv_entries(year, self.sizes["arxiv"]))
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def save(self, name, data):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(name), "wb") as f:
+            f.write(data if isinstance(data, bytes) else json.dumps(data, ensure_ascii=False).encode("utf-8"))
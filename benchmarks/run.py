@@ -0,0 +1,473 @@
+"""
+Offline benchmarks for the search backend.
+
+Every upstream (OpenReview, CVF, arXiv, DeepSeek) is replaced by a local stand-in server replaying
+fixtures, so runs are repeatable and need no network. Each scenario reports wall time, per-stage
+timings (fetch, parse, match, store, index, llm), throughput and peak traced memory as JSON.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --compare results.json
+    python -m benchmarks.run record --fixtures fixtures/ ICLR:2024 CVPR:2023 AAAI:2023
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+import statistics
+import subprocess
+import threading
+import tracemalloc
+import contextlib
+from collections import defaultdict
+
+from benchmarks.fixtures import FixtureSet, DEFAULT_SIZES, QUICK_SIZES, split_feed
+from benchmarks.stub_server import StubUpstream
+
+# One venue per upstream family
+VENUES = {"openreview": ("ICLR", "2024"), "cvf": ("CVPR", "2023"), "aaai": ("AAAI", "2023")}
+KEYWORDS = ["diffusion models", "graph neural networks", "reinforcement learning", "vision transformers",
+            "contrastive learning", "neural radiance fields", "object detection", "mixture of experts",
+            "robust", "efficient", "quantum annealing", "protein folding"]
+RERANK_PROMPT = "efficient diffusion models for video understanding"
+RERANK_CANDIDATES = 200
+
+# Methods timed as stages (stage "fetch" is what remains of a download once these are taken out)
+STAGE_METHODS = {
+    "_normalize_openreview_note": "parse",
+    "_drain_cvf_events": "parse",
+    "_parse_arxiv_entry": "parse",
+    "_store_corpus": "store",
+    "_corpus_index": "index",
+    "_complete": "llm",
+}
+# Stages timed inline by the engine (index lookups, streamed page matching), read from its stage histogram
+HISTOGRAM_STAGES = ("match",)
+
+
+def configure_endpoints(endpoints):
+    """
+    Point the engine at other upstream base URLs (also for an already imported search_engine).
+    Returns the previous URLs, so they can be restored the same way.
+    """
+    import search_engine
+    previous = {name: getattr(search_engine, name) for name in endpoints}
+    os.environ.update(endpoints)
+    for name, url in endpoints.items():
+        setattr(search_engine, name, url)
+    # DeepSeek clients are shared per API key and bound to the base URL they were created with
+    with search_engine._llm_clients_lock:
+        search_engine._llm_clients.clear()
+    return previous
+
+
+class StageTimer:
+    """
+    Accumulates time spent in wrapped engine methods, per stage, while active. Stages are summed
+    across threads, so concurrent stages (e.g. parallel LLM calls) can add up to more than the wall time.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        if not self.active:
+            return
+        with self._lock:
+            self.totals[stage] += seconds
+            self.calls[stage] += 1
+
+
+class Measurement:
+    """Times (and traces the memory of) the measured part of a scenario: `with measurement: ...`."""
+
+    def __init__(self):
+        self.timer = StageTimer()
+        self.wall = None
+        self.peak_memory = None
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._stage_sums = _histogram_stage_sums()
+        self.timer.active = True
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.wall = time.perf_counter() - self._start
+        self.timer.active = False
+        for stage, seconds in _histogram_stage_sums().items():
+            if seconds > self._stage_sums.get(stage, 0.0):
+                self.timer.totals[stage] += seconds - self._stage_sums.get(stage, 0.0)
+        if tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+        return False
+
+
+def _histogram_stage_sums():
+    """Seconds recorded so far in the engine's stage histogram for HISTOGRAM_STAGES, summed over sources."""
+    import metrics
+    sums = defaultdict(float)
+    for (stage, _), (_, seconds) in metrics.STAGE_SECONDS.summary().items():
+        if stage in HISTOGRAM_STAGES:
+            sums[stage] += seconds
+    return sums
+
+
+class Bench:
+    """Shared state of a run: fixtures, the stand-in server and a scratch cache directory per engine."""
+
+    def __init__(self, upstream, root):
+        self.upstream = upstream
+        self.root = root
+        self.measurement = Measurement()
+        self._warm_engine = None
+        self._engines = 0
+
+    def make_engine(self):
+        from corpus_cache import CorpusCache
+        from embeddings import VectorStore
+        from search_engine import SearchEngine, RateLimiter
+
+        self._engines += 1
+        cache_dir = os.path.join(self.root, f"engine{self._engines}")
+        engine = SearchEngine("sk-bench")
+        engine.corpus_cache = CorpusCache(cache_dir)
+        engine.vector_store = VectorStore(cache_dir)
+        engine.llm_cache = None
+        engine.enrich_cvf = False
+        engine._arxiv_limiter = RateLimiter(0)
+        for name, stage in STAGE_METHODS.items():
+            self._time_method(engine, name, stage)
+        return engine
+
+    def _time_method(self, engine, name, stage):
+        method = getattr(engine, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.measurement.timer.add(stage, time.perf_counter() - start)
+        setattr(engine, name, timed)
+
+    def warm_engine(self):
+        """An engine with every benchmark venue downloaded and indexed (built once per run)."""
+        if self._warm_engine is None:
+            engine = self.make_engine()
+            for source, year in VENUES.values():
+                engine.get_index(source, year)
+            self._warm_engine = engine
+        return self._warm_engine
+
+
+# ----------------------------------------------------------------------
+# Scenarios: each measures its interesting part with `with m:` and returns extra metrics
+# ----------------------------------------------------------------------
+def cold_search(family):
+    source, year = VENUES[family]
+
+    def scenario(bench, m):
+        engine = bench.make_engine()
+        with m:
+            results = engine.search(source, year, KEYWORDS[0])
+        corpus = engine.corpus_cache.load(source, year, "Accepted")
+        return {"items": len(corpus["papers"]) if corpus else 0, "results": len(results)}
+    return scenario
+
+
+def cold_stream(family):
+    source, year = VENUES[family]
+
+    def scenario(bench, m):
+        engine = bench.make_engine()
+        first = None
+        with m:
+            results = 0
+            for _ in engine.iter_search(source, year, KEYWORDS[0]):
+                if first is None:
+                    first = time.perf_counter() - m._start
+                results += 1
+        corpus = engine.corpus_cache.load(source, year, "Accepted")
+        return {"items": len(corpus["papers"]) if corpus else 0, "results": results, "first_result_s": first}
+    return scenario
+
+
+def warm_search(bench, m):
+    engine = bench.warm_engine()
+    latencies = []
+    with m:
+        for source, year in VENUES.values():
+            for keyword in KEYWORDS:
+                start = time.perf_counter()
+                engine.search(source, year, keyword)
+                latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "items": len(latencies),
+        "p50_ms": 1000 * latencies[len(latencies) // 2],
+        "p95_ms": 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def search_many(bench, m):
+    engine = bench.warm_engine()
+    keywords = KEYWORDS * 4
+    with m:
+        found = sum(len(engine.search_many(source, year, keywords)) for source, year in VENUES.values())
+    return {"items": found}
+
+
+def _rerank_candidates(engine):
+    source, year = VENUES["openreview"]
+    papers, _ = engine.get_index(source, year)
+    return [papers[i] for i in range(min(RERANK_CANDIDATES, len(papers)))]
+
+
+def rerank(bench, m):
+    engine = bench.warm_engine()
+    candidates = _rerank_candidates(engine)
+    with m:
+        picks = engine.deepseek_rerank_papers(RERANK_PROMPT, candidates)
+    return {"items": len(candidates), "llm_fallback": not all("recommendation_reason" in p for p in picks)}
+
+
+def rerank_stream(bench, m):
+    engine = bench.warm_engine()
+    candidates = _rerank_candidates(engine)
+    first = None
+    with m:
+        picks = []
+        for paper in engine.iter_rerank_papers(RERANK_PROMPT, candidates):
+            if first is None:
+                first = time.perf_counter() - m._start
+            picks.append(paper)
+    return {
+        "items": len(candidates),
+        "first_result_s": first,
+        "llm_fallback": not all("recommendation_reason" in p for p in picks),
+    }
+
+
+SCENARIOS = {
+    "cold_search/openreview": cold_search("openreview"),
+    "cold_search/cvf": cold_search("cvf"),
+    "cold_search/aaai": cold_search("aaai"),
+    "cold_stream/openreview": cold_stream("openreview"),
+    "cold_stream/cvf": cold_stream("cvf"),
+    "warm_search": warm_search,
+    "search_many": search_many,
+    "rerank": rerank,
+    "rerank_stream": rerank_stream,
+}
+
+
+def run_scenario(bench, scenario, repeats, memory):
+    runs = []
+    for i in range(repeats + (1 if memory else 0)):
+        traced = memory and i == repeats
+        if traced:
+            tracemalloc.start()
+        bench.measurement = Measurement()
+        try:
+            extra = scenario(bench, bench.measurement)
+        finally:
+            if traced:
+                tracemalloc.stop()
+        runs.append((bench.measurement, extra, traced))
+
+    timed = [(m, extra) for m, extra, traced in runs if not traced] or [(m, extra) for m, extra, _ in runs]
+    walls = [m.wall for m, _ in timed]
+    stages = defaultdict(list)
+    for m, _ in timed:
+        totals = dict(m.timer.totals)
+        downloaded = sum(totals.get(stage, 0.0) for stage in ("parse", "match", "store", "index"))
+        if "store" in totals:
+            # Time of a corpus download not spent parsing, matching or storing it: network and waiting
+            totals["fetch"] = max(0.0, m.wall - downloaded)
+        for stage, seconds in totals.items():
+            stages[stage].append(seconds)
+
+    extra = timed[-1][1]
+    wall = statistics.median(walls)
+    result = {
+        "runs": len(walls),
+        "wall_s": wall,
+        "wall_s_min": min(walls),
+        "wall_s_max": max(walls),
+        "stages_s": {stage: statistics.median(values) for stage, values in sorted(stages.items())},
+        "items_per_s": extra.get("items", 0) / wall if wall else None,
+    }
+    result.update(extra)
+    traced = [m for m, _, was_traced in runs if was_traced]
+    if traced:
+        result["peak_memory_mb"] = traced[0].peak_memory / 2 ** 20
+    return result
+
+
+def run_benchmarks(quick=False, repeats=None, memory=True, scenarios=None, fixtures_dir=None,
+                   latency=0.0, llm_latency=0.0, sizes=None):
+    """Run the selected scenarios against the stand-in server and return the results document."""
+    sizes = dict(QUICK_SIZES if quick else DEFAULT_SIZES, **(sizes or {}))
+    repeats = repeats or (1 if quick else 3)
+    names = scenarios or list(SCENARIOS)
+    fixtures = FixtureSet(sizes, fixtures_dir)
+
+    root = tempfile.mkdtemp(prefix="search-bench-")
+    try:
+        # The engine logs with print(); keep stdout for the JSON document
+        with StubUpstream(fixtures, latency=latency, llm_latency=llm_latency) as upstream, \
+                contextlib.redirect_stdout(sys.stderr):
+            previous = configure_endpoints(upstream.endpoints())
+            try:
+                bench = Bench(upstream, root)
+                results = {}
+                for name in names:
+                    print(f"Running {name}...", file=sys.stderr)
+                    results[name] = run_scenario(bench, SCENARIOS[name], repeats, memory)
+            finally:
+                configure_endpoints(previous)
+            requests_served = dict(upstream.requests)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "repeats": repeats,
+            "sizes": sizes,
+            "fixtures": fixtures_dir or "synthetic",
+            "latency_s": latency,
+            "llm_latency_s": llm_latency,
+            "requests": requests_served,
+        },
+        "scenarios": results,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(baseline, current, threshold=0.1):
+    """Rows of (scenario, metric, old, new, relative change, regressed) for scenarios in both runs."""
+    rows = []
+    for name, new in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        for metric in ("wall_s", "peak_memory_mb"):
+            if old.get(metric) and new.get(metric) is not None:
+                change = new[metric] / old[metric] - 1
+                rows.append((name, metric, old[metric], new[metric], change, change > threshold))
+    return rows
+
+
+# ----------------------------------------------------------------------
+# Recording real upstream responses as fixtures
+# ----------------------------------------------------------------------
+def record(venues, directory, statuses=("Accepted",)):
+    """Download the upstream payloads of venues ("ICLR:2024", ...) into a fixtures directory."""
+    from search_engine import (SearchEngine, OPENREVIEW_VENUES, CVF_VENUES, CVF_HEADERS, ARXIV_PAGE_SIZE,
+                               AAAI_HARVEST_MAX)
+
+    engine = SearchEngine()
+    fixtures = FixtureSet(directory=directory)
+    for venue in venues:
+        source, year = venue.split(":", 1)
+        if source in OPENREVIEW_VENUES:
+            client = engine._openreview_client(year)
+            for status in statuses:
+                for query in engine._openreview_queries(source, year, status):
+                    notes, count = engine._get_openreview_page(client, query, with_count=True)
+                    if not notes:
+                        continue
+                    pages = [notes] + list(engine._iter_openreview_note_pages(client, query, notes, count))
+                    notes = [note for page in pages for note in page]
+                    fixtures.save(f"openreview_{source}_{year}_{status.replace(' ', '_').lower()}.json", notes)
+                    print(f"Recorded {len(notes)} {source} {year} ({status}) notes")
+                    break
+        elif source in CVF_VENUES:
+            for url in engine._cvf_listing_urls(source, year):
+                response = engine.session.get(url, headers=CVF_HEADERS, verify=False, timeout=120)
+                if response.status_code == 200:
+                    fixtures.save(f"cvf_{source}_{year}.html", response.content)
+                    print(f"Recorded {source} {year} listing ({len(response.content)} bytes)")
+                    break
+        elif source == "AAAI":
+            entries = []
+            start = 0
+            while start < AAAI_HARVEST_MAX:
+                response = engine._arxiv_get({'search_query': engine._aaai_query(year), 'start': start,
+                                              'max_results': ARXIV_PAGE_SIZE})
+                response.raise_for_status()
+                total, page = split_feed(response.content)
+                entries.extend(page)
+                start += len(page)
+                if not page or start >= total:
+                    break
+            fixtures.save(f"arxiv_aaai_{year}.json", entries)
+            print(f"Recorded {len(entries)} arXiv entries for AAAI {year}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for Simple-Search-AI")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "record"])
+    parser.add_argument("venues", nargs="*", help="record: CONFERENCE:YEAR pairs")
+    parser.add_argument("--quick", action="store_true", help="small fixtures and a single repeat")
+    parser.add_argument("--repeats", type=int, help="timed runs per scenario (median is reported)")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--no-memory", action="store_true", help="skip the extra traced run for peak memory")
+    parser.add_argument("--fixtures", help="directory of recorded fixtures (default: synthetic only)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every upstream request")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds added to every DeepSeek call")
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        if not args.fixtures or not args.venues:
+            parser.error("record needs --fixtures DIR and CONFERENCE:YEAR venues")
+        record(args.venues, args.fixtures)
+        return 0
+
+    results = run_benchmarks(quick=args.quick, repeats=args.repeats, memory=not args.no_memory,
+                             scenarios=args.scenario, fixtures_dir=args.fixtures,
+                             latency=args.latency, llm_latency=args.llm_latency)
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+    regressed = False
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, metric, old, new, change, worse in compare(baseline, results, args.threshold):
+            regressed = regressed or worse
+            print(f"{name:26} {metric:15} {old:10.4f} -> {new:10.4f} {change:+7.1%}{'  REGRESSION' if worse else ''}",
+                  file=sys.stderr)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
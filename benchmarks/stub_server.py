@@ -0,0 +1,237 @@
+"""
+Local stand-in for the upstream services, serving a FixtureSet over HTTP:
+
+    /openreview/v1/notes, /openreview/v2/notes   OpenReview notes endpoint (paging, count)
+    /cvf/<VENUE><YEAR>                           CVF Open Access listing (GET and HEAD, ETag)
+    /arxiv/query                                 arXiv API Atom feed (start / max_results)
+    /deepseek/chat/completions                   DeepSeek chat completions (JSON and SSE streaming)
+
+Latencies are injected per request so runs can model a remote network.
+"""
+import re
+import json
+import time
+import threading
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from benchmarks.fixtures import atom_feed
+
+VENUE_ID_RE = re.compile(r"^(\w+)\.cc/(\d{4})/Conference$")
+INVITATION_RE = re.compile(r"^(\w+)\.cc/(\d{4})/Conference/-/(Blind_Submission|Submission)$")
+ARXIV_YEAR_RE = re.compile(r"co:(\d{4})")
+CANDIDATE_RE = re.compile(r"\[(\d+)\] Title: (.*)")
+QUERY_RE = re.compile(r'用户查询: "(.*)"')
+TOP_N_RE = re.compile(r"Top (\d+)")
+WORD_RE = re.compile(r"\w+")
+
+
+def fake_llm_answer(messages):
+    """A deterministic DeepSeek answer in the JSON shape each of the engine's prompts asks for."""
+    system = messages[0]["content"]
+    prompt = messages[-1]["content"]
+    match = QUERY_RE.search(prompt)
+    query_words = set(WORD_RE.findall((match.group(1) if match else prompt).lower()))
+
+    if "打分" in system or "scores" in prompt:
+        candidates = CANDIDATE_RE.findall(prompt)
+        scores = [{"id": int(i), "score": min(10, 2 * len(query_words & set(WORD_RE.findall(title.lower()))))}
+                  for i, title in candidates]
+        return json.dumps({"scores": scores})
+    if "recommendations" in prompt:
+        candidates = CANDIDATE_RE.findall(prompt)
+        top_n = int(TOP_N_RE.search(prompt).group(1)) if TOP_N_RE.search(prompt) else 25
+        ranked = sorted(candidates, key=lambda c: (-len(query_words & set(WORD_RE.findall(c[1].lower()))), int(c[0])))
+        picks = [{"id": int(i), "reason": f"Matches the query on {title[:40]}"} for i, title in ranked[:top_n]]
+        return json.dumps({"recommendations": picks}, ensure_ascii=False)
+    words = sorted(query_words, key=len, reverse=True)
+    return json.dumps({"keywords": [" ".join(words[i:i + 2]) for i in range(0, min(len(words), 8), 2)] or [prompt]})
+
+
+class StubUpstream:
+    """
+    Threaded HTTP server answering for OpenReview, CVF, arXiv and DeepSeek from a FixtureSet.
+    Use as a context manager; requests counts served requests per service.
+    """
+
+    def __init__(self, fixtures, latency=0.0, llm_latency=0.0, llm_chunk_delay=0.0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.llm_latency = llm_latency
+        self.llm_chunk_delay = llm_chunk_delay
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def endpoints(self):
+        """Base URLs in the form search_engine reads them (see the *_URL settings there)."""
+        return {
+            "OPENREVIEW_API_V1_URL": f"{self.url}/openreview/v1",
+            "OPENREVIEW_API_V2_URL": f"{self.url}/openreview/v2",
+            "CVF_BASE_URL": f"{self.url}/cvf",
+            "ARXIV_API_URL": f"{self.url}/arxiv/query",
+            "DEEPSEEK_BASE_URL": f"{self.url}/deepseek",
+        }
+
+    def start(self):
+        upstream = self
+
+        class Handler(StubHandler):
+            server_upstream = upstream
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-upstream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+        return False
+
+    def count(self, service):
+        with self._lock:
+            self.requests[service] += 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_upstream = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    def do_GET(self):
+        self._dispatch(head=False)
+
+    def do_HEAD(self):
+        self._dispatch(head=True)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if url.path.endswith("/chat/completions"):
+            self.server_upstream.count("deepseek")
+            return self._chat_completion(json.loads(body))
+        self._send(404, b"{}")
+
+    def _dispatch(self, head):
+        upstream = self.server_upstream
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if upstream.latency:
+            time.sleep(upstream.latency)
+
+        if url.path.startswith("/openreview/") and url.path.endswith("/notes"):
+            upstream.count("openreview")
+            return self._notes(params)
+        if url.path.startswith("/cvf/"):
+            upstream.count("cvf")
+            return self._cvf_listing(url.path[len("/cvf/"):], head)
+        if url.path == "/arxiv/query":
+            upstream.count("arxiv")
+            return self._arxiv(params)
+        self._send(404, b"{}")
+
+    def _send(self, status, body, content_type="application/json", headers=None, head=False):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    # ------------------------------------------------------------------
+    # Services
+    # ------------------------------------------------------------------
+    def _notes(self, params):
+        venue_id = VENUE_ID_RE.match(params.get("content.venueid", ""))
+        invitation = INVITATION_RE.match(params.get("invitation", ""))
+        if venue_id:
+            notes = self.server_upstream.fixtures.openreview(venue_id.group(1), venue_id.group(2), "Accepted")
+        elif invitation:
+            venue, year, kind = invitation.groups()
+            # Submissions are "Blind_Submission" notes before 2023 and "Submission" notes after
+            current = "Submission" if int(year) >= 2023 else "Blind_Submission"
+            notes = self.server_upstream.fixtures.openreview(venue, year, "Under Review") if kind == current else []
+        else:
+            notes = []
+
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 1000))
+        data = {"notes": notes[offset:offset + limit]}
+        if params.get("count") == "true":
+            data["count"] = len(notes)
+        self._send(200, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    def _cvf_listing(self, name, head):
+        match = re.match(r"^([A-Z]+)(\d{4})$", name)
+        if not match:
+            return self._send(404, b"", "text/html", head=head)
+        listing = self.server_upstream.fixtures.cvf(*match.groups())
+        etag = f'"{len(listing):x}"'
+        self._send(200, listing, "text/html; charset=utf-8", {"ETag": etag}, head=head)
+
+    def _arxiv(self, params):
+        match = ARXIV_YEAR_RE.search(params.get("search_query", ""))
+        entries = self.server_upstream.fixtures.arxiv(match.group(1)) if match else []
+        start = int(params.get("start", 0))
+        size = int(params.get("max_results", 10))
+        self._send(200, atom_feed(entries[start:start + size], len(entries)), "application/atom+xml")
+
+    def _chat_completion(self, request):
+        upstream = self.server_upstream
+        if upstream.llm_latency:
+            time.sleep(upstream.llm_latency)
+        content = fake_llm_answer(request["messages"])
+        created = int(time.time())
+        if not request.get("stream"):
+            body = {
+                "id": "chatcmpl-bench", "object": "chat.completion", "created": created, "model": request["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+            return self._send(200, json.dumps(body, ensure_ascii=False).encode("utf-8"))
+
+        # Server-sent events, one small piece of the answer per chunk
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+        for i, piece in enumerate(pieces):
+            chunk = {
+                "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": created, "model": request["model"],
+                "choices": [{"index": 0, "delta": {"content": piece},
+                             "finish_reason": "stop" if i == len(pieces) - 1 else None}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            if upstream.llm_chunk_delay:
+                time.sleep(upstream.llm_chunk_delay)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
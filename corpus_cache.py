@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+from paper_store import PaperStore
+
+# Where venue corpora are persisted. Override with SEARCH_CACHE_DIR for deployments.
+CACHE_DIR = os.getenv("SEARCH_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+# Freshness rules (seconds)
+# Accepted lists of past years are frozen, the current year can still get camera-ready edits,
+# and "Under Review" submissions change daily during review season.
+ACCEPTED_TTL = 30 * 24 * 3600
+CURRENT_YEAR_TTL = 24 * 3600
+UNDER_REVIEW_TTL = 6 * 3600
+
+
+def corpus_ttl(year, status):
+    if status == "Under Review":
+        return UNDER_REVIEW_TTL
+    if int(year) >= datetime.now().year:
+        return CURRENT_YEAR_TTL
+    return ACCEPTED_TTL
+
+
+class CorpusCache:
+    """
+    Persistent store of normalized paper records, one file per (source, year, status).
+    Entries hold their papers as a columnar PaperStore, both in memory and (column-wise) on disk,
+    and are kept in memory after the first load so repeated keyword searches never touch disk.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.join(cache_dir or CACHE_DIR, "corpus")
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def key(self, source, year, status="Accepted"):
+        return f"{source}_{year}_{status.replace(' ', '_').lower()}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def ttl(self, year, status):
+        return corpus_ttl(year, status)
+
+    def load(self, source, year, status="Accepted"):
+        """Return the cached entry ({"papers", "fetched_at", "validator", ...}) or None."""
+        key = self.key(source, year, status)
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None:
+            return entry
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            # Columnar files load straight into a store; older list-of-dicts files are converted
+            papers = entry["papers"]
+            entry["papers"] = PaperStore.from_columns(papers) if isinstance(papers, dict) else PaperStore.from_papers(papers)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable corpus cache {path}: {e}")
+            return None
+
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def save(self, source, year, status, papers, validator=None):
+        key = self.key(source, year, status)
+        now = time.time()
+        entry = {
+            "source": source,
+            "year": str(year),
+            "status": status,
+            "fetched_at": now,
+            # Changes whenever the papers do (download or in-place update); see version()
+            "updated_at": now,
+            "validator": validator,
+            "papers": PaperStore.from_papers(papers),
+        }
+        with self._lock:
+            self._memory[key] = entry
+            self._write(key, entry)
+        return entry
+
+    def touch(self, entry):
+        """Mark a revalidated entry as fresh again without re-downloading it."""
+        entry["fetched_at"] = time.time()
+        key = self.key(entry["source"], entry["year"], entry["status"])
+        with self._lock:
+            self._write(key, entry)
+
+    def persist(self, entry):
+        """Write an entry whose papers were updated in place (e.g. enriched abstracts)."""
+        entry["updated_at"] = time.time()
+        key = self.key(entry["source"], entry["year"], entry["status"])
+        with self._lock:
+            self._write(key, entry)
+
+    def version(self, entry):
+        """Identifies the content of an entry: results computed from it stay valid while this is unchanged."""
+        return f"{entry.get('updated_at', entry.get('fetched_at'))}"
+
+    def is_fresh(self, entry):
+        age = time.time() - entry.get("fetched_at", 0)
+        return age < self.ttl(entry["year"], entry["status"])
+
+    def _write(self, key, entry):
+        # Write to a temp file first so a crash never leaves a truncated corpus behind
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(entry, papers=entry["papers"].to_columns()), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not persist corpus cache {path}: {e}")
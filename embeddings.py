@@ -0,0 +1,299 @@
+import os
+import json
+import zlib
+import math
+import hashlib
+import threading
+
+import numpy as np
+
+from corpus_cache import CACHE_DIR
+from search_index import tokenize
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# sentence-transformers model used when the package is installed; set to "hash" to force the hashing embedder
+EMBEDDING_MODEL = os.getenv("SEARCH_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBED_BATCH_SIZE = 256
+
+# IVF settings: corpora smaller than this are scanned exhaustively (already a few milliseconds)
+ANN_MIN_ROWS = 2000
+ANN_PROBES = 8
+ANN_KMEANS_ITERATIONS = 10
+ANN_KMEANS_SAMPLE = 20000
+
+
+def paper_text(paper):
+    return f"{paper.get('title', '')}. {paper.get('abstract') or ''}"
+
+
+def _row_key(paper):
+    # A row is re-embedded when its paper gains an abstract (CVF enrichment)
+    return f"{paper['link']}|{1 if paper.get('abstract') else 0}"
+
+
+class HashingEmbedder:
+    """
+    Dependency-free CPU embedder: unigrams and bigrams hashed into a fixed number of signed buckets,
+    log-scaled and L2-normalized. Lexical rather than semantic, but needs no model download.
+    """
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.name = f"hash{dim}"
+        self._token_hashes = {}
+
+    def _token_hash(self, token):
+        # crc32 is stable across processes, unlike hash()
+        h = self._token_hashes.get(token)
+        if h is None:
+            h = self._token_hashes[token] = zlib.crc32(token.encode("utf-8"))
+        return h
+
+    def embed(self, texts):
+        # Only the token -> hash lookup is per token in Python; bigram hashing, term counting and
+        # bucket accumulation are done for the whole batch with numpy
+        hashes, rows = [], []
+        token_hash = self._token_hash
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            hashes.extend([token_hash(t) for t in tokens])
+            rows.extend([row] * len(tokens))
+        hashes = np.array(hashes, dtype=np.uint64)
+        rows = np.array(rows, dtype=np.uint64)
+
+        same_doc = rows[:-1] == rows[1:]
+        bigrams = (hashes[:-1][same_doc] * np.uint64(1000003) + hashes[1:][same_doc]) & np.uint64(0xFFFFFFFF)
+        features = np.concatenate([hashes, bigrams])
+        feature_rows = np.concatenate([rows, rows[:-1][same_doc]])
+
+        keys, counts = np.unique((feature_rows << np.uint64(32)) | features, return_counts=True)
+        features = keys & np.uint64(0xFFFFFFFF)
+        cols = (keys >> np.uint64(32)) * np.uint64(self.dim) + features % np.uint64(self.dim)
+        signs = np.where((features >> np.uint64(31)) & np.uint64(1), 1.0, -1.0)
+        flat = np.bincount(cols.astype(np.int64), weights=signs * (1.0 + np.log(counts)),
+                           minlength=len(texts) * self.dim)
+
+        vectors = flat.reshape(len(texts), self.dim).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Small CPU sentence-transformers model, embedding in batches."""
+
+    def __init__(self, model_name):
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = model_name.replace("/", "_")
+
+    def embed(self, texts):
+        return self.model.encode(list(texts), batch_size=EMBED_BATCH_SIZE, normalize_embeddings=True,
+                                 convert_to_numpy=True).astype(np.float32)
+
+
+def get_embedder():
+    if EMBEDDING_MODEL and EMBEDDING_MODEL != "hash" and SentenceTransformer is not None:
+        try:
+            return SentenceTransformerEmbedder(EMBEDDING_MODEL)
+        except Exception as e:
+            print(f"Could not load embedding model {EMBEDDING_MODEL}, using hashing embedder: {e}")
+    return HashingEmbedder()
+
+
+class AnnIndex:
+    """
+    Inverted-file (IVF) index over a row-normalized matrix: rows are clustered with spherical
+    k-means and stored list by list, so a query scores the centroids, then only the rows of its
+    n_probe closest lists (each a contiguous slice of the matrix).
+    """
+
+    def __init__(self, matrix, centroids, order, offsets):
+        self.matrix = matrix        # rows grouped by list (float16, possibly memory-mapped)
+        self.centroids = centroids
+        self.order = order          # position in matrix -> original row
+        self.offsets = offsets      # list i covers matrix[offsets[i]:offsets[i + 1]]
+
+    @classmethod
+    def build(cls, matrix, seed=0):
+        n = matrix.shape[0]
+        if n < ANN_MIN_ROWS:
+            return cls(matrix, None, np.arange(n), np.array([0, n]))
+
+        n_lists = int(math.sqrt(n))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(matrix[rng.choice(n, min(n, ANN_KMEANS_SAMPLE), replace=False)], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(ANN_KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assignment == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+        assignment = np.concatenate([
+            np.argmax(np.asarray(matrix[i:i + 8192], dtype=np.float32) @ centroids.T, axis=1)
+            for i in range(0, n, 8192)
+        ])
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        return cls(np.asarray(matrix)[order], centroids, order, offsets)
+
+    def search(self, query_vector, k=50, n_probe=ANN_PROBES):
+        """Return [(row, similarity)] of the (approximately) k nearest rows, best first."""
+        if self.centroids is None:
+            positions = np.arange(self.matrix.shape[0])
+        else:
+            lists = np.argsort(-(self.centroids @ query_vector))[:n_probe]
+            positions = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists])
+        if not len(positions):
+            return []
+
+        if self.centroids is None:
+            scores = np.asarray(self.matrix, dtype=np.float32) @ query_vector
+        else:
+            scores = np.concatenate([
+                np.asarray(self.matrix[self.offsets[c]:self.offsets[c + 1]], dtype=np.float32) @ query_vector
+                for c in lists
+            ])
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.order[positions[i]]), float(scores[i])) for i in top]
+
+
+class VectorStore:
+    """
+    Embedding matrices of venue corpora, saved next to the corpus cache as float16 .npy files
+    (memory-mapped on load). A new corpus version only embeds its new or changed papers; the other
+    rows are copied from the previous matrix.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.vector_dir = os.path.join(cache_dir or CACHE_DIR, "vectors")
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, papers):
+        # Changes when papers are added/removed or gain an abstract (CVF enrichment)
+        digest = hashlib.sha1()
+        for paper in papers:
+            digest.update(f"{_row_key(paper)}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key, papers, embedder):
+        """Return (matrix, {link: row}) for a corpus, embedding only the papers no saved copy covers."""
+        name = f"{key}.{embedder.name}"
+        fingerprint = self.fingerprint(papers)
+        with self._lock:
+            cached = self._memory.get(name)
+        if cached is None:
+            cached = self._load(name)
+        if cached is not None and cached[0] == fingerprint:
+            matrix, keys = cached[1], cached[3]
+        else:
+            keys = [_row_key(paper) for paper in papers]
+            matrix = self._embed(key, papers, keys, embedder, cached)
+            self._save(name, fingerprint, matrix, keys)
+
+        rows = {paper["link"]: i for i, paper in enumerate(papers)}
+        with self._lock:
+            self._memory[name] = (fingerprint, matrix, rows, keys)
+        return matrix, rows
+
+    def _embed(self, key, papers, keys, embedder, previous):
+        """Matrix rows for keys: copied from previous (fingerprint, matrix, rows, keys) where unchanged."""
+        if not papers:
+            return np.zeros((0, 1), dtype=np.float16)
+        previous_rows = {row_key: i for i, row_key in enumerate(previous[3])} if previous is not None else {}
+        reused = [i for i, row_key in enumerate(keys) if row_key in previous_rows]
+        missing = [i for i, row_key in enumerate(keys) if row_key not in previous_rows]
+        print(f"Embedding {len(missing)} of {len(papers)} papers for {key}...")
+
+        fresh = np.concatenate([
+            embedder.embed([paper_text(papers[i]) for i in missing[j:j + EMBED_BATCH_SIZE]])
+            for j in range(0, len(missing), EMBED_BATCH_SIZE)
+        ]).astype(np.float16) if missing else None
+        dim = fresh.shape[1] if fresh is not None else previous[1].shape[1]
+        matrix = np.empty((len(papers), dim), dtype=np.float16)
+        if reused:
+            matrix[reused] = np.asarray(previous[1])[[previous_rows[keys[i]] for i in reused]]
+        if missing:
+            matrix[missing] = fresh
+        return matrix
+
+    def index(self, key, papers, embedder):
+        """Return the AnnIndex of a corpus, building (and saving) it once per corpus version."""
+        matrix, _ = self.get(key, papers, embedder)
+        name = f"{key}.{embedder.name}"
+        fingerprint = self.fingerprint(papers)
+        with self._lock:
+            cached = self._memory.get(f"{name}.ivf")
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        index = self._load_index(name, fingerprint)
+        if index is None:
+            index = AnnIndex.build(matrix)
+            self._save_index(name, fingerprint, index)
+        with self._lock:
+            self._memory[f"{name}.ivf"] = (fingerprint, index)
+        return index
+
+    def _paths(self, name):
+        base = os.path.join(self.vector_dir, name)
+        return f"{base}.npy", f"{base}.json"
+
+    def _load(self, name):
+        """The saved copy as (fingerprint, matrix, None, row keys), whatever corpus version it is of."""
+        matrix_path, meta_path = self._paths(name)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            matrix = np.load(matrix_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        keys = meta.get("keys")
+        if not isinstance(keys, list) or len(keys) != matrix.shape[0]:
+            return None
+        return meta.get("fingerprint"), matrix, None, keys
+
+    def _save(self, name, fingerprint, matrix, keys):
+        os.makedirs(self.vector_dir, exist_ok=True)
+        matrix_path, meta_path = self._paths(name)
+        try:
+            np.save(f"{matrix_path}.tmp.npy", matrix)
+            os.replace(f"{matrix_path}.tmp.npy", matrix_path)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "rows": int(matrix.shape[0]), "keys": keys}, f)
+        except OSError as e:
+            print(f"Could not persist vectors {matrix_path}: {e}")
+
+    def _load_index(self, name, fingerprint):
+        base = os.path.join(self.vector_dir, f"{name}.ivf")
+        try:
+            with open(f"{base}.json", "r", encoding="utf-8") as f:
+                if json.load(f).get("fingerprint") != fingerprint:
+                    return None
+            lists = np.load(f"{base}.npz")
+            centroids = lists["centroids"] if lists["centroids"].size else None
+            return AnnIndex(np.load(f"{base}.npy", mmap_mode="r"), centroids, lists["order"], lists["offsets"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_index(self, name, fingerprint, index):
+        base = os.path.join(self.vector_dir, f"{name}.ivf")
+        centroids = index.centroids if index.centroids is not None else np.zeros((0,), dtype=np.float32)
+        try:
+            os.makedirs(self.vector_dir, exist_ok=True)
+            np.save(f"{base}.tmp.npy", index.matrix)
+            os.replace(f"{base}.tmp.npy", f"{base}.npy")
+            np.savez(f"{base}.tmp.npz", centroids=centroids, order=index.order, offsets=index.offsets)
+            os.replace(f"{base}.tmp.npz", f"{base}.npz")
+            with open(f"{base}.json", "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "lists": int(len(index.offsets) - 1)}, f)
+        except OSError as e:
+            print(f"Could not persist vector index {base}: {e}")
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from corpus_cache import CACHE_DIR
+
+# Keyword extractions and rankings for the same prompt and candidates don't go stale quickly
+LLM_CACHE_TTL = 7 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = 5000
+
+
+class LLMCache:
+    """
+    Persistent, content-addressed cache of LLM responses shared by every session.
+
+    The key hashes the model with the full request (messages and options), so it changes with the
+    prompt and with the candidate papers embedded in it. Entries expire after ttl seconds and the
+    least recently used ones are evicted beyond max_entries.
+    """
+
+    def __init__(self, path=None, max_entries=LLM_CACHE_MAX_ENTRIES, ttl=LLM_CACHE_TTL):
+        self.path = path or os.path.join(CACHE_DIR, "llm_cache.sqlite3")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # The database is created on first use, so engines that never call the LLM leave no file
+        self._ready = False
+
+    def _connect(self):
+        # One short-lived connection per operation keeps the cache usable from any thread
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        if not self._ready:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    content TEXT,
+                    created_at REAL,
+                    last_used REAL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            db.commit()
+            self._ready = True
+        return db
+
+    def key(self, model, messages, **options):
+        payload = json.dumps({"model": model, "messages": messages, "options": options},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached response content, or None if missing or expired."""
+        now = time.time()
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT content, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] < self.ttl:
+                db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return row[0]
+            if row is not None:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+
+    def put(self, key, model, content):
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (key, model, content, now, now))
+            # Evict expired entries, then the least recently used ones beyond the size bound
+            db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            db.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def __len__(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
@@ -0,0 +1,391 @@
+import os
+import io
+import time
+import pstats
+import bisect
+import cProfile
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from corpus_cache import CACHE_DIR
+
+# Latency buckets (seconds) shared by every stage histogram
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Set SEARCH_METRICS_PORT to serve the Prometheus text format on http://<host>:<port>/metrics
+METRICS_PORT = os.getenv("SEARCH_METRICS_PORT")
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+
+
+def _label_key(labelnames, labels):
+    missing = set(labelnames) - set(labels)
+    if missing:
+        raise ValueError(f"missing labels: {sorted(missing)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """Monotonic counter with labels, rendered in the Prometheus text format."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _format_labels(self.labelnames, key), value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in the Prometheus text format."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}   # label key -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    def summary(self):
+        """{label values: (count, sum)}"""
+        with self._lock:
+            return {key: (sum(counts[:-1]), counts[-1]) for key, counts in self._values.items()}
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            items = sorted((key, list(counts)) for key, counts in self._values.items())
+        for key, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                samples.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, [("le", le)]), cumulative))
+            samples.append((f"{self.name}_sum", _format_labels(self.labelnames, key), counts[-1]))
+            samples.append((f"{self.name}_count", _format_labels(self.labelnames, key), cumulative))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "search_stage_seconds", "Time spent per pipeline stage (fetch, parse, normalize, match, index, store, llm, ...).",
+    ("stage", "source")))
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "search_upstream_requests_total", "HTTP requests made to upstream services, by response status.",
+    ("service", "status")))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "search_cache_requests_total", "Cache lookups by cache and outcome.", ("cache", "result")))
+LLM_CALLS = REGISTRY.register(Counter(
+    "search_llm_calls_total", "DeepSeek calls by purpose and whether they were answered from the LLM cache.",
+    ("purpose", "cached")))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "search_llm_tokens_total", "DeepSeek tokens by purpose and direction (prompt or completion).",
+    ("purpose", "direction")))
+PAPERS_PROCESSED = REGISTRY.register(Counter(
+    "search_papers_total", "Paper records downloaded and normalized, by source.", ("source",)))
+
+
+def render():
+    return REGISTRY.render()
+
+
+def count_request(service, status):
+    UPSTREAM_REQUESTS.inc(service=service, status=status)
+
+
+def count_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def count_llm(purpose, cached, prompt_tokens=0, completion_tokens=0):
+    LLM_CALLS.inc(purpose=purpose, cached=str(bool(cached)).lower())
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, purpose=purpose, direction="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, purpose=purpose, direction="completion")
+
+
+def estimate_tokens(text):
+    # ~4 characters per token, the same rule the rerank prompt budget uses
+    return len(text) // 4
+
+
+# ----------------------------------------------------------------------
+# Stage timing and per-request traces
+# ----------------------------------------------------------------------
+_current_trace = contextvars.ContextVar("search_trace", default=None)
+
+
+class Trace:
+    """Spans (stage, source, start offset, duration, thread) recorded while a request runs."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, stage, source, start, duration):
+        with self._lock:
+            self.spans.append({
+                "stage": stage,
+                "source": source,
+                "start": start - self.started,
+                "duration": duration,
+                "thread": threading.current_thread().name,
+            })
+
+    def summary(self):
+        """{stage: total seconds} over every span; concurrent spans add up past the wall time."""
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span["stage"]] = totals.get(span["stage"], 0.0) + span["duration"]
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["start"])
+        return {"name": self.name, "duration": self.duration, "summary": self.summary(), "spans": spans}
+
+
+@contextmanager
+def trace(name):
+    """Record the spans of every stage run inside the block (and in threads started via bind)."""
+    current = Trace(name)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - current.started
+        _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def bind(fn):
+    """Wrap fn so that, run on a worker thread, it records into the caller's current trace."""
+    parent = _current_trace.get()
+    if parent is None:
+        return fn
+
+    def bound(*args, **kwargs):
+        token = _current_trace.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_trace.reset(token)
+    return bound
+
+
+def observe_stage(stage, seconds, source="", start=None):
+    STAGE_SECONDS.observe(seconds, stage=stage, source=source)
+    current = _current_trace.get()
+    if current is not None:
+        current.add(stage, source, start if start is not None else time.perf_counter() - seconds, seconds)
+
+
+@contextmanager
+def stage(name, source=""):
+    """Time the block as one observation of a stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start, source, start)
+
+
+class Stopwatch:
+    """
+    Accumulates the time of many short sections (per-paper matching, parser feeds, network reads of a
+    streamed body) and records them as one stage observation.
+    """
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self.started = time.perf_counter()
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.elapsed += time.perf_counter() - self._start
+        return False
+
+    def iterate(self, iterable):
+        """Yield from iterable, timing only the waits for each next item."""
+        iterator = iter(iterable)
+        while True:
+            with self:
+                item = next(iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+
+    def reader(self, raw):
+        """A file-like wrapper of raw whose read() calls are timed."""
+        return _TimedReader(raw, self)
+
+    def observe(self, stage, source="", minus=0.0):
+        observe_stage(stage, max(0.0, self.elapsed - minus), source, self.started)
+
+
+_DONE = object()
+
+
+class _TimedReader:
+    def __init__(self, raw, stopwatch):
+        self._raw = raw
+        self._stopwatch = stopwatch
+
+    def read(self, *args):
+        with self._stopwatch:
+            return self._raw.read(*args)
+
+
+# ----------------------------------------------------------------------
+# Profiling
+# ----------------------------------------------------------------------
+class ProfileCapture:
+    """Result of profile(): cProfile stats of the calling thread for the profiled block."""
+
+    def __init__(self, name):
+        self.name = name
+        self.profiler = cProfile.Profile()
+        self.path = None
+
+    def stats_text(self, limit=30, sort="cumulative"):
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self, directory=PROFILE_DIR):
+        """Save the stats (loadable with pstats or snakeviz) and return the file path."""
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        self.profiler.dump_stats(self.path)
+        return self.path
+
+
+@contextmanager
+def profile(name="search", enabled=True):
+    """
+    Capture a cProfile of the block when enabled (yields None otherwise). Only the calling thread is
+    profiled; work on pool threads shows up as time waiting on their futures.
+    """
+    if not enabled:
+        yield None
+        return
+    capture = ProfileCapture(name)
+    try:
+        capture.profiler.enable()
+    except ValueError as e:
+        # Another profiler is already active in this thread
+        print(f"Profiler unavailable: {e}")
+        yield None
+        return
+    try:
+        yield capture
+    finally:
+        capture.profiler.disable()
+
+
+# ----------------------------------------------------------------------
+# HTTP exposition
+# ----------------------------------------------------------------------
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    """Serve /metrics on a daemon thread (once per process). Returns the server, or None without a port."""
+    global _server
+    port = port or METRICS_PORT
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            except OSError as e:
+                print(f"Could not serve metrics on port {port}: {e}")
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+            print(f"Serving metrics on http://{host}:{port}/metrics")
+    return _server
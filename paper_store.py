@@ -0,0 +1,249 @@
+import sys
+from array import array
+from collections.abc import MutableMapping, Sequence
+
+# Keys of a normalized paper record, in display order
+FIELDS = ("title", "authors", "abstract", "keywords", "link", "pdf", "status")
+
+
+def intern(text):
+    # str() turns str subclasses (e.g. lxml's smart strings) into plain strings that can be interned
+    return sys.intern(str(text))
+
+
+def split_url(url):
+    """Split a URL into a shared prefix (up to the last "/" or "=") and its paper-specific id."""
+    cut = max(url.rfind("/"), url.rfind("=")) + 1
+    return url[:cut], url[cut:]
+
+
+class StringColumn:
+    """
+    Short strings (URL ids) stored back to back in one str and sliced out on access, instead of one
+    str object per paper. Appends are buffered and packed on the next read.
+    """
+    __slots__ = ("_text", "_offsets", "_pending")
+
+    def __init__(self, strings=()):
+        self._text = ""
+        self._offsets = array("I", [0])
+        self._pending = list(strings)
+        self._pack()
+
+    def append(self, text):
+        self._pending.append(text)
+
+    def _pack(self):
+        if not self._pending:
+            return
+        offsets = self._offsets
+        end = offsets[-1]
+        for text in self._pending:
+            end += len(text)
+            offsets.append(end)
+        self._text += "".join(self._pending)
+        self._pending = []
+
+    def __getitem__(self, row):
+        if self._pending:
+            self._pack()
+        return self._text[self._offsets[row]:self._offsets[row + 1]]
+
+    def __len__(self):
+        return len(self._offsets) - 1 + len(self._pending)
+
+    def tolist(self):
+        return [self[row] for row in range(len(self))]
+
+
+class PaperRecord(MutableMapping):
+    """
+    Dict-like view of one row of a PaperStore. Reads and writes go straight to the store's columns;
+    copy() (or dict(record)) materializes an independent dict.
+    """
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, field):
+        return self._store.get_field(self._row, field)
+
+    def __setitem__(self, field, value):
+        self._store.set_field(self._row, field, value)
+
+    def __delitem__(self, field):
+        raise TypeError("paper records have a fixed set of fields")
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def copy(self):
+        return {field: self._store.get_field(self._row, field) for field in FIELDS}
+
+    def __repr__(self):
+        return f"PaperRecord({self.copy()!r})"
+
+
+class PaperStore(Sequence):
+    """
+    Columnar storage for the papers of a venue corpus.
+
+    Instead of one dict per paper, each field is a column: titles and abstracts as lists of strings,
+    authors and keywords as flat arrays of symbol ids (with per-paper offsets), and links, PDF links
+    and venue status as symbol ids (URL prefixes, status strings) plus the per-paper URL suffix.
+    Symbols are stored once per store. Indexing returns PaperRecord views; rows become real dicts
+    only when copied. Titles and abstracts can be updated in place (e.g. enriched abstracts); the
+    other fields are fixed once a paper is appended.
+    """
+
+    def __init__(self):
+        self.titles = []
+        self.abstracts = []
+        self.authors = array("I")
+        self.author_offsets = array("I", [0])
+        self.keywords = array("I")
+        self.keyword_offsets = array("I", [0])
+        self.link_prefixes = array("I")
+        self.link_ids = StringColumn()
+        self.pdf_prefixes = array("I")
+        self.pdf_ids = StringColumn()
+        self.statuses = array("I")
+        # Shared strings; symbol 0 stands for None. The reverse map is only needed while appending
+        self.symbols = [None]
+        self._symbol_ids = None
+
+    @classmethod
+    def from_papers(cls, papers):
+        if isinstance(papers, PaperStore):
+            return papers
+        store = cls()
+        for paper in papers:
+            store.append(paper)
+        store.compact()
+        return store
+
+    def _symbol(self, value):
+        if self._symbol_ids is None:
+            self._symbol_ids = {s: i for i, s in enumerate(self.symbols)}
+        symbol = self._symbol_ids.get(value)
+        if symbol is None:
+            symbol = self._symbol_ids[value] = len(self.symbols)
+            self.symbols.append(value)
+        return symbol
+
+    def _split(self, url):
+        if not url:
+            return 0, ""
+        prefix, suffix = split_url(url)
+        return self._symbol(prefix), suffix
+
+    def append(self, paper):
+        self.titles.append(paper.get("title") or "")
+        self.abstracts.append(paper.get("abstract") or "")
+        self.authors.extend([self._symbol(intern(a)) for a in paper.get("authors") or ()])
+        self.author_offsets.append(len(self.authors))
+        self.keywords.extend([self._symbol(intern(k)) for k in paper.get("keywords") or ()])
+        self.keyword_offsets.append(len(self.keywords))
+        prefix, suffix = self._split(paper.get("link"))
+        self.link_prefixes.append(prefix)
+        self.link_ids.append(suffix)
+        prefix, suffix = self._split(paper.get("pdf"))
+        self.pdf_prefixes.append(prefix)
+        self.pdf_ids.append(suffix)
+        self.statuses.append(self._symbol(paper.get("status")))
+
+    def compact(self):
+        """Pack buffered appends and drop the symbol lookup table once a store is complete."""
+        self.link_ids._pack()
+        self.pdf_ids._pack()
+        self._symbol_ids = None
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [PaperRecord(self, i) for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("paper row out of range")
+        return PaperRecord(self, row)
+
+    def get_field(self, row, field):
+        if field == "title":
+            return self.titles[row]
+        if field == "abstract":
+            return self.abstracts[row]
+        if field == "link":
+            return self._join(self.link_prefixes[row], self.link_ids[row]) or ""
+        if field == "authors":
+            return self._symbols_of(self.authors, self.author_offsets, row)
+        if field == "keywords":
+            return self._symbols_of(self.keywords, self.keyword_offsets, row)
+        if field == "pdf":
+            return self._join(self.pdf_prefixes[row], self.pdf_ids[row])
+        if field == "status":
+            return self.symbols[self.statuses[row]]
+        raise KeyError(field)
+
+    def _symbols_of(self, ids, offsets, row):
+        symbols = self.symbols
+        return [symbols[i] for i in ids[offsets[row]:offsets[row + 1]]]
+
+    def _join(self, prefix, suffix):
+        return self.symbols[prefix] + suffix if prefix else None
+
+    def set_field(self, row, field, value):
+        if field == "title":
+            self.titles[row] = value or ""
+        elif field == "abstract":
+            self.abstracts[row] = value or ""
+        elif field in FIELDS:
+            raise TypeError(f"{field} is read-only in a PaperStore")
+        else:
+            raise KeyError(field)
+
+    def to_dicts(self):
+        return [PaperRecord(self, i).copy() for i in range(len(self))]
+
+    # ------------------------------------------------------------------
+    # Serialization (column-wise, so the corpus cache doesn't repeat keys per paper)
+    # ------------------------------------------------------------------
+    def to_columns(self):
+        return {
+            "symbols": self.symbols,
+            "titles": self.titles,
+            "abstracts": self.abstracts,
+            "authors": self.authors.tolist(),
+            "author_offsets": self.author_offsets.tolist(),
+            "keywords": self.keywords.tolist(),
+            "keyword_offsets": self.keyword_offsets.tolist(),
+            "link_prefixes": self.link_prefixes.tolist(),
+            "link_ids": self.link_ids.tolist(),
+            "pdf_prefixes": self.pdf_prefixes.tolist(),
+            "pdf_ids": self.pdf_ids.tolist(),
+            "statuses": self.statuses.tolist(),
+        }
+
+    @classmethod
+    def from_columns(cls, columns):
+        store = cls()
+        store.symbols = [intern(s) if s is not None else None for s in columns["symbols"]]
+        store.titles = columns["titles"]
+        store.abstracts = columns["abstracts"]
+        store.authors = array("I", columns["authors"])
+        store.author_offsets = array("I", columns["author_offsets"])
+        store.keywords = array("I", columns["keywords"])
+        store.keyword_offsets = array("I", columns["keyword_offsets"])
+        store.link_prefixes = array("I", columns["link_prefixes"])
+        store.link_ids = StringColumn(columns["link_ids"])
+        store.pdf_prefixes = array("I", columns["pdf_prefixes"])
+        store.pdf_ids = StringColumn(columns["pdf_ids"])
+        store.statuses = array("I", columns["statuses"])
+        return store
@@ -0,0 +1,175 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+
+from search_engine import OPENREVIEW_VENUES, ALL_VENUES, venue_held, federated_venues
+
+# Job priorities (lower runs first)
+PRIORITY_SELECTED = 0     # the venue a user just picked in the sidebar
+PRIORITY_WARM = 1         # startup warm-up and the other years of a picked conference
+PRIORITY_REFRESH = 2      # periodic refresh of "Under Review" venues
+
+PREFETCH_WORKERS = 2
+# "Under Review" submissions change daily during review season; recheck them this often (seconds)
+PREFETCH_REFRESH_INTERVAL = 3600
+# Venues warmed when the server starts: "CONFERENCE:YEAR" pairs separated by commas, or "all"
+PREFETCH_VENUES = os.getenv("SEARCH_PREFETCH_VENUES", "")
+
+
+def parse_venues(spec):
+    """Turn "ICLR:2024,CVPR:2023" (or "all") into (source, year) pairs."""
+    if spec.strip().lower() == "all":
+        return federated_venues()
+    venues = []
+    for item in spec.split(","):
+        if ":" in item:
+            source, year = item.strip().split(":", 1)
+            venues.append((source, year))
+    return venues
+
+
+class PrefetchScheduler:
+    """
+    Warms venue corpora (and their search indexes) on background threads.
+
+    Jobs are (source, year, status) triples in a priority queue: request() only enqueues, so it is
+    safe to call from the Streamlit script on every rerun. A venue is queued at most once at a time.
+    "Under Review" venues that were requested are refreshed every refresh_interval seconds against
+    their upstream fingerprint, and re-downloaded only when they changed.
+    """
+
+    def __init__(self, engine, workers=PREFETCH_WORKERS, refresh_interval=PREFETCH_REFRESH_INTERVAL):
+        self.engine = engine
+        self.workers = workers
+        self.refresh_interval = refresh_interval
+        self.completed = 0
+        self.failures = 0
+        self.last_refresh = {}     # (source, year, status) -> time of the last finished warm/refresh
+        self._heap = []
+        self._queued = {}          # (source, year, status) -> best queued priority
+        self._running = set()
+        self._watched = set()      # "Under Review" venues to refresh periodically
+        self._attempted = {}       # (source, year, status) -> time the last job on it ended
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return self
+            for i in range(self.workers):
+                self._threads.append(threading.Thread(target=self._work, name=f"prefetch-{i}", daemon=True))
+            if self.refresh_interval:
+                self._threads.append(threading.Thread(target=self._refresh_loop, name="prefetch-refresh", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def request(self, source, year, status="Accepted", priority=PRIORITY_WARM, refresh=False):
+        """Queue a venue for warming (or, with refresh, revalidation). Never blocks on the network."""
+        if source not in ALL_VENUES or not venue_held(source, year):
+            return False
+        # CVF and AAAI only publish accepted papers
+        if source not in OPENREVIEW_VENUES:
+            status = "Accepted"
+        key = (source, str(year), status)
+        with self._cond:
+            if status == "Under Review":
+                self._watched.add(key)
+            if key in self._running or self._queued.get(key, float("inf")) <= priority:
+                return False
+            self._queued[key] = priority
+            heapq.heappush(self._heap, (priority, next(self._counter), key, refresh))
+            self._cond.notify()
+        return True
+
+    def request_conference(self, source, year, status="Accepted", years=None):
+        """A conference was picked in the sidebar: the chosen year first, then its other years."""
+        self.request(source, year, status, priority=PRIORITY_SELECTED)
+        for other in years or []:
+            if str(other) != str(year):
+                self.request(source, other, status, priority=PRIORITY_WARM)
+
+    def warm(self, venues, statuses=("Accepted",)):
+        for source, year in venues:
+            for status in statuses:
+                self.request(source, year, status, priority=PRIORITY_WARM)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queued": len(self._queued),
+                "running": sorted(self._running),
+                "completed": self.completed,
+                "failures": self.failures,
+                "watched": sorted(self._watched),
+                "last_refresh": dict(self.last_refresh),
+            }
+
+    def _next_job(self):
+        with self._cond:
+            while not self._stop.is_set():
+                while self._heap:
+                    priority, _, key, refresh = heapq.heappop(self._heap)
+                    # Skip entries superseded by a higher-priority copy of the same venue
+                    if self._queued.get(key) != priority:
+                        continue
+                    del self._queued[key]
+                    self._running.add(key)
+                    return key, refresh
+                self._cond.wait()
+        return None
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            (source, year, status), refresh = job
+            try:
+                if refresh:
+                    self.engine.refresh_corpus(source, year, status)
+                papers, _ = self.engine.get_index(source, year, status)
+                # get_corpus reports download errors by returning nothing
+                failed = not papers
+            except Exception as e:
+                print(f"Prefetch of {source} {year} ({status}) failed: {e}")
+                failed = True
+            with self._cond:
+                self._running.discard((source, year, status))
+                self._attempted[(source, year, status)] = time.time()
+                if failed:
+                    self.failures += 1
+                else:
+                    self.completed += 1
+                    self.last_refresh[(source, year, status)] = time.time()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(min(self.refresh_interval, 60)):
+            now = time.time()
+            with self._cond:
+                due = [key for key in self._watched if now - self._attempted.get(key, now) >= self.refresh_interval]
+            for source, year, status in due:
+                self.request(source, year, status, priority=PRIORITY_REFRESH, refresh=True)
+
+
+_shared_scheduler = None
+_shared_scheduler_lock = threading.Lock()
+
+def get_prefetch_scheduler(engine):
+    """The process-wide scheduler, started (and seeded from SEARCH_PREFETCH_VENUES) on first use."""
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = PrefetchScheduler(engine).start()
+            _shared_scheduler.warm(parse_venues(PREFETCH_VENUES))
+    return _shared_scheduler
@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from corpus_cache import CACHE_DIR
+import metrics
+
+# Bound on the number of result rows (paper references) held in memory across all entries
+RESULT_CACHE_MAX_ROWS = 200000
+# Set SEARCH_RESULT_CACHE=disk to also keep results on disk across restarts
+RESULT_CACHE_MODE = os.getenv("SEARCH_RESULT_CACHE", "memory")
+
+
+def normalize_keyword(keyword):
+    return " ".join(keyword.lower().split())
+
+
+class ResultCache:
+    """
+    Process-wide cache of keyword search results, shared by every Streamlit session.
+
+    Entries are keyed by (source, year, status, normalized keyword) and tagged with the version of
+    the venue corpus they were computed from (SearchEngine.corpus_version), so a refreshed or
+    enriched corpus never serves old results. Memory is bounded by the total number of result rows;
+    least recently used entries are evicted first. With a path, results are also kept in sqlite.
+    """
+
+    def __init__(self, max_rows=RESULT_CACHE_MAX_ROWS, path=None):
+        self.max_rows = max_rows
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()   # key -> (version, results)
+        self._rows = 0
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with sqlite3.connect(path) as db:
+                db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, version TEXT, results TEXT, stored_at REAL)")
+
+    def key(self, source, year, status, keyword):
+        return (source, str(year), status, normalize_keyword(keyword))
+
+    def get(self, source, year, status, keyword, version):
+        """Cached results for a keyword on the given corpus version, or None."""
+        key = self.key(source, year, status, keyword)
+        if version is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.count_cache("result", True)
+                    return entry[1]
+
+            results = self._load(key, version)
+            if results is not None:
+                with self._lock:
+                    self.hits += 1
+                metrics.count_cache("result", True)
+                self._remember(key, version, results)
+                return results
+
+        with self._lock:
+            self.misses += 1
+        metrics.count_cache("result", False)
+        return None
+
+    def put(self, source, year, status, keyword, version, results):
+        if version is None:
+            return
+        key = self.key(source, year, status, keyword)
+        self._remember(key, version, results)
+        if self.path:
+            with sqlite3.connect(self.path) as db:
+                db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                           (json.dumps(key), version, json.dumps([dict(p) for p in results]), time.time()))
+
+    def _remember(self, key, version, results):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._rows -= len(previous[1])
+            self._entries[key] = (version, results)
+            self._rows += len(results)
+            while self._rows > self.max_rows and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._rows -= len(evicted)
+                self.evictions += 1
+
+    def _load(self, key, version):
+        if not self.path:
+            return None
+        with sqlite3.connect(self.path) as db:
+            row = db.execute("SELECT version, results FROM results WHERE key = ?", (json.dumps(key),)).fetchone()
+        if row is None or row[0] != version:
+            return None
+        return json.loads(row[1])
+
+    def search(self, engine, source, year, keyword, status="Accepted"):
+        """engine.search through the cache."""
+        return self.search_many(engine, source, year, [keyword], status)[0][keyword]
+
+    def search_many(self, engine, source, year, keywords, status="Accepted"):
+        """
+        engine.search_many through the cache: only keywords without a current entry are searched
+        (in one batch). Returns ({keyword: results}, number of cache hits).
+        """
+        keywords = list(dict.fromkeys(keywords))
+        version = engine.corpus_version(source, year, status)
+        results = {kw: self.get(source, year, status, kw, version) for kw in keywords}
+        hits = sum(r is not None for r in results.values())
+
+        pending = [kw for kw, r in results.items() if r is None]
+        if pending:
+            found = engine.search_many(source, year, pending, status)
+            # The search may have downloaded or revalidated the venue
+            version = engine.corpus_version(source, year, status)
+            for kw in pending:
+                results[kw] = found[kw]
+                self.put(source, year, status, kw, version, found[kw])
+        return results, hits
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """The process-wide result cache (on disk too when SEARCH_RESULT_CACHE=disk)."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            path = os.path.join(CACHE_DIR, "results.sqlite3") if RESULT_CACHE_MODE == "disk" else None
+            _shared_cache = ResultCache(path=path)
+    return _shared_cache
@@ -1,15 +1,210 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from lxml import etree
 import openreview
 import time
+import random
 import urllib3
 import os
 from datetime import datetime
 import json
+import xml.etree.ElementTree as ET
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from openai import OpenAI
+from corpus_cache import CorpusCache
+from search_index import InvertedIndex
+from embeddings import get_embedder, paper_text, VectorStore
+from llm_cache import LLMCache
+import metrics
+import numpy as np
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+OPENREVIEW_VENUES = ["ICLR", "NeurIPS", "ICML"]
+CVF_VENUES = ["CVPR", "ECCV", "ICCV"]
+SUPPORTED_YEARS = ["2026", "2025", "2024", "2023", "2022"]
+ALL_VENUES = OPENREVIEW_VENUES + CVF_VENUES + ["AAAI"]
+
+# Per-source time budget (seconds) for federated searches
+SOURCE_TIMEOUTS = {"openreview": 90, "cvf": 30, "aaai": 45}
+
+# OpenReview caps a single notes request at 1000
+OPENREVIEW_PAGE_SIZE = 1000
+# Only transfer the fields we normalize (same dotted paths for the V1 and V2 APIs)
+OPENREVIEW_SELECT = "id,content.title,content.abstract,content.authors,content.keywords,content.pdf"
+OPENREVIEW_WORKERS = 4
+OPENREVIEW_MAX_RETRIES = 5
+OPENREVIEW_BACKOFF = 2.0
+# Upstream endpoints can be overridden, e.g. to point the engine at a local stand-in server
+OPENREVIEW_API_V1_URL = os.getenv("OPENREVIEW_API_V1_URL", "https://api.openreview.net")
+OPENREVIEW_API_V2_URL = os.getenv("OPENREVIEW_API_V2_URL", "https://api2.openreview.net")
+DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+
+# LLM reranking: candidates per prompt, approximate prompt tokens per call, concurrent scoring calls
+RERANK_CHUNK_SIZE = 40
+RERANK_TOKEN_BUDGET = 8000
+RERANK_WORKERS = 4
+RERANK_MIN_ABSTRACT_CHARS = 120
+
+# Local pre-ranking before the LLM: candidates kept and weight of BM25 vs. embedding similarity
+PRERANK_TOP_K = 120
+PRERANK_BM25_WEIGHT = 0.5
+
+# Venue families whose whole corpus is downloaded once, cached and indexed locally
+CORPUS_FAMILIES = ("openreview", "cvf", "aaai")
+# Longest wait (seconds) for a venue download that another search is streaming, before one of the
+# waiting callers takes it over (a stream only advances as fast as its reader consumes it)
+CORPUS_FLIGHT_WAIT = 30
+
+# AAAI harvesting through the arXiv API
+ARXIV_API_URL = os.getenv("ARXIV_API_URL", "http://export.arxiv.org/api/query")
+ARXIV_PAGE_SIZE = 200
+ARXIV_DELAY = 3.0
+AAAI_HARVEST_MAX = 10000
+ARXIV_NS = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'arxiv': 'http://arxiv.org/schemas/atom',
+    'opensearch': 'http://a9.com/-/spec/opensearch/1.1/'
+}
+ATOM_ENTRY = '{http://www.w3.org/2005/Atom}entry'
+ATOM_TOTAL_RESULTS = '{http://a9.com/-/spec/opensearch/1.1/}totalResults'
+
+CVF_BASE_URL = os.getenv("CVF_BASE_URL", "https://openaccess.thecvf.com")
+# Detail-page enrichment: request rate shared by all workers, retries and checkpoint interval
+CVF_ENRICH_WORKERS = 4
+CVF_ENRICH_INTERVAL = 0.25
+CVF_ENRICH_RETRIES = 3
+CVF_ENRICH_CHECKPOINT = 200
+# Detail pages that yielded no abstract are not requested again for this long
+CVF_ENRICH_RETRY_AFTER = 24 * 3600
+CVF_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+
+
+def venue_family(source):
+    if source in OPENREVIEW_VENUES:
+        return "openreview"
+    if source in CVF_VENUES:
+        return "cvf"
+    return "aaai"
+
+
+def venue_held(source, year):
+    # ECCV is held in even years, ICCV in odd years
+    if source == "ECCV":
+        return int(year) % 2 == 0
+    if source == "ICCV":
+        return int(year) % 2 != 0
+    return True
+
+
+def federated_venues(sources=None, years=None):
+    """Expand conferences x years into the (source, year) pairs that actually exist."""
+    sources = sources or ALL_VENUES
+    years = years or SUPPORTED_YEARS
+    return [(source, str(year)) for source in sources for year in years if venue_held(source, year)]
+
+class RateLimiter:
+    """Spaces out calls shared by several threads to at most one per min_interval seconds."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Claim the next slot and return how long to wait for it (for callers that sleep themselves)."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.min_interval
+        return start - now
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _Flight:
+    def __init__(self, wait_timeout=None):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        # Set by leaders whose progress depends on someone else (e.g. the reader of a stream)
+        self.wait_timeout = wait_timeout
+
+    def wait(self):
+        """The leader's result (or exception); None if it gave up or did not finish within wait_timeout."""
+        if not self.done.wait(self.wait_timeout):
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller (the leader) does the work, the
+    others wait for it and share its result or exception. Nothing is cached once the call ends.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key, wait_timeout=None, stalled=None):
+        """
+        Return (flight, leader). A leader must end the flight with finish(); others call follow().
+        wait_timeout bounds how long others wait for this leader; a caller whose wait on the stalled
+        flight ran out replaces it as leader if nobody has yet.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None or flight is stalled
+            if leader:
+                flight = self._flights[key] = _Flight(wait_timeout)
+            else:
+                flight.waiters += 1
+        metrics.count_cache(self.name, not leader)
+        return flight, leader
+
+    def finish(self, key, flight, result=None, error=None):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.result = result
+        flight.error = error
+        flight.done.set()
+
+    def do(self, key, fn, *args, **kwargs):
+        flight, leader = self.join(key)
+        return self.follow(key, flight, leader, fn, *args, **kwargs)
+
+    def follow(self, key, flight, leader, fn, *args, **kwargs):
+        """Share the result of a joined flight; if its leader gives up or stalls, one caller takes over with fn."""
+        while not leader:
+            result = flight.wait()
+            if result is not None:
+                return result
+            flight, leader = self.join(key, stalled=flight)
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, flight, error=e)
+            raise
+        self.finish(key, flight, result)
+        return result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._flights)
+
+
 def get_system_proxy():
     # ... (existing code) ...
     pass
@@ -23,13 +218,80 @@ class SearchEngine:
         else:
             self.proxies = None
             
-        # Initialize DeepSeek Client
-        # API Key is now passed dynamically from the frontend/user settings
+        # DeepSeek API Key is passed dynamically from the frontend/user settings;
+        # the client itself is created lazily and shared per key (see the client property)
+        self.api_key = api_key
+
+        # Keep-alive connection pools shared by every CVF/arXiv request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # One OpenReview client per API version, reused across searches
+        self._openreview_clients = {}
+        # Concurrent page requests per OpenReview venue download
+        self.openreview_workers = OPENREVIEW_WORKERS
+        # Notes endpoints that rejected field projection
+        self._openreview_unprojected = set()
+
+        # Background CVF abstract enrichment: {corpus_key: thread}
+        self.enrich_cvf = True
+        self.cvf_enrich_workers = CVF_ENRICH_WORKERS
+        self._enrichment_jobs = {}
+        self._enrichment_lock = threading.Lock()
+
+        # Shared by every arXiv request from this engine
+        self._arxiv_limiter = RateLimiter(ARXIV_DELAY)
+
+        # DeepSeek responses shared by every session (None disables caching)
+        self.llm_cache = LLMCache()
+
+        # Embedding matrices per venue corpus, used for local pre-ranking. The embedder (possibly a
+        # sentence-transformers model) is loaded on first use; copies from with_api_key share it
+        self._lazy = {}
+        self._lazy_lock = threading.Lock()
+        self.vector_store = VectorStore()
+
+        # Tournament reranking settings (see deepseek_rerank_papers)
+        self.rerank_chunk_size = RERANK_CHUNK_SIZE
+        self.rerank_token_budget = RERANK_TOKEN_BUDGET
+        self.rerank_workers = RERANK_WORKERS
+
+        # Local store of whole venue corpora so keyword searches don't re-download venues
+        self.corpus_cache = CorpusCache()
+        # Inverted indexes built once per loaded corpus: {corpus_key: (papers, index)}
+        self._indexes = {}
+        # One upstream download per venue at a time; concurrent callers share its result
+        self._corpus_flights = SingleFlight("corpus_flight")
+        self.corpus_flight_wait = CORPUS_FLIGHT_WAIT
+
+    @property
+    def client(self):
+        api_key = self.api_key
         if not api_key:
-             # Fallback to env or empty (which will fail gracefully later if needed)
-             api_key = os.getenv("DEEPSEEK_API_KEY", "")
-             
-        self.client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com")
+            # Fallback to env or empty (which will fail gracefully later if needed)
+            api_key = os.getenv("DEEPSEEK_API_KEY", "")
+        return get_llm_client(api_key)
+
+    @property
+    def embedder(self):
+        embedder = self._lazy.get("embedder")
+        if embedder is None:
+            with self._lazy_lock:
+                embedder = self._lazy.get("embedder")
+                if embedder is None:
+                    embedder = self._lazy["embedder"] = get_embedder()
+        return embedder
+
+    @embedder.setter
+    def embedder(self, embedder):
+        self._lazy["embedder"] = embedder
+
+    def with_api_key(self, api_key):
+        """Shallow copy bound to another DeepSeek key; sessions, corpora and indexes stay shared."""
+        engine = copy.copy(self)
+        engine.api_key = api_key
+        return engine
 
     def extract_keywords_with_deepseek(self, user_prompt):
         """
@@ -37,17 +299,7 @@ class SearchEngine:
         Returns a list of keywords.
         """
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[
-                    {"role": "system", "content": '你是一个学术搜索专家。请将用户的自然语言意图转化为 3-5 个具体的、组合式的学术英文关键词（避免过于宽泛的单词如 "Image"）。返回格式必须是 JSON: {"keywords": ["keyword1", "keyword2"]}'},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format={ "type": "json_object" },
-                stream=False
-            )
-            
-            content = response.choices[0].message.content
+            content = self._complete(self._keyword_messages(user_prompt), purpose="keywords")
             data = json.loads(content)
             return data.get("keywords", [])
             
@@ -56,22 +308,285 @@ class SearchEngine:
             # Fallback: just return the user prompt as a single keyword
             return [user_prompt]
 
-    def deepseek_rerank_papers(self, user_prompt, papers_list, top_n=25):
+    def _keyword_messages(self, user_prompt):
+        return [
+            {"role": "system", "content": '你是一个学术搜索专家。请将用户的自然语言意图转化为 3-5 个具体的、组合式的学术英文关键词（避免过于宽泛的单词如 "Image"）。返回格式必须是 JSON: {"keywords": ["keyword1", "keyword2"]}'},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def _llm_cache_key(self, model, messages):
+        if self.llm_cache is None:
+            return None
+        return self.llm_cache.key(model, messages, response_format="json_object")
+
+    def _complete(self, messages, model="deepseek-chat", purpose="chat"):
+        """JSON chat completion, answered from the LLM cache when this exact request was made before."""
+        key = self._llm_cache_key(model, messages)
+        if key is not None:
+            content = self.llm_cache.get(key)
+            metrics.count_cache("llm", content is not None)
+            if content is not None:
+                metrics.count_llm(purpose, cached=True)
+                return content
+
+        with metrics.stage("llm", purpose):
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                response_format={ "type": "json_object" },
+                stream=False
+            )
+        content = response.choices[0].message.content
+        self._count_llm_tokens(purpose, messages, content, getattr(response, "usage", None))
+        # Only well-formed answers are worth replaying
+        json.loads(content)
+        if key is not None:
+            self.llm_cache.put(key, model, content)
+        return content
+
+    def _complete_stream(self, messages, model="deepseek-chat", purpose="chat"):
+        """Streaming counterpart of _complete: yields text pieces, replaying a cached answer at once."""
+        key = self._llm_cache_key(model, messages)
+        if key is not None:
+            content = self.llm_cache.get(key)
+            metrics.count_cache("llm", content is not None)
+            if content is not None:
+                metrics.count_llm(purpose, cached=True)
+                yield content
+                return
+
+        pieces = []
+        usage = None
+        # Only time spent waiting on the stream counts as LLM time, not the consumer's work between pieces
+        waiting = metrics.Stopwatch()
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format={ "type": "json_object" },
+            stream=True
+        )
+        for chunk in waiting.iterate(response):
+            usage = getattr(chunk, "usage", None) or usage
+            piece = chunk.choices[0].delta.content if chunk.choices else None
+            if piece:
+                pieces.append(piece)
+                yield piece
+        waiting.observe("llm", purpose)
+
+        content = "".join(pieces)
+        self._count_llm_tokens(purpose, messages, content, usage)
+        json.loads(content)
+        if key is not None:
+            self.llm_cache.put(key, model, content)
+
+    def _count_llm_tokens(self, purpose, messages, content, usage):
+        # Prefer the token counts DeepSeek reports; estimate them when the response has none
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if not isinstance(prompt_tokens, int):
+            prompt_tokens = metrics.estimate_tokens("".join(m["content"] for m in messages))
+        if not isinstance(completion_tokens, int):
+            completion_tokens = metrics.estimate_tokens(content)
+        metrics.count_llm(purpose, cached=False, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def deepseek_rerank_papers(self, user_prompt, papers_list, top_n=25, chunk_size=None, token_budget=None):
         """
         Rerank and select top_n papers based on user prompt using DeepSeek.
-        Returns a list of selected paper IDs/indices or re-ordered list.
+        Candidates that don't fit one prompt are reranked map-reduce style: chunks are scored
+        concurrently, and a final round picks and explains the best-scored survivors.
+        Returns the selected papers (copies) with a "recommendation_reason".
         """
         if not papers_list:
             return []
-            
-        # Limit to 100 papers to avoid context window limits
-        candidates = papers_list[:100]
+        chunk_size = chunk_size or self.rerank_chunk_size
+        token_budget = token_budget or self.rerank_token_budget
+
+        try:
+            with metrics.stage("rerank"):
+                candidates = self._rerank_survivors(user_prompt, papers_list, top_n, chunk_size, token_budget)
+
+                # Final round: one prompt over the survivors
+                picks = self._rerank_chunk(user_prompt, candidates, top_n, token_budget)
+
+            # Reconstruct the result list
+            reranked_results = []
+            for idx, reason in picks:
+                paper = candidates[idx].copy()
+                paper["recommendation_reason"] = reason
+                reranked_results.append(paper)
+            return reranked_results
+
+        except Exception as e:
+            print(f"Error reranking papers with DeepSeek: {e}")
+            # Fallback: return original list
+            return papers_list[:top_n]
+
+    def iter_rerank_papers(self, user_prompt, papers_list, top_n=25, chunk_size=None, token_budget=None):
+        """
+        Streaming variant of deepseek_rerank_papers: the final round is streamed and each selected
+        paper (a copy with its "recommendation_reason") is yielded as soon as its recommendation
+        has been parsed out of the token stream.
+        """
+        if not papers_list:
+            return
+        chunk_size = chunk_size or self.rerank_chunk_size
+        token_budget = token_budget or self.rerank_token_budget
+
+        yielded = set()
+        try:
+            candidates = self._rerank_survivors(user_prompt, papers_list, top_n, chunk_size, token_budget)
+            for idx, reason in self._iter_rerank_chunk(user_prompt, candidates, top_n, token_budget, stream=True):
+                paper = candidates[idx].copy()
+                paper["recommendation_reason"] = reason
+                yielded.add(paper["link"])
+                yield paper
+
+        except Exception as e:
+            print(f"Error reranking papers with DeepSeek: {e}")
+            # Fallback: complete the list from the original order
+            for paper in papers_list:
+                if len(yielded) >= top_n:
+                    break
+                if paper["link"] not in yielded:
+                    yielded.add(paper["link"])
+                    yield paper
+
+    def _rerank_survivors(self, user_prompt, papers_list, top_n, chunk_size, token_budget):
+        """Candidates for the final round: all of them if they fit one prompt, else the best-scored."""
+        candidates = list(papers_list)
+        if len(candidates) > chunk_size:
+            scores = self._score_candidates(user_prompt, candidates, chunk_size, token_budget)
+            order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+            candidates = [candidates[i] for i in order[:max(chunk_size, top_n)]]
+        return candidates
+
+    def prerank_papers(self, query, papers_list, top_k=PRERANK_TOP_K, source=None, year=None, status="Accepted"):
+        """
+        Order candidates locally by a blend of BM25 and embedding similarity to query and keep the best
+        top_k, so only promising papers reach the LLM. With source/year the venue's precomputed
+        embedding matrix is reused instead of embedding the candidates again.
+        """
+        papers_list = list(papers_list)
+        if len(papers_list) <= 1:
+            return papers_list[:top_k]
+        with metrics.stage("prerank", source or ""):
+            return self._prerank(query, papers_list, top_k, source, year, status)
+
+    def _prerank(self, query, papers_list, top_k, source, year, status):
+        # Lexical relevance: BM25 over the candidate set (any query term may match)
+        bm25 = np.array(InvertedIndex(papers_list).bm25_scores(query), dtype=np.float32)
+
+        # Semantic relevance: one matrix-vector product against the candidate vectors
+        vectors = self._candidate_vectors(papers_list, source, year, status)
+        query_vector = self.embedder.embed([query])[0]
+        cosine = vectors.astype(np.float32) @ query_vector
+
+        scores = PRERANK_BM25_WEIGHT * _min_max(bm25) + (1 - PRERANK_BM25_WEIGHT) * _min_max(cosine)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [papers_list[i] for i in order]
+
+    def get_vectors(self, source, year, status="Accepted"):
+        """Return (papers, matrix, {link: row}) for a venue corpus, embedding it once per corpus version."""
+        papers = self.get_corpus(source, year, status)
+        if papers is None:
+            return None, None, None
+        key = self.corpus_cache.key(source, year, self._corpus_status(source, status))
+        matrix, rows = self.vector_store.get(key, papers, self.embedder)
+        return papers, matrix, rows
+
+    def semantic_search(self, source, year, query, status="Accepted", top_k=50):
+        """
+        Natural-language search over a venue corpus using its embedding index; runs locally and
+        needs no API key. Returns copies of the nearest papers with a "similarity" score.
+        """
+        papers = self.get_corpus(source, year, status)
+        if not papers or not query.strip():
+            return []
+        key = self.corpus_cache.key(source, year, self._corpus_status(source, status))
+        index = self.vector_store.index(key, papers, self.embedder)
+        with metrics.stage("semantic", source):
+            query_vector = self.embedder.embed([query])[0]
+            hits = index.search(query_vector, top_k)
+        return [dict(papers[row], similarity=round(score, 4)) for row, score in hits]
+
+    def _candidate_vectors(self, papers_list, source, year, status):
+        if source is not None:
+            _, matrix, rows = self.get_vectors(source, year, status)
+            if matrix is not None and all(p["link"] in rows for p in papers_list):
+                return matrix[[rows[p["link"]] for p in papers_list]]
+        return self.embedder.embed([paper_text(p) for p in papers_list])
+
+    def _score_candidates(self, user_prompt, candidates, chunk_size, token_budget):
+        """Relevance score (0-10) for every candidate, scoring chunks concurrently."""
+        chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+
+        def run_chunk(chunk):
+            try:
+                return self._score_chunk(user_prompt, chunk, token_budget)
+            except Exception as e:
+                print(f"Error scoring a chunk with DeepSeek: {e}")
+                # Unscored papers only survive if better-scored ones run out
+                return [-1] * len(chunk)
+
+        with ThreadPoolExecutor(max_workers=min(self.rerank_workers, len(chunks))) as pool:
+            return [score for chunk_scores in pool.map(metrics.bind(run_chunk), chunks) for score in chunk_scores]
+
+    def _score_chunk(self, user_prompt, candidates, token_budget):
+        content = self._complete(self._score_messages(user_prompt, candidates, token_budget), purpose="score")
+        return self._parse_scores(content, len(candidates))
+
+    def _score_messages(self, user_prompt, candidates, token_budget):
+        candidates_text = self._format_rerank_candidates(candidates, token_budget)
+
+        prompt = f"""
+        用户查询: "{user_prompt}"
         
-        # Format candidates for prompt
-        candidates_text = ""
-        for i, paper in enumerate(candidates):
-            candidates_text += f"[{i}] Title: {paper.get('title', '')}\nAbstract: {paper.get('abstract', '')[:300]}...\n\n"
-            
+        请为以下每一篇候选论文与用户意图的相关性打分 (0-10 的整数，10 表示最相关)。
+        
+        候选论文列表:
+        {candidates_text}
+        
+        请返回一个 JSON 对象，格式如下:
+        {{
+            "scores": [
+                {{ "id": 0, "score": 7 }},
+                ...
+            ]
+        }}
+        注意: 必须为每一个编号打分。
+        """
+
+        return [
+            {"role": "system", "content": "你是一个学术助手，负责评估论文与用户意图的相关性。请严格按照 JSON 格式返回结果。"},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _parse_scores(self, content, n_candidates):
+        data = json.loads(content)
+        scores = [0] * n_candidates
+        for item in data.get("scores", []):
+            idx = item.get("id")
+            score = item.get("score")
+            if isinstance(idx, int) and 0 <= idx < n_candidates and isinstance(score, (int, float)):
+                scores[idx] = score
+        return scores
+
+    def _rerank_chunk(self, user_prompt, candidates, top_n, token_budget):
+        """One DeepSeek call over candidates; returns [(candidate_index, reason)] best first."""
+        return list(self._iter_rerank_chunk(user_prompt, candidates, top_n, token_budget))
+
+    def _iter_rerank_chunk(self, user_prompt, candidates, top_n, token_budget, stream=False):
+        """Yield (candidate_index, reason) best first; with stream, each as soon as it is generated."""
+        messages = self._rerank_messages(user_prompt, candidates, top_n, token_budget)
+        if stream:
+            recommendations = iter_json_array_items(self._complete_stream(messages, purpose="rerank"), "recommendations")
+        else:
+            recommendations = json.loads(self._complete(messages, purpose="rerank")).get("recommendations", [])
+        yield from self._valid_picks(recommendations, len(candidates), top_n)
+
+    def _rerank_messages(self, user_prompt, candidates, top_n, token_budget):
+        candidates_text = self._format_rerank_candidates(candidates, token_budget)
+
         prompt = f"""
         用户查询: "{user_prompt}"
         
@@ -90,336 +605,1032 @@ class SearchEngine:
         注意: "id" 必须对应候选列表中的编号。
         """
         
-        try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[
-                    {"role": "system", "content": "你是一个学术助手，负责根据用户意图筛选和推荐论文。请严格按照 JSON 格式返回结果。"},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={ "type": "json_object" },
-                stream=False
-            )
-            
-            content = response.choices[0].message.content
-            data = json.loads(content)
-            recommendations = data.get("recommendations", [])
-            
-            # Reconstruct the result list
-            reranked_results = []
-            for rec in recommendations:
-                idx = rec.get("id")
-                if isinstance(idx, int) and 0 <= idx < len(candidates):
-                    paper = candidates[idx].copy()
-                    paper["recommendation_reason"] = rec.get("reason", "")
-                    reranked_results.append(paper)
-            
-            return reranked_results
-            
-        except Exception as e:
-            print(f"Error reranking papers with DeepSeek: {e}")
-            # Fallback: return original list
-            return papers_list[:top_n]
+        return [
+            {"role": "system", "content": "你是一个学术助手，负责根据用户意图筛选和推荐论文。请严格按照 JSON 格式返回结果。"},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _valid_picks(self, recommendations, n_candidates, top_n):
+        """Yield (candidate_index, reason) for valid, first-seen ids, at most top_n of them."""
+        seen = set()
+        for rec in recommendations:
+            idx = rec.get("id") if isinstance(rec, dict) else None
+            # Keep consuming past top_n so a streamed answer is read to the end
+            if isinstance(idx, int) and 0 <= idx < n_candidates and idx not in seen and len(seen) < top_n:
+                seen.add(idx)
+                yield idx, rec.get("reason", "")
+
+    def _format_rerank_candidates(self, candidates, token_budget):
+        # Split the token budget (~4 characters per token) evenly, giving each abstract what its title leaves
+        per_paper_chars = max(RERANK_MIN_ABSTRACT_CHARS, token_budget * 4 // max(len(candidates), 1))
+        candidates_text = ""
+        for i, paper in enumerate(candidates):
+            title = paper.get('title', '')
+            abstract_chars = max(RERANK_MIN_ABSTRACT_CHARS, per_paper_chars - len(title))
+            candidates_text += f"[{i}] Title: {title}\nAbstract: {(paper.get('abstract') or '')[:abstract_chars]}...\n\n"
+        return candidates_text
 
     def search(self, source, year, keyword, status="Accepted"):
-        if source in ["ICLR", "NeurIPS", "ICML"]:
-            return self.search_openreview(source, year, keyword, status)
-        elif source in ["CVPR", "ECCV", "ICCV"]:
-            return self.search_cvf(source, year, keyword)
+        with metrics.stage("search", source):
+            if source in OPENREVIEW_VENUES:
+                return self.search_openreview(source, year, keyword, status)
+            elif source in CVF_VENUES:
+                return self.search_cvf(source, year, keyword)
+            elif source == "AAAI":
+                return self.search_aaai(year, keyword)
+            else:
+                return []
+
+    def iter_search(self, source, year, keyword, status="Accepted"):
+        """Generator variant of search() that yields matching papers as soon as they are available."""
+        if source in OPENREVIEW_VENUES:
+            return self.iter_search_openreview(source, year, keyword, status)
+        elif source in CVF_VENUES:
+            return self.iter_search_cvf(source, year, keyword)
         elif source == "AAAI":
-            return self.search_aaai(year, keyword)
+            return self.iter_search_aaai(year, keyword)
         else:
+            return iter([])
+
+    def get_corpus(self, source, year, status="Accepted", refresh=False):
+        """
+        Return every normalized paper of a venue, served from the local corpus cache when fresh.
+        Stale entries are revalidated cheaply before falling back to a full download.
+        Returns None for sources that have no corpus support.
+        """
+        if venue_family(source) not in CORPUS_FAMILIES:
+            return None
+        if not venue_held(source, year):
             return []
+        status = self._corpus_status(source, status)
+
+        entry = self.corpus_cache.load(source, year, status)
+        if entry is not None and not refresh and self.corpus_cache.is_fresh(entry):
+            metrics.count_cache("corpus", True)
+            self._maybe_enrich(entry)
+            return entry["papers"]
+
+        # Revalidation and download run once per venue however many callers ask concurrently
+        key = self.corpus_cache.key(source, year, status)
+        return self._corpus_flights.do(key, self._load_corpus, source, year, status, refresh)
+
+    def _load_corpus(self, source, year, status, refresh):
+        # Re-read the entry: a download that finished while this caller was checking may have stored it
+        entry = self.corpus_cache.load(source, year, status)
+        hit = entry is not None and not refresh and self._is_current(entry)
+        metrics.count_cache("corpus", hit)
+        if hit:
+            self._maybe_enrich(entry)
+            return entry["papers"]
 
-    def search_openreview(self, conference, year, keyword, status):
-        results = []
         try:
-            # Map conference name to OpenReview ID
-            venue_prefix = f"{conference}.cc"
-            
-            print(f"Searching {conference} {year} ({status}) on OpenReview...")
-            
-            # Use V2 API for recent years (safe bet for 2023+)
-            if int(year) >= 2023:
-                client = openreview.api.OpenReviewClient(baseurl='https://api2.openreview.net')
-                
-                notes_to_process = []
-                
-                if status == "Accepted":
-                    # 1. Search Accepted Papers
-                    venue_id = f'{venue_prefix}/{year}/Conference'
-                    print(f"Fetching accepted from {venue_id}")
-                    try:
-                        notes_to_process = client.get_all_notes(content={'venueid': venue_id})
-                    except Exception as e:
-                        print(f"Could not fetch accepted papers: {e}")
-                
-                elif status == "Under Review":
-                    # 2. Search Under Review / Submissions
-                    # Usually under 'Blind_Submission' or 'Submission'
-                    invitation_id = f'{venue_prefix}/{year}/Conference/-/Blind_Submission'
-                    print(f"Fetching under review from {invitation_id}")
+            papers, validator = self._fetch_corpus(source, year, status)
+        except Exception as e:
+            print(f"Error fetching {source} {year} ({status}): {e}")
+            # Serve a stale corpus rather than nothing when the upstream is down
+            return entry["papers"] if entry is not None else []
+
+        return self._store_corpus(source, year, status, papers, validator, entry)
+
+    def refresh_corpus(self, source, year, status="Accepted"):
+        """
+        Check a cached corpus against its upstream fingerprint even while it is still fresh:
+        unchanged corpora are only touched, changed (or missing) ones are downloaded again.
+        """
+        if venue_family(source) not in CORPUS_FAMILIES:
+            return None
+        status = self._corpus_status(source, status)
+        entry = self.corpus_cache.load(source, year, status)
+        if entry is not None:
+            try:
+                validator = self._corpus_validator(source, year, status)
+            except Exception as e:
+                print(f"Could not revalidate {source} {year} ({status}): {e}")
+                validator = None
+            if validator and validator == entry.get("validator"):
+                self.corpus_cache.touch(entry)
+                return entry["papers"]
+        return self.get_corpus(source, year, status, refresh=True)
+
+    def corpus_version(self, source, year, status="Accepted"):
+        """
+        Version of a venue's cached corpus if it is fresh, else None (a search would refresh it first).
+        Cheap: no network access.
+        """
+        if venue_family(source) not in CORPUS_FAMILIES:
+            return None
+        entry = self.corpus_cache.load(source, year, self._corpus_status(source, status))
+        if entry is None or not self.corpus_cache.is_fresh(entry):
+            return None
+        return self.corpus_cache.version(entry)
+
+    def _store_corpus(self, source, year, status, papers, validator, previous=None):
+        """Cache a downloaded corpus and return it as stored (a PaperStore)."""
+        if not papers:
+            return papers
+        with metrics.stage("store", source):
+            return self._save_corpus(source, year, status, papers, validator, previous)
+
+    def _save_corpus(self, source, year, status, papers, validator, previous):
+        if previous is not None:
+            # Keep abstracts that were enriched into the previous copy of this corpus
+            abstracts = {p["link"]: p["abstract"] for p in previous["papers"] if p["abstract"]}
+            for paper in papers:
+                if not paper["abstract"] and paper["link"] in abstracts:
+                    paper["abstract"] = abstracts[paper["link"]]
+        entry = self.corpus_cache.save(source, year, status, papers, validator)
+        if previous is not None and previous.get("enrich_failed"):
+            # Pages that failed recently stay skipped; the next enrichment pass persists this
+            entry["enrich_failed"] = dict(previous["enrich_failed"])
+        self._maybe_enrich(entry)
+        return entry["papers"]
+
+    def _maybe_enrich(self, entry):
+        """Start abstract enrichment of a CVF corpus if it was never tried or a failed page is due again."""
+        if entry["source"] not in CVF_VENUES or not self.enrich_cvf:
+            return
+        # Missing: never enriched (e.g. just downloaded); None: nothing left to fetch
+        retry_at = entry.get("enrich_retry_at", 0)
+        if retry_at is not None and time.time() >= retry_at:
+            self.enrich_cvf_abstracts(entry["source"], entry["year"])
+
+    def _corpus_status(self, source, status):
+        # CVF and AAAI only publish accepted papers, whatever status the UI asked for
+        return status if source in OPENREVIEW_VENUES else "Accepted"
+
+    def _fetch_corpus(self, source, year, status):
+        if source in CVF_VENUES:
+            return self._fetch_cvf_corpus(source, year)
+        if source == "AAAI":
+            return self._fetch_aaai_corpus(year)
+        return self._fetch_openreview_corpus(source, year, status)
+
+    def _corpus_validator(self, source, year, status):
+        if source in CVF_VENUES:
+            return self._cvf_validator(source, year)
+        if source == "AAAI":
+            return self._aaai_validator(year)
+        return self._openreview_validator(source, year, status)
+
+    def _fetch_aaai_corpus(self, year):
+        papers = []
+        validator = None
+        for page, validator in self._iter_aaai_pages("AAAI", year):
+            papers.extend(page)
+        return papers, validator
+
+    def _is_current(self, entry):
+        """True if a cached corpus is fresh, or stale but revalidated against the upstream fingerprint."""
+        if self.corpus_cache.is_fresh(entry):
+            return True
+        # ETag-style revalidation: if the venue still reports the same fingerprint, keep the corpus
+        try:
+            validator = self._corpus_validator(entry["source"], entry["year"], entry["status"])
+        except Exception as e:
+            print(f"Could not revalidate {entry['source']} {entry['year']} ({entry['status']}): {e}")
+            return False
+        if validator and validator == entry.get("validator"):
+            self.corpus_cache.touch(entry)
+            return True
+        return False
+
+    def prefetch(self, venues=None, statuses=("Accepted",)):
+        """
+        Warm the corpus cache ahead of time.
+        venues is an iterable of (source, year) pairs; defaults to every supported venue and year.
+        Returns {(source, year, status): paper_count}.
+        """
+        if venues is None:
+            venues = federated_venues()
+
+        counts = {}
+        for source, year in venues:
+            for status in statuses:
+                print(f"Prefetching {source} {year} ({status})...")
+                papers = self.get_corpus(source, str(year), status)
+                counts[(source, str(year), status)] = len(papers) if papers is not None else 0
+        return counts
+
+    def get_index(self, source, year, status="Accepted"):
+        """
+        Return (papers, InvertedIndex) for a venue corpus, building the index only when the
+        corpus itself changed. Returns (None, None) for sources without corpus support.
+        """
+        papers = self.get_corpus(source, year, status)
+        if papers is None:
+            return None, None
+        return self._corpus_index(source, year, status, papers)
+
+    def _corpus_index(self, source, year, status, papers):
+        key = self.corpus_cache.key(source, year, self._corpus_status(source, status))
+        cached = self._indexes.get(key)
+        metrics.count_cache("index", cached is not None and cached[0] is papers)
+        if cached is not None and cached[0] is papers:
+            return cached
+
+        with metrics.stage("index", source):
+            index = InvertedIndex(papers)
+        self._indexes[key] = (papers, index)
+        return papers, index
+
+    def iter_search_federated(self, venues, keyword, status="Accepted", timeouts=None, max_workers=8):
+        """
+        Fan a keyword out to many (source, year) pairs concurrently.
+        Yields (source, year, results) as each venue finishes; venues that exceed their source's
+        time budget yield results=None (they keep warming the cache in the background).
+        """
+        timeouts = dict(SOURCE_TIMEOUTS, **(timeouts or {}))
+        venues = [(source, str(year)) for source, year in venues]
+        if not venues:
+            return
+
+        # Each venue's budget runs from when a worker picks it up, not from when it was queued
+        started = {}
+        def run(source, year):
+            started[(source, year)] = time.monotonic()
+            return self.search(source, year, keyword, status)
+
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(venues)))
+        try:
+            pending = {}
+            for source, year in venues:
+                future = pool.submit(metrics.bind(run), source, year)
+                pending[future] = (source, year, timeouts[venue_family(source)])
+
+            while pending:
+                # A venue that has not started yet cannot run out before now + its budget
+                now = time.monotonic()
+                next_deadline = min(started.get((source, year), now) + budget for source, year, budget in pending.values())
+                done, _ = wait(pending, timeout=max(0, next_deadline - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    source, year, _ = pending.pop(future)
                     try:
-                        notes_to_process = client.get_all_notes(invitation=invitation_id)
-                        if not notes_to_process:
-                            # Fallback to just 'Submission'
-                            invitation_id = f'{venue_prefix}/{year}/Conference/-/Submission'
-                            notes_to_process = client.get_all_notes(invitation=invitation_id)
+                        yield source, year, future.result()
                     except Exception as e:
-                        print(f"Could not fetch under review papers: {e}")
-                
-                # Process Results
-                for note in notes_to_process:
-                    content = note.content
-                    title = content.get('title', {}).get('value', '')
-                    abstract = content.get('abstract', {}).get('value', '')
-                    authors = content.get('authors', {}).get('value', [])
-                    keywords = content.get('keywords', {}).get('value', [])
-                    pdf = content.get('pdf', {}).get('value', '')
-                    
-                    if self._match(keyword, title, abstract, keywords):
-                        results.append({
-                            "title": title,
-                            "authors": authors,
-                            "abstract": abstract,
-                            "keywords": keywords,
-                            "link": f"https://openreview.net/forum?id={note.id}",
-                            "pdf": f"https://openreview.net{pdf}" if pdf else None,
-                            "status": f"{conference} {year} ({status})"
-                        })
+                        print(f"Federated search failed for {source} {year}: {e}")
+                        yield source, year, []
 
-            else:
-                # V1 API for older years (Legacy, mostly just accepted/all)
-                # V1 logic is complex for separating status, assume Accepted for simplicity or fallback
-                client = openreview.Client(baseurl='https://api.openreview.net')
-                venue_id = f'{venue_prefix}/{year}/Conference'
-                
-                # ... existing V1 logic (omitted for brevity, older years are usually accepted) ...
-                # For simplicity, if user asks for Under Review for old years, we might return empty or just search submissions
-                if status == "Under Review":
-                     invitation = f'{venue_prefix}/{year}/Conference/-/Blind_Submission'
-                     notes = client.get_all_notes(invitation=invitation)
-                else:
-                    notes = client.get_all_notes(content={'venueid': venue_id})
-                
-                for note in notes:
-                    title = note.content.get('title', '')
-                    abstract = note.content.get('abstract', '')
-                    authors = note.content.get('authors', [])
-                    keywords = note.content.get('keywords', [])
-                    pdf = note.content.get('pdf', '')
-                    
-                    if self._match(keyword, title, abstract, keywords):
-                        results.append({
-                            "title": title,
-                            "authors": authors,
-                            "abstract": abstract,
-                            "keywords": keywords,
-                            "link": f"https://openreview.net/forum?id={note.id}",
-                            "pdf": f"https://openreview.net{pdf}" if pdf else None,
-                            "status": f"{conference} {year}"
-                        })
+                now = time.monotonic()
+                for future, (source, year, budget) in list(pending.items()):
+                    if (source, year) in started and started[(source, year)] + budget <= now:
+                        del pending[future]
+                        print(f"Federated search timed out for {source} {year}")
+                        yield source, year, None
+        finally:
+            # Timed-out and not yet started venues keep running to warm the cache
+            pool.shutdown(wait=False)
+
+    def search_federated(self, venues, keyword, status="Accepted", timeouts=None, max_workers=8):
+        """Run iter_search_federated to completion and return one merged, deduplicated list."""
+        per_venue = {}
+        for source, year, results in self.iter_search_federated(venues, keyword, status, timeouts, max_workers):
+            per_venue[(source, year)] = results or []
+        # Keep the caller's venue order regardless of completion order
+        return merge_results(per_venue.get((source, str(year)), []) for source, year in venues)
+
+    def search_openreview(self, conference, year, keyword, status):
+        print(f"Searching {conference} {year} ({status}) on OpenReview...")
+        papers, index = self.get_index(conference, year, status)
+        with metrics.stage("match", conference):
+            return [papers[doc_id] for doc_id, _ in index.search(keyword)]
+
+    def iter_search_openreview(self, conference, year, keyword, status):
+        print(f"Streaming {conference} {year} ({status}) from OpenReview...")
+        return self._iter_corpus_search(conference, year, status, keyword, self._iter_openreview_pages)
 
+    def _iter_corpus_search(self, source, year, status, keyword, iter_pages):
+        """
+        Yield matching papers progressively. A cached venue is answered from its index (BM25 order);
+        otherwise matches are yielded page by page (download order) while iter_pages downloads the
+        corpus, which is cached at the end. Both match exactly the same papers.
+        """
+        entry = self.corpus_cache.load(source, year, status)
+        hit = entry is not None and self._is_current(entry)
+        metrics.count_cache("corpus", hit)
+        if hit:
+            yield from self._index_search(source, year, status, keyword)
+            return
+
+        # Another caller is already downloading this venue: wait for it instead of downloading again
+        key = self.corpus_cache.key(source, year, status)
+        # A stream only advances as fast as its reader, so waiters take over if it stalls
+        flight, leader = self._corpus_flights.join(key, wait_timeout=self.corpus_flight_wait)
+        if not leader:
+            papers = self._corpus_flights.follow(key, flight, leader, self._load_corpus, source, year, status, False)
+            yield from self._index_search(source, year, status, keyword, papers)
+            return
+
+        papers = []
+        validator = None
+        stored = None
+        matching = metrics.Stopwatch()
+        try:
+            for page, validator in iter_pages(source, year, status):
+                papers.extend(page)
+                with matching:
+                    matched = self._match_page(keyword, page)
+                yield from matched
         except Exception as e:
-            print(f"Error searching {conference}: {e}")
-            
-        return results
+            print(f"Error fetching {source} {year} ({status}): {e}")
+            stored = entry["papers"] if entry is not None else []
+            if not papers and stored:
+                # Nothing streamed yet: fall back to the stale corpus
+                yield from self._index_search(source, year, status, keyword, stored)
+            return
+        else:
+            stored = self._store_corpus(source, year, status, papers, validator, entry)
+        finally:
+            matching.observe("match", source)
+            # Waiters get the stored corpus; None if this generator was abandoned mid-download,
+            # in which case one of them takes over
+            self._corpus_flights.finish(key, flight, stored)
+
+    def _match_page(self, keyword, page):
+        """Papers of a downloaded page the venue index will match (same tokens, phrases and prefixes)."""
+        matches = InvertedIndex(page).search(keyword)
+        return [page[doc_id] for doc_id in sorted(doc_id for doc_id, _ in matches)]
+
+    def _index_search(self, source, year, status, keyword, papers=None):
+        """Matches from a venue's index, in BM25 order; papers, when given, is an already loaded corpus."""
+        if papers is None:
+            papers, index = self.get_index(source, year, status)
+        elif papers:
+            papers, index = self._corpus_index(source, year, status, papers)
+        if not papers:
+            return
+        with metrics.stage("match", source):
+            matches = index.search(keyword)
+        for doc_id, _ in matches:
+            yield papers[doc_id]
+
+    def search_many(self, source, year, keywords, status="Accepted", max_workers=4):
+        """
+        Search several keywords against one venue.
+        Corpus-backed venues are fetched and indexed once and all keywords are answered from that index;
+        other sources run their per-keyword searches on a bounded thread pool.
+        Returns {keyword: results} in the order the keywords were given.
+        """
+        keywords = list(dict.fromkeys(keywords))
+        if not keywords:
+            return {}
+
+        if venue_family(source) in CORPUS_FAMILIES:
+            print(f"Searching {len(keywords)} keywords in {source} {year} ({status})...")
+            papers, index = self.get_index(source, year, status)
+            with metrics.stage("match", source):
+                return {kw: [papers[doc_id] for doc_id, _ in index.search(kw)] for kw in keywords}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(keywords))) as pool:
+            futures = {kw: pool.submit(metrics.bind(self.search), source, year, kw, status) for kw in keywords}
+            return {kw: future.result() for kw, future in futures.items()}
+
+    def _openreview_client(self, year):
+        # Use V2 API for recent years (safe bet for 2023+), V1 for older ones
+        version = "v2" if int(year) >= 2023 else "v1"
+        client = self._openreview_clients.get(version)
+        if client is None:
+            if version == "v2":
+                client = openreview.api.OpenReviewClient(baseurl=OPENREVIEW_API_V2_URL)
+            else:
+                client = openreview.Client(baseurl=OPENREVIEW_API_V1_URL)
+            self._openreview_clients[version] = client
+        return client
+
+    def _openreview_queries(self, conference, year, status):
+        """Candidate note queries for a venue, tried in order until one returns notes."""
+        venue_prefix = f"{conference}.cc"
+        if status == "Under Review":
+            # Usually under 'Blind_Submission' or 'Submission'
+            queries = [{'invitation': f'{venue_prefix}/{year}/Conference/-/Blind_Submission'}]
+            if int(year) >= 2023:
+                queries.append({'invitation': f'{venue_prefix}/{year}/Conference/-/Submission'})
+            return queries
+        return [{'content': {'venueid': f'{venue_prefix}/{year}/Conference'}}]
+
+    def _openreview_validator(self, conference, year, status):
+        """Cheap fingerprint of a venue (query + note count) fetched with a single one-note request."""
+        client = self._openreview_client(year)
+        for query in self._openreview_queries(conference, year, status):
+            _, count = self._get_openreview_page(client, query, limit=1, with_count=True)
+            if count:
+                return f"{json.dumps(query, sort_keys=True)}#{count}"
+        return None
+
+    def _fetch_openreview_corpus(self, conference, year, status):
+        papers = []
+        validator = None
+        for page, validator in self._iter_openreview_pages(conference, year, status):
+            papers.extend(page)
+        return papers, validator
+
+    def _iter_openreview_pages(self, conference, year, status):
+        """
+        Yield (normalized_papers, validator) for each page of the first venue query that returns notes.
+        The first page reports the total count; the remaining offsets (stepping by the size the
+        server actually returned) are fetched concurrently on openreview_workers threads and yielded
+        in offset order. Without a count, pages are fetched one after another until a short one.
+        The validator (query + total note count) comes from the first page's count.
+        """
+        client = self._openreview_client(year)
+        for query in self._openreview_queries(conference, year, status):
+            print(f"Fetching {status.lower()} from {query}")
+            notes, count = self._get_openreview_page(client, query, with_count=True)
+            if not notes:
+                continue
+
+            validator = f"{json.dumps(query, sort_keys=True)}#{count}" if count is not None else None
+            yield self._normalize_openreview_page(notes, conference, year, status), validator
+            for notes in self._iter_openreview_note_pages(client, query, notes, count):
+                yield self._normalize_openreview_page(notes, conference, year, status), validator
+            return
+
+    def _iter_openreview_note_pages(self, client, query, first_page, count):
+        """Raw note pages of a query after its first page, in offset order."""
+        page_size = len(first_page)
+        if count is None:
+            offset = page_size
+            while True:
+                notes = self._get_openreview_page(client, query, offset=offset)[0]
+                if notes:
+                    yield notes
+                if len(notes) < page_size:
+                    return
+                offset += len(notes)
+
+        offsets = range(page_size, count, page_size)
+        if offsets:
+            fetch_page = metrics.bind(lambda offset: self._get_openreview_page(client, query, offset=offset)[0])
+            with ThreadPoolExecutor(max_workers=min(self.openreview_workers, len(offsets))) as pool:
+                yield from pool.map(fetch_page, offsets)
+
+    def _normalize_openreview_page(self, notes, conference, year, status):
+        with metrics.stage("normalize", "openreview"):
+            papers = [self._normalize_openreview_note(note, conference, year, status) for note in notes]
+        metrics.PAPERS_PROCESSED.inc(len(papers), source="openreview")
+        return papers
+
+    def _get_openreview_page(self, client, query, offset=None, limit=OPENREVIEW_PAGE_SIZE, with_count=False):
+        """
+        Fetch one page of raw note JSON as (notes, count) straight from the notes endpoint, projected to
+        the fields we display. Rate limits and server errors are retried with backoff (honouring Retry-After).
+        """
+        params = self._openreview_params(client, query, offset, limit, with_count)
+        for attempt in range(OPENREVIEW_MAX_RETRIES):
+            with metrics.stage("fetch", "openreview"):
+                # The engine's session, not client.session: the library's own retry adapter would multiply ours
+                response = self.session.get(client.notes_url, params=params, headers=client.headers, timeout=60,
+                                            proxies=self.proxies)
+            metrics.count_request("openreview", response.status_code)
+            if response.status_code == 429 or response.status_code >= 500:
+                delay = self._openreview_retry_delay(response, attempt)
+                print(f"OpenReview returned {response.status_code}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            if response.status_code == 400 and 'select' in params:
+                # This API version rejected the projection: fall back to full notes from now on
+                self._openreview_unprojected.add(client.notes_url)
+                del params['select']
+                continue
+            response.raise_for_status()
+            with metrics.stage("parse", "openreview"):
+                data = response.json()
+            return data.get('notes', []), data.get('count')
+
+        response.raise_for_status()
+        raise RuntimeError(f"OpenReview request failed after {OPENREVIEW_MAX_RETRIES} attempts")
+
+    def _openreview_params(self, client, query, offset, limit, with_count):
+        params = {'limit': limit}
+        if client.notes_url not in self._openreview_unprojected:
+            params['select'] = OPENREVIEW_SELECT
+        if offset:
+            params['offset'] = offset
+        if with_count:
+            params['count'] = 'true'
+        for field, value in query.items():
+            if field == 'content':
+                params.update({f'content.{k}': v for k, v in value.items()})
+            else:
+                params[field] = value
+        return params
+
+    def _openreview_retry_delay(self, response, attempt):
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return float(retry_after)
+        return OPENREVIEW_BACKOFF * (2 ** attempt) + random.uniform(0, OPENREVIEW_BACKOFF)
+
+    def _normalize_openreview_note(self, note, conference, year, status):
+        # note is the raw JSON returned by the notes endpoint
+        content = note.get('content', {})
+        if int(year) >= 2023:
+            # V2 content fields are wrapped as {"value": ...}
+            title = content.get('title', {}).get('value', '')
+            abstract = content.get('abstract', {}).get('value', '')
+            authors = content.get('authors', {}).get('value', [])
+            keywords = content.get('keywords', {}).get('value', [])
+            pdf = content.get('pdf', {}).get('value', '')
+            venue_status = f"{conference} {year} ({status})"
+        else:
+            title = content.get('title', '')
+            abstract = content.get('abstract', '')
+            authors = content.get('authors', [])
+            keywords = content.get('keywords', [])
+            pdf = content.get('pdf', '')
+            venue_status = f"{conference} {year}"
+
+        return {
+            "title": title,
+            "authors": authors,
+            "abstract": abstract,
+            "keywords": keywords,
+            "link": f"https://openreview.net/forum?id={note['id']}",
+            "pdf": f"https://openreview.net{pdf}" if pdf else None,
+            "status": venue_status
+        }
 
     def search_cvf(self, conference, year, keyword):
-        results = []
-        
-        # Validate year for biennial conferences
-        year_int = int(year)
-        if conference == "ECCV" and year_int % 2 != 0:
-            print(f"ECCV is not held in odd years ({year}).")
-            return []
-        if conference == "ICCV" and year_int % 2 == 0:
-            print(f"ICCV is not held in even years ({year}).")
+        if not venue_held(conference, year):
+            print(f"{conference} is not held in {year}.")
             return []
+        return list(self._index_search(conference, year, "Accepted", keyword))
 
-        # Papers hosted on openaccess.thecvf.com
-        # Supports CVPR, ICCV, ECCV
-        
-        # Construct URL based on conference
-        # CVPR: CVPR2023
-        # ICCV: ICCV2023
-        # ECCV: ECCV2022
-        
-        base_url = f"https://openaccess.thecvf.com/{conference}{year}"
-        urls_to_try = [f"{base_url}?day=all", base_url]
-        
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        
-        soup = None
-        for url in urls_to_try:
+    def search_aaai(self, year, keyword):
+        return list(self._index_search("AAAI", year, "Accepted", keyword))
+
+    def iter_search_cvf(self, conference, year, keyword):
+        # Validate year for biennial conferences
+        if not venue_held(conference, year):
+            print(f"{conference} is not held in {year}.")
+            return
+        print(f"Streaming {conference} {year} from CVF Open Access...")
+        yield from self._iter_corpus_search(conference, year, "Accepted", keyword, self._iter_cvf_pages)
+
+    def _cvf_listing_urls(self, conference, year):
+        # Papers hosted on openaccess.thecvf.com, e.g. CVPR2023, ICCV2023, ECCV2022
+        base_url = f"{CVF_BASE_URL}/{conference}{year}"
+        return [f"{base_url}?day=all", base_url]
+
+    def _cvf_validator(self, conference, year):
+        """ETag (or Last-Modified) of the listing page, fetched with a HEAD request."""
+        for url in self._cvf_listing_urls(conference, year):
+            response = self.session.head(url, headers=CVF_HEADERS, verify=False, timeout=15, proxies=self.proxies)
+            metrics.count_request("cvf", response.status_code)
+            if response.status_code == 200:
+                etag = response.headers.get('ETag') or response.headers.get('Last-Modified')
+                return f"{url}#{etag}" if etag else None
+        return None
+
+    def _fetch_cvf_corpus(self, conference, year):
+        papers = []
+        validator = None
+        for page, validator in self._iter_cvf_pages(conference, year):
+            papers.extend(page)
+        return papers, validator
+
+    def _iter_cvf_pages(self, conference, year, status="Accepted"):
+        """
+        Stream the CVF listing (a multi-megabyte page) through lxml's pull parser and yield
+        (papers, validator) for the papers completed by each downloaded chunk.
+        Raises if the listing could not be fetched (404s alone mean the edition is not published).
+        """
+        failures = []
+        for url in self._cvf_listing_urls(conference, year):
             try:
-                response = requests.get(url, headers=headers, verify=False, timeout=15, proxies=self.proxies)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    break
+                response = self.session.get(url, headers=CVF_HEADERS, verify=False, timeout=15, proxies=self.proxies, stream=True)
             except Exception as e:
                 print(f"Failed to fetch {url}: {e}")
-        
-        if soup:
-            # CVF uses <dt class="ptitle"> for titles
-            titles = soup.find_all('dt', class_='ptitle')
-            
-            for dt in titles:
-                title_tag = dt.find('a')
-                if title_tag:
-                    title = title_tag.text.strip()
-                    link = "https://openaccess.thecvf.com" + title_tag['href']
-                    
-                    # Check keyword in title
-                    if keyword.lower() in title.lower():
-                        # Find authors in the next <dd>
-                        dd = dt.find_next_sibling('dd')
-                        authors = []
-                        if dd:
-                            authors_tag = dd.find_all('form')[0].find_next_sibling('div', id='authors')
-                            if authors_tag:
-                                authors = [a.text.strip() for a in authors_tag.find_all('a')]
-                        
-                        # Find PDF link
-                        pdf_link = None
-                        if dd:
-                            pdf_tag = dd.find('a', string='pdf')
-                            if pdf_tag:
-                                pdf_link = "https://openaccess.thecvf.com" + pdf_tag['href']
-                            
-                        results.append({
-                            "title": title,
-                            "authors": authors,
-                            "abstract": "Abstract not available in list view",
-                            "keywords": [],
-                            "link": link,
-                            "pdf": pdf_link,
-                            "status": f"{conference} {year}"
-                        })
-                        
-        return results
+                metrics.count_request("cvf", "error")
+                failures.append(e)
+                continue
+            metrics.count_request("cvf", response.status_code)
+            if response.status_code != 200:
+                response.close()
+                if response.status_code != 404:
+                    failures.append(f"{url} returned HTTP {response.status_code}")
+                continue
 
-    def search_aaai(self, year, keyword):
-        results = []
-        # Use arXiv API to search for AAAI papers
-        # arXiv is usually accessible and many AAAI papers are on arXiv
-        
-        import xml.etree.ElementTree as ET
-        
-        # arXiv API search
-        api_url = "http://export.arxiv.org/api/query"
-        
-        # Search for papers mentioning AAAI and the keyword
-        search_query = f"all:{keyword} AND all:AAAI AND all:{year}"
-        
-        params = {
-            'search_query': search_query,
-            'start': 0,
-            'max_results': 50,
-            'sortBy': 'relevance'
-        }
-        
+            etag = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            validator = f"{url}#{etag}" if etag else None
+
+            parser = etree.HTMLPullParser(events=("end",), tag=("dt", "dd"), encoding=response.encoding or "utf-8")
+            state = {"current": None}
+            # Network reads and parsing interleave; time each separately
+            fetching, parsing = metrics.Stopwatch(), metrics.Stopwatch()
+            total = 0
+            with response:
+                for chunk in fetching.iterate(response.iter_content(chunk_size=64 * 1024)):
+                    with parsing:
+                        parser.feed(chunk)
+                        papers = self._drain_cvf_events(parser, state, conference, year)
+                    total += len(papers)
+                    if papers:
+                        yield papers, validator
+            with parsing:
+                parser.close()
+                papers = self._drain_cvf_events(parser, state, conference, year)
+            if state["current"] is not None:
+                papers.append(state["current"])
+            fetching.observe("fetch", "cvf")
+            parsing.observe("parse", "cvf")
+            metrics.PAPERS_PROCESSED.inc(total + len(papers), source="cvf")
+            if papers:
+                yield papers, validator
+            return
+        if failures:
+            # Lets callers serve a stale corpus instead of caching an empty one
+            raise RuntimeError(f"Could not fetch the {conference} {year} listing: {failures[-1]}")
+
+    def enrich_cvf_abstracts(self, conference, year, background=True):
+        """
+        Fill in the abstracts missing from a cached CVF corpus by fetching each paper's detail page.
+        Runs once per venue at a time (in a daemon thread unless background=False); progress is
+        checkpointed into the corpus cache so every abstract is fetched exactly once. Pages that
+        yield no abstract are recorded and skipped for CVF_ENRICH_RETRY_AFTER seconds.
+        """
+        key = self.corpus_cache.key(conference, year, "Accepted")
+        with self._enrichment_lock:
+            job = self._enrichment_jobs.get(key)
+            if job is not None and job.is_alive():
+                return job
+            if background:
+                job = threading.Thread(target=self._enrich_cvf_corpus, args=(conference, year), name=f"enrich-{key}", daemon=True)
+                self._enrichment_jobs[key] = job
+                job.start()
+                return job
+        self._enrich_cvf_corpus(conference, year)
+        return None
+
+    def _enrich_cvf_corpus(self, conference, year):
+        entry = self.corpus_cache.load(conference, year, "Accepted")
+        if entry is None:
+            return 0
+        now = time.time()
+        failed = entry.setdefault("enrich_failed", {})
+        pending = [paper for paper in entry["papers"] if not paper["abstract"] and failed.get(paper["link"], 0) <= now]
+
+        enriched = 0
+        if pending:
+            print(f"Enriching {len(pending)} {conference} {year} abstracts from CVF detail pages...")
+            limiter = RateLimiter(CVF_ENRICH_INTERVAL)
+            with ThreadPoolExecutor(max_workers=self.cvf_enrich_workers) as pool:
+                abstracts = pool.map(lambda paper: self._fetch_cvf_abstract(paper["link"], limiter), pending)
+                for paper, abstract in zip(pending, abstracts):
+                    if not abstract:
+                        failed[paper["link"]] = time.time() + CVF_ENRICH_RETRY_AFTER
+                        continue
+                    paper["abstract"] = abstract
+                    failed.pop(paper["link"], None)
+                    enriched += 1
+                    if enriched % CVF_ENRICH_CHECKPOINT == 0:
+                        self._checkpoint_enrichment(entry)
+            print(f"Enriched {enriched}/{len(pending)} {conference} {year} abstracts.")
+
+        # Forget pages that are no longer in the corpus or gained an abstract elsewhere
+        missing = {paper["link"] for paper in entry["papers"] if not paper["abstract"]}
+        entry["enrich_failed"] = {link: at for link, at in failed.items() if link in missing}
+        retry_at = min(entry["enrich_failed"].values(), default=None)
+        if pending or entry.get("enrich_retry_at", 0) != retry_at:
+            entry["enrich_retry_at"] = retry_at
+            self._checkpoint_enrichment(entry)
+        return enriched
+
+    def _checkpoint_enrichment(self, entry):
+        # Skip if the corpus was re-downloaded meanwhile; the new copy inherits abstracts on its own
+        if self.corpus_cache.load(entry["source"], entry["year"], entry["status"]) is not entry:
+            return
+        self.corpus_cache.persist(entry)
+        # Rebuild the index on next use so matching sees the new abstracts
+        self._indexes.pop(self.corpus_cache.key(entry["source"], entry["year"], entry["status"]), None)
+
+    def _fetch_cvf_abstract(self, url, limiter):
+        """Abstract text of a CVF paper page (<div id="abstract">), or None."""
+        for attempt in range(CVF_ENRICH_RETRIES):
+            limiter.wait()
+            try:
+                response = self.session.get(url, headers=CVF_HEADERS, verify=False, timeout=15, proxies=self.proxies)
+            except Exception as e:
+                print(f"Failed to fetch {url}: {e}")
+                metrics.count_request("cvf", "error")
+                time.sleep(CVF_ENRICH_INTERVAL * (2 ** attempt))
+                continue
+            metrics.count_request("cvf", response.status_code)
+            if response.status_code == 429 or response.status_code >= 500:
+                time.sleep(CVF_ENRICH_INTERVAL * (2 ** attempt))
+                continue
+            if response.status_code != 200:
+                return None
+            nodes = etree.HTML(response.content).xpath('//div[@id="abstract"]')
+            return " ".join("".join(nodes[0].itertext()).split()) if nodes else None
+        return None
+
+    def _drain_cvf_events(self, parser, state, conference, year):
+        """
+        Turn parsed <dt class="ptitle"> / <dd> elements into paper records.
+        A record is complete once the next title starts; elements are freed as soon as they are read.
+        """
+        papers = []
+        for _, elem in parser.read_events():
+            if elem.tag == "dt" and "ptitle" in (elem.get("class") or ""):
+                if state["current"] is not None:
+                    papers.append(state["current"])
+                state["current"] = None
+                title_tag = elem.find(".//a")
+                if title_tag is not None:
+                    state["current"] = {
+                        "title": "".join(title_tag.itertext()).strip(),
+                        "authors": [],
+                        "abstract": "",
+                        "keywords": [],
+                        "link": CVF_BASE_URL + title_tag.get("href", ""),
+                        "pdf": None,
+                        "status": f"{conference} {year}"
+                    }
+            elif elem.tag == "dd" and state["current"] is not None:
+                paper = state["current"]
+                # Authors are search forms: <form class="authsearch"><input name="query_author" value="...">
+                paper["authors"].extend(elem.xpath('.//input[@name="query_author"]/@value'))
+                for link in elem.iter("a"):
+                    if (link.text or "").strip() == "pdf" and link.get("href"):
+                        paper["pdf"] = CVF_BASE_URL + link.get("href")
+
+            # Keep memory flat: drop the element and everything parsed before it
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        return papers
+
+    def iter_search_aaai(self, year, keyword):
+        # Use the arXiv API to harvest AAAI papers (many AAAI papers are on arXiv, with the venue
+        # in their comment or journal_ref); the harvested corpus is cached like the other venues
+        print(f"Streaming AAAI {year} from arXiv...")
+        yield from self._iter_corpus_search("AAAI", year, "Accepted", keyword, self._iter_aaai_pages)
+
+    def _aaai_query(self, year):
+        return f"(co:AAAI OR jr:AAAI) AND (co:{year} OR jr:{year})"
+
+    def _arxiv_get(self, params, stream=False):
+        # arXiv asks API clients to space out their requests
+        with metrics.stage("throttle", "aaai"):
+            self._arxiv_limiter.wait()
+        try:
+            with metrics.stage("fetch", "aaai"):
+                response = self._arxiv_request(params, stream)
+        except Exception:
+            metrics.count_request("arxiv", "error")
+            raise
+        metrics.count_request("arxiv", response.status_code)
+        return response
+
+    def _arxiv_request(self, params, stream):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        
+        # arXiv uses HTTP, not HTTPS - often works better with proxies
+        # Try with proxy first
+        if self.proxies:
+            try:
+                return self.session.get(ARXIV_API_URL, params=params, headers=headers, timeout=30, proxies=self.proxies, stream=stream)
+            except Exception:
+                # Fallback to direct connection
+                pass
+        return self.session.get(ARXIV_API_URL, params=params, headers=headers, timeout=30, stream=stream)
+
+    def _aaai_validator(self, year):
+        """Total number of arXiv hits for the AAAI query, read from an empty result page."""
+        query = self._aaai_query(year)
+        response = self._arxiv_get({'search_query': query, 'start': 0, 'max_results': 0})
+        response.raise_for_status()
+        total = ET.fromstring(response.content).findtext('opensearch:totalResults', '', ARXIV_NS)
+        return f"{query}#{total}" if total else None
+
+    def _iter_aaai_pages(self, source, year, status="Accepted"):
+        """
+        Page through every arXiv hit for the AAAI query and yield (papers, validator) per page,
+        keeping only entries whose metadata confirms AAAI of the target year.
+        """
+        query = self._aaai_query(year)
+        seen = set()
+        start = 0
+        while start < AAAI_HARVEST_MAX:
+            response = self._arxiv_get({
+                'search_query': query,
+                'start': start,
+                'max_results': ARXIV_PAGE_SIZE,
+                'sortBy': 'submittedDate',
+                'sortOrder': 'descending'
+            }, stream=True)
+            response.raise_for_status()
+
+            feed = {"total": 0, "entries": 0}
+            with response:
+                for paper in self._iter_arxiv_feed(response, year, feed):
+                    if paper["link"] not in seen:
+                        seen.add(paper["link"])
+                        yield [paper], f"{query}#{feed['total']}"
+            if not feed["entries"]:
+                break
+
+            start += feed["entries"]
+            if start >= feed["total"]:
+                break
+
+    def _iter_arxiv_feed(self, response, year, feed):
+        """
+        Incrementally parse an arXiv Atom response and yield AAAI papers as their <entry> closes.
+        feed receives the total hit count and the number of raw entries seen. Processed entries
+        are removed from the tree so memory stays flat however large the page is.
+        """
+        # Let urllib3 undo any gzip transfer encoding while we read the raw stream
+        response.raw.decode_content = True
+        root = None
+        # The parser pulls the body as it goes: parse time is the parser's time minus its reads
+        reading, parsing = metrics.Stopwatch(), metrics.Stopwatch()
         try:
-            # arXiv uses HTTP, not HTTPS - often works better with proxies
-            # Try with proxy first
-            if self.proxies:
-                try:
-                    response = requests.get(api_url, params=params, headers=headers, timeout=30, proxies=self.proxies)
-                except:
-                    # Fallback to direct connection
-                    response = requests.get(api_url, params=params, headers=headers, timeout=30)
-            else:
-                response = requests.get(api_url, params=params, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                # Parse XML response
-                root = ET.fromstring(response.content)
-                
-                # Define namespace
-                ns = {
-                    'atom': 'http://www.w3.org/2005/Atom',
-                    'arxiv': 'http://arxiv.org/schemas/atom'
-                }
-                
-                entries = root.findall('atom:entry', ns)
-                
-                for entry in entries:
-                    # Get metadata
-                    comment = entry.find('arxiv:comment', ns)
-                    journal_ref = entry.find('arxiv:journal_ref', ns)
-                    
-                    comment_text = comment.text.lower() if comment is not None and comment.text else ""
-                    journal_text = journal_ref.text.lower() if journal_ref is not None and journal_ref.text else ""
-                    
-                    # Strict AAAI Filtering
-                    # Must contain "aaai" AND the target year in metadata (comments or journal ref)
-                    # This filters out papers that just cite AAAI or mention it in abstract
-                    target_year_str = str(year)
-                    is_aaai = False
-                    
-                    meta_text = f"{comment_text} {journal_text}"
-                    
-                    if "aaai" in meta_text and target_year_str in meta_text:
-                        is_aaai = True
-                    
-                    if not is_aaai:
-                        continue
+            for event, elem in parsing.iterate(ET.iterparse(reading.reader(response.raw), events=("start", "end"))):
+                if root is None:
+                    root = elem
+                if event != "end":
+                    continue
+                if elem.tag == ATOM_TOTAL_RESULTS:
+                    feed["total"] = int(elem.text or 0)
+                elif elem.tag == ATOM_ENTRY:
+                    feed["entries"] += 1
+                    with parsing:
+                        paper = self._parse_arxiv_entry(elem, year)
+                        root.remove(elem)
+                    if paper is not None:
+                        yield paper
+        finally:
+            reading.observe("fetch", "aaai")
+            parsing.observe("parse", "aaai", minus=reading.elapsed)
+            metrics.PAPERS_PROCESSED.inc(feed["entries"], source="aaai")
 
-                    title = entry.find('atom:title', ns)
-                    title = title.text.strip().replace('\n', ' ') if title is not None else ''
-                    
-                    summary = entry.find('atom:summary', ns)
-                    abstract = summary.text.strip().replace('\n', ' ') if summary is not None else ''
-                    
-                    # Get authors
-                    authors = []
-                    for author in entry.findall('atom:author', ns):
-                        name = author.find('atom:name', ns)
-                        if name is not None:
-                            authors.append(name.text)
-                    
-                    # Get link
-                    link = ''
-                    pdf = None
-                    for l in entry.findall('atom:link', ns):
-                        if l.get('type') == 'text/html':
-                            link = l.get('href', '')
-                        elif l.get('title') == 'pdf':
-                            pdf = l.get('href', '')
-                    
-                    if not link:
-                        id_elem = entry.find('atom:id', ns)
-                        link = id_elem.text if id_elem is not None else ''
-                    
-                    results.append({
-                        "title": title,
-                        "authors": authors,
-                        "abstract": abstract,
-                        "keywords": [],
-                        "link": link,
-                        "pdf": pdf,
-                        "status": f"AAAI {year} (via arXiv)"
-                    })
-                        
-        except Exception as e:
-            print(f"Error searching AAAI via arXiv: {e}")
-            
-        return results
+    def _parse_arxiv_entry(self, entry, year):
+        """Normalize one Atom <entry>, or None if it is not an AAAI paper of the given year."""
+        # Check the venue metadata first so rejected entries cost no further lookups
+        comment = entry.find('arxiv:comment', ARXIV_NS)
+        journal_ref = entry.find('arxiv:journal_ref', ARXIV_NS)
 
-    def _match(self, keyword, title, abstract, keywords):
-        q = keyword.lower()
-        if q in title.lower():
-            return True
-        if abstract and q in abstract.lower():
-            return True
-        if keywords and any(q in k.lower() for k in keywords):
-            return True
-        return False
+        comment_text = comment.text.lower() if comment is not None and comment.text else ""
+        journal_text = journal_ref.text.lower() if journal_ref is not None and journal_ref.text else ""
+
+        # Strict AAAI Filtering
+        # Must contain "aaai" AND the target year in metadata (comments or journal ref)
+        # This filters out papers that just cite AAAI or mention it in abstract
+        meta_text = f"{comment_text} {journal_text}"
+        if "aaai" not in meta_text or str(year) not in meta_text:
+            return None
+
+        title = entry.find('atom:title', ARXIV_NS)
+        title = title.text.strip().replace('\n', ' ') if title is not None else ''
+
+        summary = entry.find('atom:summary', ARXIV_NS)
+        abstract = summary.text.strip().replace('\n', ' ') if summary is not None else ''
+
+        # Get authors
+        authors = []
+        for author in entry.findall('atom:author', ARXIV_NS):
+            name = author.find('atom:name', ARXIV_NS)
+            if name is not None:
+                authors.append(name.text)
+
+        # Get link
+        link = ''
+        pdf = None
+        for l in entry.findall('atom:link', ARXIV_NS):
+            if l.get('type') == 'text/html':
+                link = l.get('href', '')
+            elif l.get('title') == 'pdf':
+                pdf = l.get('href', '')
+
+        if not link:
+            id_elem = entry.find('atom:id', ARXIV_NS)
+            link = id_elem.text if id_elem is not None else ''
+
+        return {
+            "title": title,
+            "authors": authors,
+            "abstract": abstract,
+            "keywords": [],
+            "link": link,
+            "pdf": pdf,
+            "status": f"AAAI {year} (via arXiv)"
+        }
+
+def iter_json_array_items(pieces, key):
+    """
+    Incrementally parse a streamed JSON object and yield each element of its top-level array under
+    key as soon as that element is complete, e.g. every {"id", "reason"} of {"recommendations": [...]}.
+    """
+    pieces = iter(pieces)
+    buffer = ""
+    pos = 0             # next character to scan
+    in_array = False
+    depth = 0           # nesting depth inside the array
+    in_string = False
+    escaped = False
+    start = None        # start of the element being read
+    for piece in pieces:
+        buffer += piece
+        if not in_array:
+            marker = buffer.find(f'"{key}"')
+            bracket = buffer.find("[", marker) if marker != -1 else -1
+            if bracket == -1:
+                continue
+            in_array = True
+            pos = bracket + 1
+
+        while pos < len(buffer):
+            char = buffer[pos]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                if depth == 0:
+                    start = pos
+                depth += 1
+            elif char in "}]":
+                if depth == 0:
+                    # End of the array; drain the rest so the producer can finish (and cache)
+                    for _ in pieces:
+                        pass
+                    return
+                depth -= 1
+                if depth == 0:
+                    yield json.loads(buffer[start:pos + 1])
+            pos += 1
+
+
+def _min_max(values):
+    spread = values.max() - values.min() if len(values) else 0
+    return (values - values.min()) / spread if spread > 0 else np.zeros_like(values)
+
+def merge_results(result_lists):
+    """Concatenate result lists, dropping papers already seen by link or by normalized title."""
+    merged = []
+    seen = set()
+    for results in result_lists:
+        for paper in results:
+            title_key = " ".join(paper["title"].lower().split())
+            if paper["link"] in seen or title_key in seen:
+                continue
+            seen.add(paper["link"])
+            seen.add(title_key)
+            merged.append(paper)
+    return merged
+
+# DeepSeek clients keyed by API key, shared across Streamlit reruns and users
+MAX_LLM_CLIENTS = 64
+_llm_clients = OrderedDict()
+_llm_clients_lock = threading.Lock()
+
+def get_llm_client(api_key):
+    with _llm_clients_lock:
+        client = _llm_clients.get(api_key)
+        if client is None:
+            client = OpenAI(api_key=api_key, base_url=DEEPSEEK_BASE_URL)
+            _llm_clients[api_key] = client
+            if len(_llm_clients) > MAX_LLM_CLIENTS:
+                _llm_clients.popitem(last=False)
+        else:
+            _llm_clients.move_to_end(api_key)
+        return client
 
 # Factory/Helper function
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
 def get_search_engine(api_key=None):
-    return SearchEngine(api_key)
+    """Return the process-wide engine bound to api_key (cheap: only the key differs per caller)."""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = SearchEngine()
+    return _shared_engine.with_api_key(api_key)
+
+
+if __name__ == "__main__":
+    # Prefetch entry point for deployments:
+    #   python search_engine.py prefetch ICLR:2024 NeurIPS:2023 --status Accepted "Under Review"
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simple-Search-AI backend utilities")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    prefetch_parser = subparsers.add_parser("prefetch", help="Warm the local venue corpus cache")
+    prefetch_parser.add_argument("venues", nargs="*", help="CONFERENCE:YEAR pairs (default: all venues)")
+    prefetch_parser.add_argument("--status", nargs="+", default=["Accepted"], choices=["Accepted", "Under Review"])
+    args = parser.parse_args()
+
+    if args.command == "prefetch":
+        venues = [tuple(v.split(":", 1)) for v in args.venues] or None
+        counts = get_search_engine().prefetch(venues, statuses=args.status)
+        for (source, year, status), count in counts.items():
+            print(f"{source} {year} ({status}): {count} papers")
@@ -0,0 +1,185 @@
+import re
+import math
+import bisect
+from array import array
+from collections import Counter
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Token id placed between fields (and between keywords) so phrases never straddle them
+SEPARATOR = 0xFFFFFFFF
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class InvertedIndex:
+    """
+    Inverted index over the title, abstract and keywords of a list of paper dicts.
+
+    Postings are kept as compact arrays (term -> sorted doc ids and term frequencies) and every
+    document keeps its token-id sequence, which is used to verify phrases on the few candidates
+    left after intersecting postings.
+    """
+
+    def __init__(self, papers, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_ids = {}
+        self.postings = []      # term id -> array of doc ids (ascending)
+        self.frequencies = []   # term id -> array of term frequencies, parallel to postings
+        self.doc_tokens = []    # doc id -> array of term ids, fields separated by SEPARATOR
+        self.doc_lengths = []
+
+        term_ids = self.term_ids
+        for doc_id, paper in enumerate(papers):
+            tokens = array('I')
+            for text in self._field_texts(paper):
+                if tokens:
+                    tokens.append(SEPARATOR)
+                # setdefault hands out the next id to unseen terms in a single dict operation
+                tokens.extend([term_ids.setdefault(token, len(term_ids)) for token in tokenize(text)])
+
+            while len(self.postings) < len(term_ids):
+                self.postings.append(array('I'))
+                self.frequencies.append(array('I'))
+
+            counts = Counter(tokens)
+            counts.pop(SEPARATOR, None)
+            for term_id, count in counts.items():
+                self.postings[term_id].append(doc_id)
+                self.frequencies[term_id].append(count)
+            self.doc_tokens.append(tokens)
+            self.doc_lengths.append(len(tokens) - tokens.count(SEPARATOR))
+
+        self.vocabulary = sorted(self.term_ids)
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+
+    def __len__(self):
+        return len(self.doc_tokens)
+
+    def _field_texts(self, paper):
+        yield paper.get("title") or ""
+        yield paper.get("abstract") or ""
+        for keyword in paper.get("keywords") or []:
+            yield keyword
+
+    # ------------------------------------------------------------------
+    # Term-level lookups
+    # ------------------------------------------------------------------
+    def term(self, term):
+        """Doc ids containing the exact (lowercased) term."""
+        term_id = self.term_ids.get(term.lower())
+        return set(self.postings[term_id]) if term_id is not None else set()
+
+    def expand_prefix(self, prefix):
+        """Term ids of every vocabulary entry starting with prefix."""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        term_ids = []
+        for word in self.vocabulary[start:]:
+            if not word.startswith(prefix):
+                break
+            term_ids.append(self.term_ids[word])
+        return term_ids
+
+    def prefix(self, prefix):
+        """Doc ids containing any term starting with prefix."""
+        return self._docs_for(self.expand_prefix(prefix))
+
+    def phrase(self, phrase, prefix_last=False):
+        """Doc ids containing the tokens of phrase consecutively within one field."""
+        groups = self._term_groups(tokenize(phrase), prefix_last)
+        return self._match_groups(groups) if groups else set()
+
+    # ------------------------------------------------------------------
+    # Ranked search
+    # ------------------------------------------------------------------
+    def search(self, query, prefix_last=True):
+        """
+        BM25-ranked [(doc_id, score)] for a keyword query.
+        The query is matched as a phrase; with prefix_last the final token also matches longer
+        words ("diffusion model" finds "diffusion models"), mirroring substring keyword search.
+        """
+        groups = self._term_groups(tokenize(query), prefix_last)
+        if not groups:
+            return []
+
+        matches = self._match_groups(groups)
+        query_terms = {term_id for group in groups for term_id in group}
+        scored = [(doc_id, self._bm25(doc_id, query_terms)) for doc_id in matches]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored
+
+    def bm25_scores(self, query):
+        """BM25 score of every document for the query's terms (any term may match), as a list."""
+        scores = [0.0] * len(self.doc_tokens)
+        n_docs = len(self.doc_tokens)
+        for token in set(tokenize(query)):
+            term_id = self.term_ids.get(token)
+            if term_id is None:
+                continue
+            docs = self.postings[term_id]
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in zip(docs, self.frequencies[term_id]):
+                length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_length or 1))
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + length_norm)
+        return scores
+
+    def _term_groups(self, tokens, prefix_last):
+        """One list of acceptable term ids per query token, or None if a token is unknown."""
+        groups = []
+        for i, token in enumerate(tokens):
+            if prefix_last and i == len(tokens) - 1:
+                term_ids = self.expand_prefix(token)
+            else:
+                term_id = self.term_ids.get(token)
+                term_ids = [term_id] if term_id is not None else []
+            if not term_ids:
+                return None
+            groups.append(term_ids)
+        return groups
+
+    def _docs_for(self, term_ids):
+        docs = set()
+        for term_id in term_ids:
+            docs.update(self.postings[term_id])
+        return docs
+
+    def _match_groups(self, groups):
+        # Intersect the smallest postings first so the candidate set shrinks quickly
+        doc_sets = sorted((self._docs_for(group) for group in groups), key=len)
+        candidates = doc_sets[0]
+        for docs in doc_sets[1:]:
+            candidates = candidates & docs
+            if not candidates:
+                return set()
+
+        if len(groups) == 1:
+            return candidates
+        allowed = [set(group) for group in groups]
+        return {doc_id for doc_id in candidates if self._contains_sequence(self.doc_tokens[doc_id], allowed)}
+
+    def _contains_sequence(self, tokens, allowed):
+        width = len(allowed)
+        first = allowed[0]
+        for start in range(len(tokens) - width + 1):
+            if tokens[start] in first and all(tokens[start + j] in allowed[j] for j in range(1, width)):
+                return True
+        return False
+
+    def _bm25(self, doc_id, term_ids):
+        n_docs = len(self.doc_tokens)
+        length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_length or 1))
+        score = 0.0
+        for term_id in term_ids:
+            docs = self.postings[term_id]
+            pos = bisect.bisect_left(docs, doc_id)
+            if pos == len(docs) or docs[pos] != doc_id:
+                continue
+            tf = self.frequencies[term_id][pos]
+            df = len(docs)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            score += idf * tf * (self.k1 + 1) / (tf + length_norm)
+        return score
@@ -0,0 +1,451 @@
+"""
+Standalone HTTP/JSON search service: one warm SearchEngine (corpora, indexes, result and LLM caches,
+background prefetching) shared by any number of app.py instances and other tools.
+
+    python search_service.py --port 8765 --workers 8
+    SEARCH_SERVICE_URL=http://127.0.0.1:8765 streamlit run app.py
+
+Every endpoint takes a JSON body by POST. Streaming endpoints (search, federated, rerank) answer with
+one JSON object per line as results become available, so clients can render them progressively.
+The DeepSeek key of the caller, if any, is passed in the X-DeepSeek-Key header.
+"""
+import os
+import sys
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+import metrics
+from search_engine import get_search_engine
+from result_cache import get_result_cache
+from prefetch_scheduler import get_prefetch_scheduler
+
+SERVICE_PORT = int(os.getenv("SEARCH_SERVICE_PORT", "8765"))
+SERVICE_WORKERS = 8
+# Requests waiting for a worker beyond this are refused with 503 instead of queueing without bound
+SERVICE_MAX_PENDING = 64
+# Seconds a request may take before the client gets a 504; the work itself finishes in the
+# background and warms the caches for the retry
+SERVICE_TIMEOUT = float(os.getenv("SEARCH_SERVICE_TIMEOUT", "120"))
+# Set SEARCH_SERVICE_URL to make app.py a client of a running service
+SERVICE_URL = os.getenv("SEARCH_SERVICE_URL", "")
+
+_END = object()
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class RemoteSearchError(RuntimeError):
+    pass
+
+
+def _json_default(value):
+    if hasattr(value, "item"):
+        # numpy scalars (similarity and pre-rank scores)
+        return value.item()
+    if hasattr(value, "keys"):
+        # PaperRecord views into a PaperStore
+        return dict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+class SearchService:
+    """
+    The operations behind the HTTP endpoints. Each runs on a bounded worker pool; callers wait at
+    most timeout seconds for it.
+    """
+
+    STREAMING = ("search", "federated", "rerank")
+
+    def __init__(self, engine=None, result_cache=None, prefetcher=None, workers=SERVICE_WORKERS,
+                 max_pending=SERVICE_MAX_PENDING, timeout=SERVICE_TIMEOUT):
+        self.engine = engine or get_search_engine()
+        self.result_cache = result_cache or get_result_cache()
+        self.prefetcher = prefetcher
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search-service")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ServiceBusy(f"{self._pending} requests pending")
+            self._pending += 1
+        future = self.pool.submit(metrics.bind(fn), *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _engine(self, api_key):
+        return self.engine.with_api_key(api_key) if api_key else self.engine
+
+    def call(self, name, payload, api_key=None):
+        """Run a non-streaming operation and return its result (TimeoutError past the deadline)."""
+        future = self._submit(getattr(self, f"op_{name}"), self._engine(api_key), payload)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"{name} took longer than {self.timeout:.0f}s")
+
+    def stream(self, name, payload, api_key=None):
+        """Run a streaming operation on a worker and yield its items as they are produced."""
+        items = queue.Queue()
+
+        def produce(engine, payload):
+            try:
+                for item in getattr(self, f"op_{name}")(engine, payload):
+                    items.put(("item", item))
+            except Exception as e:
+                items.put(("error", e))
+            items.put((_END, None))
+
+        self._submit(produce, self._engine(api_key), payload)
+        deadline = threading.Event()
+        timer = threading.Timer(self.timeout, deadline.set)
+        timer.daemon = True
+        timer.start()
+        try:
+            while True:
+                try:
+                    kind, value = items.get(timeout=0.5)
+                except queue.Empty:
+                    if deadline.is_set():
+                        raise TimeoutError(f"{name} took longer than {self.timeout:.0f}s")
+                    continue
+                if kind is _END:
+                    return
+                if kind == "error":
+                    raise value
+                yield value
+        finally:
+            timer.cancel()
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+    def op_search(self, engine, p):
+        """Keyword search, answered from the shared result cache when the corpus is unchanged."""
+        source, year, keyword, status = p["source"], str(p["year"]), p["keyword"], p.get("status", "Accepted")
+        version = engine.corpus_version(source, year, status)
+        results = self.result_cache.get(source, year, status, keyword, version)
+        if results is not None:
+            yield from results
+            return
+        results = []
+        for paper in engine.iter_search(source, year, keyword, status):
+            results.append(paper)
+            yield paper
+        # Only index-ordered results are shared; a cold venue streams in download order
+        if version is not None:
+            self.result_cache.put(source, year, status, keyword, version, results)
+
+    def op_search_many(self, engine, p):
+        results, hits = self.result_cache.search_many(engine, p["source"], str(p["year"]), p["keywords"],
+                                                      p.get("status", "Accepted"))
+        return {"results": results, "hits": hits}
+
+    def op_corpus_version(self, engine, p):
+        return engine.corpus_version(p["source"], str(p["year"]), p.get("status", "Accepted"))
+
+    def op_semantic(self, engine, p):
+        return engine.semantic_search(p["source"], str(p["year"]), p["query"], p.get("status", "Accepted"),
+                                      top_k=int(p.get("top_k", 50)))
+
+    def op_federated(self, engine, p):
+        venues = [tuple(venue) for venue in p["venues"]]
+        for source, year, results in engine.iter_search_federated(venues, p["keyword"], p.get("status", "Accepted")):
+            yield [source, year, results]
+
+    def op_keywords(self, engine, p):
+        return engine.extract_keywords_with_deepseek(p["intent"])
+
+    def op_prerank(self, engine, p):
+        kwargs = {key: p[key] for key in ("top_k", "source", "year", "status") if p.get(key) is not None}
+        return engine.prerank_papers(p["query"], p["papers"], **kwargs)
+
+    def op_rerank(self, engine, p):
+        return engine.iter_rerank_papers(p["intent"], p["papers"], top_n=int(p.get("top_n", 25)))
+
+    def op_prefetch(self, engine, p):
+        if self.prefetcher is None:
+            return False
+        self.prefetcher.request_conference(p["source"], str(p["year"]), p.get("status", "Accepted"), years=p.get("years"))
+        return True
+
+    def op_stats(self, engine, p):
+        stats = {"result_cache": self.result_cache.stats(), "pending": self._pending}
+        if self.prefetcher is not None:
+            prefetch = self.prefetcher.stats()
+            # Tuple keys do not survive JSON; send venues as lists
+            prefetch["running"] = [list(venue) for venue in prefetch["running"]]
+            prefetch["last_refresh"] = [list(venue) + [when] for venue, when in prefetch["last_refresh"].items()]
+            stats["prefetch"] = prefetch
+        return stats
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    service = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            return self._send(200, metrics.render().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+        if path == "/health":
+            return self._send_json(200, {"status": "ok"})
+        self._send_json(404, {"error": f"unknown endpoint {path}"})
+
+    def do_POST(self):
+        name = self.path.split("?")[0].strip("/")
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        except ValueError as e:
+            return self._send_json(400, {"error": f"invalid JSON: {e}"})
+        if not hasattr(self.service, f"op_{name}"):
+            return self._send_json(404, {"error": f"unknown endpoint /{name}"})
+
+        api_key = self.headers.get("X-DeepSeek-Key") or None
+        if name in SearchService.STREAMING:
+            return self._stream(name, payload, api_key)
+        try:
+            with metrics.stage("service", name):
+                result = self.service.call(name, payload, api_key)
+        except Exception as e:
+            return self._send_error(e)
+        self._send_json(200, {"result": result})
+
+    def _stream(self, name, payload, api_key):
+        items = self.service.stream(name, payload, api_key)
+        try:
+            # Fail with a proper status if the operation cannot start or fails before its first item
+            first = next(items, _END)
+        except Exception as e:
+            return self._send_error(e)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            if first is not _END:
+                self._write_chunk(dumps({"item": first}) + "\n")
+                for item in items:
+                    self._write_chunk(dumps({"item": item}) + "\n")
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        except Exception as e:
+            self._write_chunk(dumps({"error": f"{type(e).__name__}: {e}"}) + "\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_error(self, e):
+        if isinstance(e, ServiceBusy):
+            status = 503
+        elif isinstance(e, TimeoutError):
+            status = 504
+        elif isinstance(e, (KeyError, ValueError, TypeError)):
+            status = 400
+        else:
+            status = 500
+        self._send_json(status, {"error": f"{type(e).__name__}: {e}"})
+
+    def _send_json(self, status, body):
+        self._send(status, dumps(body).encode("utf-8"), "application/json")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def make_server(service, host="127.0.0.1", port=SERVICE_PORT):
+    """An HTTP server (not yet serving) dispatching to service; port 0 picks a free port."""
+    handler = type("Handler", (ServiceHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+class RemoteSearchEngine:
+    """
+    Client of a running search service with the SearchEngine methods app.py uses, so the UI works
+    unchanged against a shared backend.
+    """
+
+    def __init__(self, base_url, api_key=None, timeout=SERVICE_TIMEOUT + 10):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def with_api_key(self, api_key):
+        engine = RemoteSearchEngine.__new__(RemoteSearchEngine)
+        engine.__dict__.update(self.__dict__, api_key=api_key)
+        return engine
+
+    def _headers(self):
+        return {"X-DeepSeek-Key": self.api_key} if self.api_key else {}
+
+    def _post(self, name, payload, stream=False):
+        response = self.session.post(f"{self.base_url}/{name}", data=dumps(payload).encode("utf-8"),
+                                     headers=self._headers(), timeout=self.timeout, stream=stream)
+        if response.status_code != 200:
+            try:
+                message = response.json().get("error")
+            except ValueError:
+                message = response.text
+            raise RemoteSearchError(f"{name} failed ({response.status_code}): {message}")
+        return response
+
+    def _call(self, name, payload):
+        return self._post(name, payload).json()["result"]
+
+    def _stream(self, name, payload):
+        response = self._post(name, payload, stream=True)
+        with response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                if "error" in message:
+                    raise RemoteSearchError(f"{name} failed: {message['error']}")
+                yield message["item"]
+
+    def corpus_version(self, source, year, status="Accepted"):
+        return self._call("corpus_version", {"source": source, "year": year, "status": status})
+
+    def iter_search(self, source, year, keyword, status="Accepted"):
+        return self._stream("search", {"source": source, "year": year, "keyword": keyword, "status": status})
+
+    def search(self, source, year, keyword, status="Accepted"):
+        return list(self.iter_search(source, year, keyword, status))
+
+    def search_many(self, source, year, keywords, status="Accepted"):
+        return self._call("search_many", {"source": source, "year": year, "keywords": keywords, "status": status})["results"]
+
+    def semantic_search(self, source, year, query, status="Accepted", top_k=50):
+        return self._call("semantic", {"source": source, "year": year, "query": query, "status": status, "top_k": top_k})
+
+    def iter_search_federated(self, venues, keyword, status="Accepted"):
+        payload = {"venues": [list(venue) for venue in venues], "keyword": keyword, "status": status}
+        for source, year, results in self._stream("federated", payload):
+            yield source, year, results
+
+    def extract_keywords_with_deepseek(self, user_prompt):
+        return self._call("keywords", {"intent": user_prompt})
+
+    def prerank_papers(self, query, papers_list, top_k=None, source=None, year=None, status="Accepted"):
+        payload = {"query": query, "papers": papers_list, "top_k": top_k, "source": source, "year": year, "status": status}
+        return self._call("prerank", payload)
+
+    def iter_rerank_papers(self, user_prompt, papers_list, top_n=25):
+        return self._stream("rerank", {"intent": user_prompt, "papers": papers_list, "top_n": top_n})
+
+    def deepseek_rerank_papers(self, user_prompt, papers_list, top_n=25):
+        return list(self.iter_rerank_papers(user_prompt, papers_list, top_n))
+
+    def request_prefetch(self, source, year, status="Accepted", years=None):
+        return self._call("prefetch", {"source": source, "year": year, "status": status, "years": years})
+
+    def stats(self):
+        return self._call("stats", {})
+
+
+class RemotePrefetcher:
+    """The PrefetchScheduler calls app.py makes, forwarded to the service's scheduler."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def request_conference(self, source, year, status="Accepted", years=None):
+        try:
+            self.engine.request_prefetch(source, year, status, years=years)
+        except (requests.RequestException, RemoteSearchError) as e:
+            print(f"Could not request prefetch of {source} {year}: {e}")
+
+    def stats(self):
+        try:
+            prefetch = self.engine.stats().get("prefetch")
+        except (requests.RequestException, RemoteSearchError) as e:
+            print(f"Could not read service stats: {e}")
+            prefetch = None
+        if not prefetch:
+            return {"queued": 0, "running": [], "last_refresh": {}}
+        prefetch["last_refresh"] = {tuple(item[:3]): item[3] for item in prefetch["last_refresh"]}
+        return prefetch
+
+
+_shared_remote = {}
+_shared_remote_lock = threading.Lock()
+
+def get_remote_search_engine(base_url, api_key=None):
+    """Process-wide client of the service at base_url (one connection pool), bound to api_key."""
+    with _shared_remote_lock:
+        if base_url not in _shared_remote:
+            _shared_remote[base_url] = RemoteSearchEngine(base_url)
+    return _shared_remote[base_url].with_api_key(api_key)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve SearchEngine over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=SERVICE_MAX_PENDING)
+    parser.add_argument("--timeout", type=float, default=SERVICE_TIMEOUT, help="seconds before a request gets a 504")
+    parser.add_argument("--no-prefetch", action="store_true", help="do not warm or refresh venues in the background")
+    args = parser.parse_args(argv)
+
+    engine = get_search_engine()
+    prefetcher = None if args.no_prefetch else get_prefetch_scheduler(engine)
+    service = SearchService(engine, prefetcher=prefetcher, workers=args.workers,
+                            max_pending=args.max_pending, timeout=args.timeout)
+    server = make_server(service, args.host, args.port)
+    print(f"Search service on http://{args.host}:{server.server_address[1]} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import io
+
+from corpus_cache import CorpusCache
+from search_engine import SearchEngine, RateLimiter
+
+
+def atom_feed(entries, total):
+    body = "".join(f"""
+  <entry>
+    <id>http://arxiv.org/abs/{arxiv_id}v1</id>
+    <title>{title}</title>
+    <summary>  {summary}
+    </summary>
+    <author><name>Ada Lovelace</name></author>
+    <arxiv:comment>{comment}</arxiv:comment>
+    <link href="http://arxiv.org/abs/{arxiv_id}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}v1" rel="related" type="application/pdf"/>
+  </entry>""" for arxiv_id, title, summary, comment in entries)
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom"
+      xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <opensearch:totalResults>{total}</opensearch:totalResults>{body}
+</feed>""".encode("utf-8")
+
+
+ENTRIES = [
+    (f"2301.{i:05d}", f"Paper {i} on {'diffusion' if i % 2 else 'graphs'}", f"Abstract {i}",
+     "Accepted to AAAI 2023" if i % 3 else "Accepted to IJCAI 2023")
+    for i in range(5)
+]
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+        self.raw = io.BytesIO(content)
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append(dict(params))
+        start, size = params["start"], params["max_results"]
+        return FakeResponse(atom_feed(ENTRIES[start:start + size], len(ENTRIES)))
+
+
+def make_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr("search_engine.ARXIV_PAGE_SIZE", 2)
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.session = FakeSession()
+    engine._arxiv_limiter = RateLimiter(0)
+    return engine
+
+
+def test_harvest_pages_filters_and_caches(tmp_path, monkeypatch):
+    engine = make_engine(tmp_path, monkeypatch)
+
+    results = engine.search("AAAI", "2023", "diffusion")
+    assert [p["title"] for p in results] == ["Paper 1 on diffusion"]
+    assert results[0]["abstract"] == "Abstract 1"
+    assert results[0]["pdf"] == "http://arxiv.org/pdf/2301.00001v1"
+    assert [call["start"] for call in engine.session.calls] == [0, 2, 4]
+
+    # Papers 0 and 3 are IJCAI papers and never enter the corpus
+    entry = engine.corpus_cache.load("AAAI", "2023", "Accepted")
+    assert sorted(p["title"] for p in entry["papers"]) == ["Paper 1 on diffusion", "Paper 2 on graphs", "Paper 4 on graphs"]
+
+    assert len(engine.search("AAAI", "2023", "graphs")) == 2
+    assert len(engine.session.calls) == 3
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import httpx
+
+import metrics
+from async_search_engine import AsyncSearchEngine
+from corpus_cache import CorpusCache
+from llm_cache import LLMCache
+from search_engine import SearchEngine
+from test_aaai_harvest import ENTRIES, atom_feed
+from test_cvf_listing import LISTING
+from test_rerank import FakeCompletions, papers
+
+
+class FakeOpenReviewClient:
+    notes_url = "https://openreview.test/notes"
+    headers = {}
+
+
+def make_engine(tmp_path, handler):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.llm_cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+    engine.enrich_cvf = False
+    engine._arxiv_limiter.min_interval = 0
+    engine._openreview_clients["v2"] = FakeOpenReviewClient()
+    async_engine = AsyncSearchEngine(engine=engine)
+    async_engine.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return async_engine
+
+
+def openreview_handler(calls):
+    notes = [{"id": f"n{i}", "content": {"title": {"value": f"Diffusion {i}" if i % 2 else f"Graphs {i}"}}} for i in range(2500)]
+
+    async def handler(request):
+        params = dict(request.url.params)
+        calls.append(params)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if "select" in params:
+            return httpx.Response(400)
+        offset, limit = int(params.get("offset", 0)), int(params["limit"])
+        await asyncio.sleep(0.01)
+        data = {"notes": notes[offset:offset + limit]}
+        if params.get("count"):
+            data["count"] = len(notes)
+        return httpx.Response(200, json=data)
+    return handler
+
+
+def test_openreview_venue_fetched_with_concurrent_pages(tmp_path):
+    calls = []
+    async def run():
+        async with make_engine(tmp_path, openreview_handler(calls)) as engine:
+            # Concurrent searches on one venue share a single download
+            return await engine.search_many("ICLR", "2024", ["diffusion", "graphs"])
+
+    results = asyncio.run(run())
+    assert [len(r) for r in results.values()] == [1250, 1250]
+    offsets = sorted(int(c.get("offset", 0)) for c in calls if "select" not in c)
+    assert offsets == [0, 1000, 2000]
+    # The sync engine sees the corpus cached by the async one
+    assert len(CorpusCache(str(tmp_path)).load("ICLR", "2024", "Accepted")["papers"]) == 2500
+
+
+def test_cvf_and_aaai_overlap_on_one_loop(tmp_path):
+    async def handler(request):
+        if "thecvf" in request.url.host:
+            return httpx.Response(200, content=LISTING, headers={"ETag": '"abc"'})
+        start, size = int(request.url.params["start"]), int(request.url.params["max_results"])
+        return httpx.Response(200, content=atom_feed(ENTRIES[start:start + size], len(ENTRIES)))
+
+    async def run():
+        async with make_engine(tmp_path, handler) as engine:
+            return await engine.search_federated([("CVPR", "2023"), ("AAAI", "2023"), ("ECCV", "2023")], "diffusion")
+
+    results = asyncio.run(run())
+    assert [p["title"] for p in results] == ["Efficient Diffusion Models", "Paper 1 on diffusion"]
+
+
+def test_rerank_chunks_overlap(tmp_path):
+    completions = FakeCompletions()
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    async def create(**kwargs):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+        return completions.create(**kwargs)
+
+    async def run():
+        async with make_engine(tmp_path, openreview_handler([])) as engine:
+            engine._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+                                             close=lambda: asyncio.sleep(0))
+            results = await engine.deepseek_rerank_papers("intent", papers(160), top_n=5, chunk_size=40)
+            keywords = await engine.extract_keywords_with_deepseek("intent")
+            return results, keywords
+
+    results, keywords = asyncio.run(run())
+    assert [p["title"] for p in results] == [f"Paper {i}" for i in range(159, 154, -1)]
+    assert active["max"] > 1
+    # Unparseable answers fall back to the prompt
+    assert keywords == ["intent"]
+
+
+def test_async_paths_record_metrics(tmp_path):
+    def counts():
+        return {
+            "rate_limited": metrics.UPSTREAM_REQUESTS.value(service="openreview", status="429"),
+            "corpus_hits": metrics.CACHE_REQUESTS.value(cache="corpus", result="hit"),
+            "corpus_misses": metrics.CACHE_REQUESTS.value(cache="corpus", result="miss"),
+            "score_calls": metrics.LLM_CALLS.value(purpose="score", cached="false"),
+            "rerank_tokens": metrics.LLM_TOKENS.value(purpose="rerank", direction="completion"),
+        }
+
+    completions = FakeCompletions()
+    async def create(**kwargs):
+        return completions.create(**kwargs)
+
+    async def run():
+        async with make_engine(tmp_path, openreview_handler([])) as engine:
+            engine._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+                                             close=lambda: asyncio.sleep(0))
+            await engine.search("ICLR", "2024", "diffusion")
+            await engine.search("ICLR", "2024", "graphs")
+            await engine.deepseek_rerank_papers("intent", papers(80), top_n=5, chunk_size=40)
+
+    before = counts()
+    with metrics.trace("async") as trace:
+        asyncio.run(run())
+    after = counts()
+
+    assert {name: after[name] - before[name] for name in ("rate_limited", "corpus_hits", "corpus_misses", "score_calls")} == {
+        "rate_limited": 1, "corpus_hits": 1, "corpus_misses": 1, "score_calls": 2}
+    assert after["rerank_tokens"] > before["rerank_tokens"]
+    assert {"fetch", "parse", "normalize", "match", "llm", "rerank"} <= set(trace.summary())
@@ -0,0 +1,53 @@
+import io
+import json
+
+from batch_search import BatchRunner, run_batch
+from result_cache import ResultCache
+from test_result_cache import make_engine
+
+
+def run(runner, queries, **kwargs):
+    out = io.StringIO()
+    lines = [q if isinstance(q, str) else json.dumps(q) for q in queries]
+    summary = run_batch(runner, lines, out, **kwargs)
+    return [json.loads(line) for line in out.getvalue().splitlines()], summary
+
+
+def test_batch_streams_one_line_per_query(tmp_path):
+    calls = []
+    engine = make_engine(tmp_path, calls)
+    runner = BatchRunner(engine, ResultCache(), fields=["title"])
+    queries = [{"id": f"q{i}", "conference": "ICLR", "year": 2024, "keyword": kw}
+               for i, kw in enumerate(["diffusion", "GNN", "diffusion", "nothing"] * 5)]
+
+    outputs, summary = run(runner, queries, workers=4, ordered=True)
+    assert [o["id"] for o in outputs] == [q["id"] for q in queries]
+    assert outputs[0]["results"] == [{"title": "Diffusion Models"}] and outputs[3]["count"] == 0
+    # The venue is downloaded once and repeated keywords come from the shared result cache
+    assert calls == ["ICLR"]
+    assert summary["queries"] == 20 and summary["errors"] == 0 and summary["venues"] == 1
+    assert summary["result_cache"]["hits"] >= 16
+
+
+def test_invalid_queries_reported_in_place(tmp_path):
+    engine = make_engine(tmp_path, [])
+    runner = BatchRunner(engine)
+    outputs, summary = run(runner, [
+        "not json",
+        {"conference": "ICLR", "year": 2024, "keyword": "diffusion"},
+        {"conference": "CVPR", "year": 2024, "status": "Under Review", "keyword": "x"},
+        {"conference": "ICLR", "year": 2024, "keyword": "a", "intent": "b"},
+    ], workers=2, ordered=True)
+    assert [o["line"] for o in outputs] == [1, 2, 3, 4]
+    assert "invalid JSON" in outputs[0]["error"] and "error" not in outputs[1]
+    assert "invalid status" in outputs[2]["error"] and "exactly one" in outputs[3]["error"]
+    assert summary["errors"] == 3
+
+
+def test_intent_queries_merge_keywords_without_rerank(tmp_path):
+    engine = make_engine(tmp_path, [])
+    runner = BatchRunner(engine, rerank=False)
+    outputs, _ = run(runner, [{"conference": "ICLR", "year": 2024, "intent": "generative graphs",
+                               "keywords": ["diffusion", "gnn", "models"]}], workers=1)
+    assert outputs[0]["candidates"] == 2
+    assert {p["title"] for p in outputs[0]["results"]} == {"Diffusion Models", "Graph Networks"}
@@ -0,0 +1,52 @@
+import json
+
+import search_engine
+from benchmarks.run import run_benchmarks, compare, record
+
+TINY = {"openreview": 60, "cvf": 40, "arxiv": 30}
+
+
+def test_benchmarks_run_offline_and_report_json():
+    cvf_url = search_engine.CVF_BASE_URL
+    results = run_benchmarks(quick=True, memory=True, sizes=TINY,
+                             scenarios=["cold_search/openreview", "cold_search/cvf", "cold_search/aaai",
+                                        "cold_stream/cvf", "rerank_stream"])
+    json.dumps(results)
+
+    # Every upstream was answered by the stand-in server, and the real endpoints are restored afterwards
+    assert set(results["meta"]["requests"]) == {"openreview", "cvf", "arxiv", "deepseek"}
+    assert search_engine.CVF_BASE_URL == cvf_url
+
+    scenarios = results["scenarios"]
+    assert scenarios["cold_search/openreview"]["items"] == 60
+    assert scenarios["cold_search/cvf"]["items"] == 40
+    assert scenarios["cold_search/openreview"]["results"] > 0
+    assert {"fetch", "parse", "match", "store"} <= set(scenarios["cold_search/cvf"]["stages_s"])
+    assert "match" in scenarios["cold_stream/cvf"]["stages_s"]
+    assert scenarios["cold_stream/cvf"]["first_result_s"] is not None
+    assert scenarios["rerank_stream"]["llm_fallback"] is False
+    assert scenarios["rerank_stream"]["peak_memory_mb"] > 0
+
+
+def test_compare_flags_slowdowns():
+    baseline = {"scenarios": {"warm_search": {"wall_s": 1.0, "peak_memory_mb": 10.0}}}
+    current = {"scenarios": {"warm_search": {"wall_s": 1.5, "peak_memory_mb": 10.5}, "rerank": {"wall_s": 2.0}}}
+    rows = compare(baseline, current, threshold=0.1)
+    assert [(name, metric, worse) for name, metric, _, _, _, worse in rows] == [
+        ("warm_search", "wall_s", True), ("warm_search", "peak_memory_mb", False)]
+
+
+def test_record_pages_by_the_returned_page_size(tmp_path, monkeypatch):
+    notes = [{"id": f"n{i}"} for i in range(700)]
+    offsets = []
+    def capped_page(self, client, query, offset=None, limit=1000, with_count=False):
+        # The server caps pages at 300 notes and reports no count
+        offsets.append(offset or 0)
+        return notes[offset or 0:(offset or 0) + 300], None
+    monkeypatch.setattr(search_engine.SearchEngine, "_openreview_client", lambda self, year: None)
+    monkeypatch.setattr(search_engine.SearchEngine, "_get_openreview_page", capped_page)
+
+    record(["ICLR:2024"], str(tmp_path))
+    with open(tmp_path / "openreview_ICLR_2024_accepted.json", encoding="utf-8") as f:
+        assert json.load(f) == notes
+    assert offsets == [0, 300, 600]
@@ -0,0 +1,245 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from corpus_cache import CorpusCache
+from search_engine import SearchEngine
+
+
+def make_paper(title, abstract="", keywords=None):
+    return {
+        "title": title,
+        "authors": ["A. Author"],
+        "abstract": abstract,
+        "keywords": keywords or [],
+        "link": f"https://openreview.net/forum?id={title}",
+        "pdf": None,
+        "status": "ICLR 2024 (Accepted)"
+    }
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = CorpusCache(str(tmp_path))
+    cache.save("ICLR", "2024", "Accepted", [make_paper("Diffusion")], validator="v1")
+
+    # A fresh instance must read the entry back from disk
+    entry = CorpusCache(str(tmp_path)).load("ICLR", "2024", "Accepted")
+    assert entry["papers"][0]["title"] == "Diffusion"
+    assert entry["validator"] == "v1"
+    assert cache.is_fresh(entry)
+
+    entry["fetched_at"] = time.time() - cache.ttl("2024", "Accepted") - 1
+    assert not cache.is_fresh(entry)
+
+
+def test_search_answers_from_cached_corpus(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+
+    calls = []
+    def fake_fetch(conference, year, status):
+        calls.append((conference, year, status))
+        return [make_paper("Diffusion Models"), make_paper("Graph Networks", keywords=["GNN"])], "v1"
+    engine._fetch_openreview_corpus = fake_fetch
+
+    assert len(engine.search("ICLR", "2024", "diffusion")) == 1
+    assert len(engine.search("ICLR", "2024", "gnn")) == 1
+    assert calls == [("ICLR", "2024", "Accepted")]
+
+
+def test_stale_corpus_revalidated_without_download(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    entry = engine.corpus_cache.save("ICLR", "2021", "Accepted", [make_paper("Old Paper")], validator="v1")
+    entry["fetched_at"] = 0
+
+    engine._openreview_validator = lambda *args: "v1"
+    def fail_fetch(*args):
+        raise AssertionError("corpus should not be re-downloaded")
+    engine._fetch_openreview_corpus = fail_fetch
+
+    assert len(engine.get_corpus("ICLR", "2021")) == 1
+    assert engine.corpus_cache.is_fresh(entry)
+
+
+def test_search_many_fetches_venue_once(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+
+    calls = []
+    def fake_fetch(conference, year, status):
+        calls.append(conference)
+        return [make_paper("Diffusion Models"), make_paper("Graph Networks", keywords=["GNN"])], "v1"
+    engine._fetch_openreview_corpus = fake_fetch
+
+    results = engine.search_many("ICLR", "2024", ["diffusion", "gnn", "diffusion", "missing"])
+    assert list(results) == ["diffusion", "gnn", "missing"]
+    assert [len(r) for r in results.values()] == [1, 1, 0]
+    assert calls == ["ICLR"]
+
+
+def test_iter_search_streams_pages_then_caches(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+
+    pages_served = []
+    def fake_pages(conference, year, status):
+        for page in ([make_paper("Diffusion A"), make_paper("Other")], [make_paper("Diffusion B")]):
+            pages_served.append(page)
+            yield page, "v1"
+    engine._iter_openreview_pages = fake_pages
+
+    stream = engine.iter_search("ICLR", "2024", "diffusion")
+    assert next(stream)["title"] == "Diffusion A"
+    # Only the first page has been requested when the first match arrives
+    assert len(pages_served) == 1
+    assert [p["title"] for p in stream] == ["Diffusion B"]
+
+    # The streamed download populated the corpus cache
+    assert len(engine.corpus_cache.load("ICLR", "2024", "Accepted")["papers"]) == 3
+    assert len(list(engine.iter_search("ICLR", "2024", "diffusion"))) == 2
+    assert len(pages_served) == 2
+
+
+def wait_for_waiters(engine, count, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        flights = list(engine._corpus_flights._flights.values())
+        if flights and flights[0].waiters >= count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("callers did not join the in-flight download")
+
+
+def test_concurrent_fetches_coalesced(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+
+    release = threading.Event()
+    calls = []
+    def slow_fetch(conference, year, status):
+        calls.append(conference)
+        release.wait(5)
+        return [make_paper("Diffusion Models"), make_paper("Graph Networks", keywords=["GNN"])], "v1"
+    engine._fetch_openreview_corpus = slow_fetch
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(engine.search, "ICLR", "2024", kw) for kw in ["diffusion", "gnn"] * 4]
+        wait_for_waiters(engine, 7)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert calls == ["ICLR"]
+    assert [len(r) for r in results] == [1] * 8
+    assert engine._corpus_flights.in_flight() == 0
+
+
+def test_streamed_download_shared_with_waiters(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+
+    release = threading.Event()
+    downloads = []
+    def fake_pages(conference, year, status):
+        downloads.append(conference)
+        yield [make_paper("Diffusion A"), make_paper("Other")], "v1"
+        release.wait(5)
+        yield [make_paper("Diffusion B")], "v1"
+    engine._iter_openreview_pages = fake_pages
+    engine._fetch_openreview_corpus = lambda *args: (_ for _ in ()).throw(AssertionError("second download"))
+
+    stream = engine.iter_search("ICLR", "2024", "diffusion")
+    assert next(stream)["title"] == "Diffusion A"
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        waiting = [pool.submit(lambda: list(engine.iter_search("ICLR", "2024", "other"))),
+                   pool.submit(engine.get_corpus, "ICLR", "2024")]
+        wait_for_waiters(engine, 2)
+        release.set()
+        assert [p["title"] for p in stream] == ["Diffusion B"]
+        assert [p["title"] for p in waiting[0].result()] == ["Other"]
+        assert len(waiting[1].result()) == 3
+    assert downloads == ["ICLR"]
+
+
+def test_fetch_error_shared_then_retried(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+
+    attempts = []
+    def flaky_fetch(conference, year, status):
+        attempts.append(conference)
+        if len(attempts) == 1:
+            raise ConnectionError("upstream down")
+        return [make_paper("Diffusion Models")], "v1"
+    engine._fetch_openreview_corpus = flaky_fetch
+
+    # A failed flight is not remembered: the next caller downloads again
+    assert engine.get_corpus("ICLR", "2024") == []
+    assert len(engine.get_corpus("ICLR", "2024")) == 1
+    assert attempts == ["ICLR", "ICLR"]
+
+
+def test_cold_stream_matches_like_the_index(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    corpus = [make_paper("Metalearning survey"), make_paper("Meta-learning"), make_paper("Learned optimizers")]
+    def fake_pages(conference, year, status):
+        yield corpus[:2], "v1"
+        yield corpus[2:], "v1"
+    engine._iter_openreview_pages = fake_pages
+
+    cold = [p["title"] for p in engine.iter_search("ICLR", "2024", "learning")]
+    warm = [p["title"] for p in engine.iter_search("ICLR", "2024", "learning")]
+    assert cold == warm == ["Meta-learning"]
+    assert sorted(p["title"] for p in engine.search("ICLR", "2024", "learn")) == ["Learned optimizers", "Meta-learning"]
+
+
+def test_stalled_stream_does_not_block_other_searches(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.corpus_flight_wait = 0.2
+
+    def fake_pages(conference, year, status):
+        yield [make_paper("Diffusion A")], "v1"
+        yield [make_paper("Diffusion B")], "v1"
+    engine._iter_openreview_pages = fake_pages
+    downloads = []
+    def fetch(conference, year, status):
+        downloads.append(conference)
+        time.sleep(0.3)
+        return [make_paper("Diffusion A"), make_paper("Diffusion B")], "v1"
+    engine._fetch_openreview_corpus = fetch
+
+    # The reader of the leading stream stops after its first result and never resumes
+    stalled = engine.iter_search("ICLR", "2024", "diffusion")
+    assert next(stalled)["title"] == "Diffusion A"
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        searches = [pool.submit(lambda: list(engine.iter_search("ICLR", "2024", "diffusion"))) for _ in range(2)]
+        corpora = [pool.submit(engine.get_corpus, "ICLR", "2024") for _ in range(2)]
+        assert [len(f.result()) for f in searches + corpora] == [2] * 4
+    assert time.time() - started < 2
+    # One waiter took the stalled download over; the others shared it
+    assert downloads == ["ICLR"]
+    stalled.close()
+    assert engine._corpus_flights.in_flight() == 0
+
+
+def test_slow_download_is_not_duplicated(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    # Only streamed downloads are waited on for a bounded time
+    engine.corpus_flight_wait = 0.05
+
+    calls = []
+    def slow_fetch(conference, year, status):
+        calls.append(conference)
+        time.sleep(0.5)
+        return [make_paper("Diffusion Models")], "v1"
+    engine._fetch_openreview_corpus = slow_fetch
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        corpora = list(pool.map(lambda _: engine.get_corpus("ICLR", "2024"), range(5)))
+    assert [len(papers) for papers in corpora] == [1] * 5
+    assert calls == ["ICLR"]
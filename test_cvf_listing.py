@@ -0,0 +1,175 @@
+import time
+
+from corpus_cache import CorpusCache
+from search_engine import SearchEngine
+
+LISTING = """<html><head><meta charset="utf-8"></head><body><div id="content"><dl>
+<dt class="ptitle"><br><a href="/content/CVPR2023/html/A_CVPR_2023_paper.html">Efficient Diffusion Models</a></dt>
+<dd>
+<form id="form-A" action="/CVPR2023" method="post" class="authsearch">
+<input type="hidden" name="query_author" value="Alice Zhang">
+<a href="#" onclick="document.getElementById('form-A').submit();">Alice Zhang</a>,
+</form>
+<form id="form-B" action="/CVPR2023" method="post" class="authsearch">
+<input type="hidden" name="query_author" value="Bob Li">
+<a href="#" onclick="document.getElementById('form-B').submit();">Bob Li</a>
+</form>
+</dd>
+<dd>
+[<a href="/content/CVPR2023/papers/A_CVPR_2023_paper.pdf">pdf</a>]
+[<a href="/content/CVPR2023/supplemental/A_supp.pdf">supp</a>]
+</dd>
+<dt class="ptitle"><br><a href="/content/CVPR2023/html/B_CVPR_2023_paper.html">Neural Radiance Fields</a></dt>
+<dd></dd>
+<dd>[<a href="/content/CVPR2023/papers/B_CVPR_2023_paper.pdf">pdf</a>]</dd>
+</dl></div></body></html>""".encode("utf-8")
+
+
+class FakeResponse:
+    status_code = 200
+    encoding = "utf-8"
+    headers = {"ETag": '"abc"'}
+
+    def iter_content(self, chunk_size):
+        # Tiny chunks exercise records that span several feeds
+        for i in range(0, len(LISTING), 97):
+            yield LISTING[i:i + 97]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class DetailResponse:
+    status_code = 200
+
+    def __init__(self, url):
+        self.content = f"""<html><body><div id="papertitle">x</div>
+<div id="abstract">
+Abstract of {url.rsplit('/', 1)[-1]}.
+</div></body></html>""".encode("utf-8")
+
+
+class FakeSession:
+    def __init__(self):
+        self.gets = 0
+        self.detail_gets = []
+
+    def get(self, url, **kwargs):
+        if "/html/" in url:
+            self.detail_gets.append(url)
+            return DetailResponse(url)
+        self.gets += 1
+        return FakeResponse()
+
+    def head(self, url, **kwargs):
+        return FakeResponse()
+
+
+def test_listing_parsed_once_and_cached(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.session = FakeSession()
+    engine.enrich_cvf = False
+
+    results = engine.search("CVPR", "2023", "diffusion")
+    assert results == [{
+        "title": "Efficient Diffusion Models",
+        "authors": ["Alice Zhang", "Bob Li"],
+        "abstract": "",
+        "keywords": [],
+        "link": "https://openaccess.thecvf.com/content/CVPR2023/html/A_CVPR_2023_paper.html",
+        "pdf": "https://openaccess.thecvf.com/content/CVPR2023/papers/A_CVPR_2023_paper.pdf",
+        "status": "CVPR 2023"
+    }]
+
+    entry = engine.corpus_cache.load("CVPR", "2023", "Accepted")
+    assert [p["title"] for p in entry["papers"]] == ["Efficient Diffusion Models", "Neural Radiance Fields"]
+    assert entry["validator"].endswith('#"abc"')
+
+    many = engine.search_many("CVPR", "2023", ["radiance", "diffusion"])
+    assert [len(r) for r in many.values()] == [1, 1]
+    assert engine.session.gets == 1
+
+
+def test_missing_editions_are_skipped():
+    engine = SearchEngine("sk-test")
+    engine.session = FakeSession()
+    assert engine.search("ICCV", "2024", "diffusion") == []
+    assert engine.session.gets == 0
+
+
+def test_enrichment_fills_abstracts_once(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.session = FakeSession()
+    engine.enrich_cvf = False
+    engine.search("CVPR", "2023", "diffusion")
+
+    engine.enrich_cvf_abstracts("CVPR", "2023", background=False)
+    assert len(engine.session.detail_gets) == 2
+
+    # Abstracts are persisted and now searchable
+    entry = CorpusCache(str(tmp_path)).load("CVPR", "2023", "Accepted")
+    assert entry["papers"][0]["abstract"] == "Abstract of A_CVPR_2023_paper.html."
+    assert [p["title"] for p in engine.search("CVPR", "2023", "b_cvpr_2023_paper")] == ["Neural Radiance Fields"]
+
+    engine.enrich_cvf_abstracts("CVPR", "2023", background=False)
+    assert len(engine.session.detail_gets) == 2
+
+
+class MissingPageSession(FakeSession):
+    def get(self, url, **kwargs):
+        response = super().get(url, **kwargs)
+        if url.endswith("/B_CVPR_2023_paper.html"):
+            response.status_code = 404
+        return response
+
+
+def finish_enrichment(engine):
+    for job in list(engine._enrichment_jobs.values()):
+        job.join(10)
+
+
+def test_failed_detail_pages_are_not_refetched(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.session = MissingPageSession()
+    for _ in range(4):
+        engine.search_many("CVPR", "2023", ["diffusion", "radiance"])
+        finish_enrichment(engine)
+    missing = "https://openaccess.thecvf.com/content/CVPR2023/html/B_CVPR_2023_paper.html"
+    assert engine.session.detail_gets.count(missing) == 1
+    assert len(engine.session.detail_gets) == 2
+
+    # The failure survives a restart and is retried once it is due
+    entry = CorpusCache(str(tmp_path)).load("CVPR", "2023", "Accepted")
+    assert entry["enrich_failed"][missing] == entry["enrich_retry_at"] > time.time()
+    engine.corpus_cache.load("CVPR", "2023", "Accepted")["enrich_retry_at"] = 0
+    engine.corpus_cache.load("CVPR", "2023", "Accepted")["enrich_failed"][missing] = 0
+    engine.search_many("CVPR", "2023", ["diffusion"])
+    finish_enrichment(engine)
+    assert engine.session.detail_gets.count(missing) == 2
+
+
+class DownSession:
+    def get(self, url, **kwargs):
+        raise ConnectionError("CVF is down")
+
+    head = get
+
+
+def test_stale_corpus_served_when_listing_unavailable(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.enrich_cvf = False
+    engine.session = FakeSession()
+    engine.search("CVPR", "2023", "diffusion")
+    engine.corpus_cache.load("CVPR", "2023", "Accepted")["fetched_at"] = 0
+
+    engine.session = DownSession()
+    assert [p["title"] for p in engine.search("CVPR", "2023", "diffusion")] == ["Efficient Diffusion Models"]
+    assert len(engine.search_many("CVPR", "2023", ["radiance"])["radiance"]) == 1
+    assert len(engine.corpus_cache.load("CVPR", "2023", "Accepted")["papers"]) == 2
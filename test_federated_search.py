@@ -0,0 +1,59 @@
+import time
+
+from search_engine import SearchEngine, federated_venues, merge_results
+
+
+def paper(title, link):
+    return {"title": title, "authors": [], "abstract": "", "keywords": [], "link": link, "pdf": None, "status": ""}
+
+
+def test_federated_venues_skips_missing_editions():
+    venues = federated_venues(["ECCV", "ICCV", "CVPR"], ["2023", "2024"])
+    assert venues == [("ECCV", "2024"), ("ICCV", "2023"), ("CVPR", "2023"), ("CVPR", "2024")]
+
+
+def test_merge_results_dedups_by_link_and_title():
+    merged = merge_results([
+        [paper("Diffusion Models", "a"), paper("GNNs", "b")],
+        [paper("diffusion  models", "c"), paper("GNNs v2", "b"), paper("Transformers", "d")],
+    ])
+    assert [p["link"] for p in merged] == ["a", "b", "d"]
+
+
+def test_federated_search_streams_and_times_out():
+    engine = SearchEngine("sk-test")
+
+    def fake_search(source, year, keyword, status="Accepted"):
+        if source == "CVPR":
+            time.sleep(2)
+        return [paper(f"{source} {year} {keyword}", f"{source}-{year}")]
+    engine.search = fake_search
+
+    started = time.monotonic()
+    events = list(engine.iter_search_federated(
+        [("ICLR", 2024), ("CVPR", "2023"), ("AAAI", "2024")], "diffusion", timeouts={"cvf": 0.2}))
+    assert time.monotonic() - started < 1.5
+
+    assert ("CVPR", "2023", None) in events
+    finished = {(source, year) for source, year, results in events if results}
+    assert finished == {("ICLR", "2024"), ("AAAI", "2024")}
+
+    merged = engine.search_federated([("ICLR", "2024"), ("AAAI", "2024")], "diffusion")
+    assert [p["link"] for p in merged] == ["ICLR-2024", "AAAI-2024"]
+
+
+def test_queued_venues_get_their_full_budget():
+    engine = SearchEngine("sk-test")
+    warmed = []
+
+    def fake_search(source, year, keyword, status="Accepted"):
+        time.sleep(0.6 if source == "ICLR" else 0.05)
+        warmed.append(source)
+        return [paper(f"{source} {year}", f"{source}-{year}")]
+    engine.search = fake_search
+
+    venues = [("ICLR", year) for year in ("2022", "2023", "2024", "2025")] + [("CVPR", "2023")]
+    events = list(engine.iter_search_federated(venues, "diffusion", timeouts={"cvf": 0.3}, max_workers=4))
+    # CVPR waited 0.6s for a worker but only ran 50ms of its 0.3s budget
+    assert ("CVPR", "2023", None) not in events
+    assert len([e for e in events if e[2]]) == 5 and warmed.count("CVPR") == 1
@@ -0,0 +1,74 @@
+import time
+
+from llm_cache import LLMCache
+from test_rerank import make_engine, papers
+
+
+def test_roundtrip_and_ttl(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"), ttl=60)
+    key = cache.key("deepseek-chat", [{"role": "user", "content": "hi"}])
+    assert cache.get(key) is None
+    cache.put(key, "deepseek-chat", '{"keywords": ["a"]}')
+
+    # Shared through the file with other processes/sessions
+    other = LLMCache(cache.path, ttl=60)
+    assert other.get(key) == '{"keywords": ["a"]}'
+    assert (other.hits, other.misses) == (1, 0)
+
+    other.ttl = 0
+    assert other.get(key) is None
+    assert len(other) == 0
+
+
+def test_key_depends_on_model_and_messages(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+    messages = [{"role": "user", "content": "candidates: [0] A"}]
+    assert cache.key("deepseek-chat", messages) == cache.key("deepseek-chat", list(messages))
+    assert cache.key("deepseek-chat", messages) != cache.key("deepseek-reasoner", messages)
+    assert cache.key("deepseek-chat", messages) != cache.key("deepseek-chat", [{"role": "user", "content": "candidates: [0] B"}])
+
+
+def test_least_recently_used_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"), max_entries=2)
+    for name in ("a", "b"):
+        cache.put(name, "m", name)
+        time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.put("c", "m", "c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
+
+
+def test_repeat_rerank_costs_nothing(tmp_path):
+    engine, completions = make_engine()
+    engine.llm_cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+
+    first = engine.deepseek_rerank_papers("intent", papers(100), top_n=5, chunk_size=40)
+    calls = len(completions.prompts)
+    second = engine.deepseek_rerank_papers("intent", papers(100), top_n=5, chunk_size=40)
+    assert second == first
+    assert len(completions.prompts) == calls
+
+    # A different candidate set is a different request
+    engine.deepseek_rerank_papers("intent", papers(99), top_n=5, chunk_size=40)
+    assert len(completions.prompts) > calls
+
+
+def test_streamed_rerank_is_cached(tmp_path):
+    engine, completions = make_engine()
+    engine.llm_cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+
+    streamed = list(engine.iter_rerank_papers("intent", papers(10), top_n=3))
+    calls = len(completions.prompts)
+    # The blocking and streaming paths share cache entries
+    assert engine.deepseek_rerank_papers("intent", papers(10), top_n=3) == streamed
+    assert list(engine.iter_rerank_papers("intent", papers(10), top_n=3)) == streamed
+    assert len(completions.prompts) == calls
+
+
+def test_database_created_on_first_use(tmp_path):
+    cache = LLMCache(str(tmp_path / "sub" / "llm.sqlite3"))
+    assert not (tmp_path / "sub").exists()
+    assert cache.get(cache.key("m", [])) is None
+    assert (tmp_path / "sub" / "llm.sqlite3").exists()
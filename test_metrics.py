@@ -0,0 +1,76 @@
+import socket
+import threading
+import urllib.request
+
+import metrics
+from test_rerank import make_engine, papers
+
+
+def test_prometheus_text_format():
+    registry = metrics.Registry()
+    requests = registry.register(metrics.Counter("demo_requests_total", "Requests.", ("service", "status")))
+    latency = registry.register(metrics.Histogram("demo_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0)))
+    requests.inc(service="cvf", status=200)
+    requests.inc(2, service="cvf", status=200)
+    latency.observe(0.05, stage="fetch")
+    latency.observe(0.5, stage="fetch")
+    latency.observe(5, stage="fetch")
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{service="cvf",status="200"} 3' in text
+    assert 'demo_seconds_bucket{stage="fetch",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="fetch",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="fetch",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="fetch"} 3' in text
+    assert latency.summary()[("fetch",)] == (3, 5.55)
+
+
+def test_trace_follows_work_onto_bound_threads():
+    with metrics.trace("request") as trace:
+        with metrics.stage("fetch", "cvf"):
+            pass
+        worker = threading.Thread(target=metrics.bind(lambda: metrics.observe_stage("parse", 0.25, "cvf")))
+        worker.start()
+        worker.join()
+    # Outside a trace, stages only feed the histograms
+    metrics.observe_stage("parse", 0.5, "cvf")
+
+    assert sorted(span["stage"] for span in trace.to_dict()["spans"]) == ["fetch", "parse"]
+    assert trace.summary()["parse"] == 0.25
+    assert trace.duration is not None
+
+
+def test_rerank_records_llm_calls_tokens_and_spans():
+    engine, completions = make_engine()
+    calls_before = metrics.LLM_CALLS.value(purpose="score", cached="false")
+    tokens_before = metrics.LLM_TOKENS.value(purpose="rerank", direction="prompt")
+
+    with metrics.trace("rerank") as trace:
+        engine.deepseek_rerank_papers("intent", papers(100), top_n=5, chunk_size=40)
+
+    assert metrics.LLM_CALLS.value(purpose="score", cached="false") - calls_before == 3
+    assert metrics.LLM_TOKENS.value(purpose="rerank", direction="prompt") > tokens_before
+    stages = [span["stage"] for span in trace.spans]
+    # Three concurrent scoring calls, the final round, and the rerank stage around them
+    assert stages.count("llm") == 4 and "rerank" in stages
+    assert {span["source"] for span in trace.spans if span["stage"] == "llm"} == {"score", "rerank"}
+
+
+def test_profile_capture():
+    with metrics.profile("unit") as capture:
+        sorted(range(1000), key=lambda x: -x)
+    assert "sorted" in capture.stats_text()
+    with metrics.profile("unit", enabled=False) as capture:
+        assert capture is None
+
+
+def test_metrics_endpoint():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = metrics.start_metrics_server(port, host="127.0.0.1")
+    metrics.count_cache("corpus", True)
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    body = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+    assert 'search_cache_requests_total{cache="corpus",result="hit"}' in body
@@ -0,0 +1,106 @@
+import threading
+
+from search_engine import SearchEngine
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """Serves 2500 V2 notes, rate-limits the first request and rejects projections."""
+
+    def __init__(self):
+        self.notes = [{"id": f"n{i}", "content": {"title": {"value": f"Paper {i}"}}} for i in range(2500)]
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        with self.lock:
+            self.calls.append(dict(params))
+            first_call = len(self.calls) == 1
+        if first_call:
+            return FakeResponse(429, headers={"Retry-After": "0"})
+        if "select" in params:
+            return FakeResponse(400)
+        offset = params.get("offset", 0)
+        data = {"notes": self.notes[offset:offset + params["limit"]]}
+        if params.get("count"):
+            data["count"] = len(self.notes)
+        return FakeResponse(200, data)
+
+
+class FakeClient:
+    notes_url = "https://openreview.test/notes"
+    headers = {}
+
+
+def test_pages_fetched_concurrently_in_offset_order():
+    engine = SearchEngine("sk-test")
+    engine.session = FakeSession()
+    engine._openreview_clients["v2"] = FakeClient()
+
+    papers, validator = engine._fetch_openreview_corpus("ICLR", "2024", "Accepted")
+
+    assert [p["title"] for p in papers] == [f"Paper {i}" for i in range(2500)]
+    assert papers[0]["link"] == "https://openreview.net/forum?id=n0"
+    assert validator.endswith("#2500")
+
+    offsets = sorted(call.get("offset", 0) for call in engine.session.calls if "select" not in call)
+    assert offsets == [0, 1000, 2000]
+    assert all(call["content.venueid"] == "ICLR.cc/2024/Conference" for call in engine.session.calls)
+
+
+def test_rejected_projection_is_remembered():
+    engine = SearchEngine("sk-test")
+    engine.session = FakeSession()
+    engine._openreview_clients["v2"] = FakeClient()
+
+    engine._fetch_openreview_corpus("ICLR", "2024", "Accepted")
+    rejected = [call for call in engine.session.calls if "select" in call]
+    # Only the first (rate-limited) attempt and its retry carried the projection
+    assert len(rejected) == 2
+
+
+class CappedSession(FakeSession):
+    """Serves at most 300 notes per request and, optionally, no count."""
+
+    def __init__(self, with_count):
+        super().__init__()
+        self.with_count = with_count
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        params = dict(params, limit=min(params["limit"], 300))
+        if not self.with_count:
+            params.pop("count", None)
+        with self.lock:
+            self.calls.append(dict(params))
+        offset = params.get("offset", 0)
+        data = {"notes": self.notes[offset:offset + params["limit"]]}
+        if params.get("count"):
+            data["count"] = len(self.notes)
+        return FakeResponse(200, data)
+
+
+def test_server_page_cap_and_missing_count():
+    for with_count in (True, False):
+        engine = SearchEngine("sk-test")
+        engine.session = CappedSession(with_count)
+        engine._openreview_clients["v2"] = FakeClient()
+
+        papers, validator = engine._fetch_openreview_corpus("ICLR", "2024", "Accepted")
+        assert [p["title"] for p in papers] == [f"Paper {i}" for i in range(2500)]
+        assert (validator is not None) == with_count
+        offsets = sorted(call.get("offset", 0) for call in engine.session.calls)
+        expected = list(range(0, 2500, 300)) if with_count else list(range(0, 2700, 300))
+        assert offsets == expected
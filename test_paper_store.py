@@ -0,0 +1,66 @@
+import os
+import json
+
+import pytest
+
+from corpus_cache import CorpusCache
+from paper_store import PaperStore
+
+
+def make_papers():
+    return [
+        {"title": f"Paper {i}", "authors": ["Alice Zhang", "Bob Li"][:i % 2 + 1], "abstract": f"Abstract {i}",
+         "keywords": ["diffusion"] if i % 2 else [], "link": f"https://openreview.net/forum?id=n{i}",
+         "pdf": f"https://openreview.net/pdf/n{i}.pdf" if i % 3 else None, "status": "ICLR 2024 (Accepted)"}
+        for i in range(6)
+    ]
+
+
+def test_store_behaves_like_list_of_dicts():
+    papers = make_papers()
+    store = PaperStore.from_papers(papers)
+    assert len(store) == 6
+    assert [dict(p) for p in store] == papers
+    assert store[-1] == papers[-1]
+    assert store[1:3] == papers[1:3]
+    assert store[4].get("pdf") == "https://openreview.net/pdf/n4.pdf" and store[3]["pdf"] is None
+
+    # Repeated strings are kept once
+    assert len(store.symbols) == len({None, "https://openreview.net/forum?id=", "https://openreview.net/pdf/",
+                                      "ICLR 2024 (Accepted)", "Alice Zhang", "Bob Li", "diffusion"})
+
+
+def test_records_are_views_and_copies_are_independent():
+    store = PaperStore.from_papers(make_papers())
+    record = store[2]
+    record["abstract"] = "Enriched"
+    assert store[2]["abstract"] == "Enriched"
+
+    copy = record.copy()
+    copy["recommendation_reason"] = "why"
+    copy["authors"].append("Someone")
+    assert "recommendation_reason" not in store[2]
+    assert store[2]["authors"] == ["Alice Zhang"]
+
+    with pytest.raises(TypeError):
+        record["link"] = "elsewhere"
+
+
+def test_corpus_cache_stores_columns(tmp_path):
+    cache = CorpusCache(str(tmp_path))
+    cache.save("ICLR", "2024", "Accepted", make_papers(), validator="v1")
+    with open(cache._path("ICLR_2024_accepted"), encoding="utf-8") as f:
+        assert json.load(f)["papers"]["link_ids"] == [f"n{i}" for i in range(6)]
+
+    entry = CorpusCache(str(tmp_path)).load("ICLR", "2024", "Accepted")
+    assert isinstance(entry["papers"], PaperStore)
+    assert list(entry["papers"]) == make_papers()
+
+
+def test_legacy_list_cache_still_loads(tmp_path):
+    cache = CorpusCache(str(tmp_path))
+    os.makedirs(cache.cache_dir)
+    with open(cache._path("ICLR_2023_accepted"), "w", encoding="utf-8") as f:
+        json.dump({"source": "ICLR", "year": "2023", "status": "Accepted", "fetched_at": 0,
+                   "validator": None, "papers": make_papers()}, f)
+    assert list(cache.load("ICLR", "2023", "Accepted")["papers"]) == make_papers()
@@ -0,0 +1,104 @@
+import time
+import threading
+
+from prefetch_scheduler import PrefetchScheduler, parse_venues, PRIORITY_SELECTED
+
+
+class FakeEngine:
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+
+    def get_index(self, source, year, status):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls.append(("index", source, year, status))
+        return ["paper"], None
+
+    def refresh_corpus(self, source, year, status):
+        self.calls.append(("refresh", source, year, status))
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_selected_venue_runs_first_and_duplicates_are_dropped():
+    engine = FakeEngine()
+    scheduler = PrefetchScheduler(engine, workers=1, refresh_interval=None)
+    scheduler.warm([("CVPR", "2023"), ("ICLR", "2024")])
+    assert not scheduler.request("CVPR", "2023")
+    # Venues that don't exist are never queued; CVF status is always Accepted
+    assert not scheduler.request("ECCV", "2023")
+    scheduler.request_conference("ICLR", "2025", years=[2025, 2024])
+    assert scheduler.stats()["queued"] == 3
+
+    scheduler.start()
+    wait_for(lambda: scheduler.stats()["completed"] == 3)
+    scheduler.stop()
+    assert [call[1:3] for call in engine.calls] == [("ICLR", "2025"), ("CVPR", "2023"), ("ICLR", "2024")]
+    assert set(scheduler.stats()["last_refresh"]) == {("ICLR", "2025", "Accepted"), ("CVPR", "2023", "Accepted"),
+                                                      ("ICLR", "2024", "Accepted")}
+
+
+def test_request_never_blocks_on_running_jobs():
+    gate = threading.Event()
+    scheduler = PrefetchScheduler(FakeEngine(gate), workers=1, refresh_interval=None).start()
+    scheduler.request("ICLR", "2024", priority=PRIORITY_SELECTED)
+    wait_for(lambda: scheduler.stats()["running"])
+
+    started = time.time()
+    assert not scheduler.request("ICLR", "2024")
+    assert scheduler.request("ICML", "2024")
+    assert time.time() - started < 0.5
+    assert scheduler.stats()["queued"] == 1
+
+    gate.set()
+    wait_for(lambda: scheduler.stats()["completed"] == 2)
+    scheduler.stop()
+
+
+def test_under_review_venues_are_refreshed_periodically():
+    engine = FakeEngine()
+    scheduler = PrefetchScheduler(engine, workers=1, refresh_interval=0.05).start()
+    scheduler.request("ICLR", "2026", "Under Review")
+    scheduler.request("ICLR", "2025", "Accepted")
+    wait_for(lambda: sum(call[0] == "refresh" for call in engine.calls) >= 2)
+    scheduler.stop()
+
+    refreshed = {call[1:] for call in engine.calls if call[0] == "refresh"}
+    assert refreshed == {("ICLR", "2026", "Under Review")}
+    assert scheduler.stats()["watched"] == [("ICLR", "2026", "Under Review")]
+
+
+def test_parse_venues():
+    assert parse_venues("ICLR:2024, CVPR:2023") == [("ICLR", "2024"), ("CVPR", "2023")]
+    assert parse_venues("") == []
+    assert ("ECCV", "2024") in parse_venues("all")
+
+
+def test_refresh_corpus_downloads_only_changed_venues(tmp_path):
+    from corpus_cache import CorpusCache
+    from search_engine import SearchEngine
+    from test_corpus_cache import make_paper
+
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    fetches = []
+    validator = ["v1"]
+    def fake_fetch(conference, year, status):
+        fetches.append(validator[0])
+        return [make_paper(f"Paper {validator[0]}")], validator[0]
+    engine._fetch_openreview_corpus = fake_fetch
+    engine._openreview_validator = lambda conference, year, status: validator[0]
+
+    engine.get_corpus("ICLR", "2026", "Under Review")
+    engine.refresh_corpus("ICLR", "2026", "Under Review")
+    assert fetches == ["v1"]
+
+    validator[0] = "v2"
+    papers = engine.refresh_corpus("ICLR", "2026", "Under Review")
+    assert fetches == ["v1", "v2"] and papers[0]["title"] == "Paper v2"
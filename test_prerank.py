@@ -0,0 +1,126 @@
+import numpy as np
+
+from corpus_cache import CorpusCache
+from embeddings import AnnIndex, HashingEmbedder, VectorStore
+from search_engine import SearchEngine
+
+
+def make_paper(i, title, abstract=""):
+    return {"title": title, "authors": [], "abstract": abstract, "keywords": [],
+            "link": f"https://openreview.net/forum?id=p{i}", "pdf": None, "status": "ICLR 2024 (Accepted)"}
+
+
+def make_corpus():
+    papers = [make_paper(i, f"Graph networks study {i}", "message passing on molecules") for i in range(200)]
+    papers[137] = make_paper(137, "Diffusion models for protein design", "score based diffusion generative models")
+    papers[42] = make_paper(42, "Faster diffusion sampling", "fewer steps for diffusion models")
+    return papers
+
+
+def test_hashing_embedder_is_normalized_and_stable():
+    vectors = HashingEmbedder().embed(["diffusion models", "diffusion models", ""])
+    assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1.0)
+    assert np.allclose(vectors[0], vectors[1])
+    assert not vectors[2].any()
+
+
+def test_prerank_keeps_relevant_papers(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.vector_store = VectorStore(str(tmp_path))
+    papers = make_corpus()
+
+    shortlist = engine.prerank_papers("diffusion models", papers, top_k=10)
+    assert len(shortlist) == 10
+    assert {p["link"] for p in shortlist[:2]} == {papers[137]["link"], papers[42]["link"]}
+
+
+def test_venue_vectors_computed_once(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.vector_store = VectorStore(str(tmp_path))
+    engine._fetch_openreview_corpus = lambda *args: (make_corpus(), "v1")
+
+    calls = []
+    embed = engine.embedder.embed
+    engine.embedder.embed = lambda texts: calls.append(len(texts)) or embed(texts)
+
+    candidates = engine.search("ICLR", "2024", "diffusion")
+    shortlist = engine.prerank_papers("diffusion", candidates, top_k=1, source="ICLR", year="2024")
+    assert shortlist[0]["title"] in ("Faster diffusion sampling", "Diffusion models for protein design")
+    corpus_calls = sum(calls) - 1  # minus the query embedding
+
+    # A second process reuses the saved matrix instead of re-embedding the corpus
+    fresh = VectorStore(str(tmp_path))
+    matrix, rows = fresh.get("ICLR_2024_accepted", engine.get_corpus("ICLR", "2024"), engine.embedder)
+    engine.prerank_papers("diffusion", candidates, top_k=1, source="ICLR", year="2024")
+    assert corpus_calls == 200
+    assert sum(calls) - 2 == 200
+    assert matrix.dtype == np.float16 and matrix.shape[0] == 200 and rows[candidates[0]["link"]] in (42, 137)
+
+
+def test_only_changed_papers_reembedded(tmp_path):
+    embedder = HashingEmbedder()
+    texts = []
+    embed = embedder.embed
+    embedder.embed = lambda batch: texts.extend(batch) or embed(batch)
+
+    papers = [make_paper(i, f"Paper {i}") for i in range(300)]
+    VectorStore(str(tmp_path)).get("CVPR_2023_accepted", papers, embedder)
+    assert len(texts) == 300
+
+    # Enrichment fills in a few abstracts and the listing gains a paper: only those rows are embedded,
+    # also by another process starting from the saved matrix
+    for i in (3, 150):
+        papers[i] = make_paper(i, f"Paper {i}", f"abstract {i}")
+    papers.append(make_paper(300, "Paper 300"))
+    del texts[:]
+    matrix, rows = VectorStore(str(tmp_path)).get("CVPR_2023_accepted", papers, embedder)
+    assert sorted(texts) == ["Paper 150. abstract 150", "Paper 3. abstract 3", "Paper 300. "]
+    expected = embed([f"{p['title']}. {p['abstract']}" for p in papers]).astype(np.float16)
+    assert matrix.shape == expected.shape and np.array_equal(matrix, expected)
+    assert rows[papers[300]["link"]] == 300
+
+
+def test_ann_index_matches_exhaustive_search(tmp_path):
+    rng = np.random.default_rng(1)
+    # Clustered unit vectors, like topic groups in a venue
+    centers = rng.normal(size=(40, 64))
+    matrix = centers[rng.integers(0, 40, 5000)] + 0.3 * rng.normal(size=(5000, 64))
+    matrix = (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float16)
+
+    index = AnnIndex.build(matrix)
+    assert index.centroids is not None
+    query = matrix[123].astype(np.float32)
+    exact = np.argsort(-(matrix.astype(np.float32) @ query))[:10]
+    found = [row for row, _ in index.search(query, k=10)]
+    assert found[0] == 123
+    assert len(set(found) & set(exact.tolist())) >= 8
+
+
+def test_semantic_search_over_cached_venue(tmp_path):
+    engine = SearchEngine("sk-test")
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.vector_store = VectorStore(str(tmp_path))
+    engine._fetch_openreview_corpus = lambda *args: (make_corpus(), "v1")
+
+    results = engine.semantic_search("ICLR", "2024", "generative diffusion models for proteins", top_k=5)
+    assert len(results) == 5
+    assert results[0]["title"] == "Diffusion models for protein design"
+    assert results[0]["similarity"] >= results[1]["similarity"]
+
+    # The saved index is reused by a new store
+    index = VectorStore(str(tmp_path)).index("ICLR_2024_accepted", engine.get_corpus("ICLR", "2024"), engine.embedder)
+    assert index.matrix.shape[0] == 200
+
+
+def test_embedder_loaded_on_first_use(tmp_path, monkeypatch):
+    import search_engine
+    loads = []
+    monkeypatch.setattr(search_engine, "get_embedder", lambda: loads.append(1) or HashingEmbedder())
+    engine = SearchEngine("sk-test")
+    engine.vector_store = VectorStore(str(tmp_path))
+    other = engine.with_api_key("sk-other")
+    assert loads == []
+
+    engine.prerank_papers("diffusion models", make_corpus(), top_k=5)
+    assert other.embedder is engine.embedder and loads == [1]
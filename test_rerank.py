@@ -0,0 +1,107 @@
+import json
+import re
+import threading
+from types import SimpleNamespace
+
+from search_engine import SearchEngine, iter_json_array_items
+
+
+class FakeCompletions:
+    """Prefers papers with higher numbers in their title, like a model with a clear favourite."""
+
+    def __init__(self):
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def create(self, model, messages, stream=False, **kwargs):
+        prompt = messages[-1]["content"]
+        with self.lock:
+            self.prompts.append(prompt)
+        candidates = [(int(i), int(n)) for i, n in re.findall(r"\[(\d+)\] Title: Paper (\d+)", prompt)]
+        if '"scores"' in prompt:
+            content = json.dumps({"scores": [{"id": i, "score": n / 30} for i, n in candidates]})
+        else:
+            top_n = int(re.search(r"Top (\d+)", prompt).group(1))
+            best = sorted(candidates, key=lambda c: -c[1])[:top_n]
+            content = json.dumps({"recommendations": [{"id": i, "reason": f"score {n}"} for i, n in best]})
+        if stream:
+            return self.stream(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def stream(self, content):
+        # A few characters per chunk, like a token stream
+        for i in range(0, len(content), 7):
+            with self.lock:
+                self.streamed_chunks = getattr(self, "streamed_chunks", 0) + 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[i:i + 7]))])
+
+
+def make_engine():
+    engine = SearchEngine("sk-test")
+    engine.llm_cache = None
+    completions = FakeCompletions()
+    engine.__class__ = type("FakeLLMEngine", (SearchEngine,), {
+        "client": property(lambda self: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    })
+    return engine, completions
+
+
+def papers(n):
+    return [{"title": f"Paper {i}", "abstract": "x" * 2000, "link": f"l{i}"} for i in range(n)]
+
+
+def test_small_candidate_set_uses_one_call():
+    engine, completions = make_engine()
+    results = engine.deepseek_rerank_papers("intent", papers(10), top_n=3)
+    assert [p["title"] for p in results] == ["Paper 9", "Paper 8", "Paper 7"]
+    assert results[0]["recommendation_reason"] == "score 9"
+    assert len(completions.prompts) == 1
+
+
+def test_tournament_evaluates_every_candidate():
+    engine, completions = make_engine()
+    candidates = papers(300)
+    results = engine.deepseek_rerank_papers("intent", candidates, top_n=25, chunk_size=40)
+
+    assert [p["title"] for p in results] == [f"Paper {i}" for i in range(299, 274, -1)]
+    scored = {int(n) for prompt in completions.prompts if '"scores"' in prompt
+              for n in re.findall(r"Title: Paper (\d+)", prompt)}
+    assert scored == set(range(300))
+    # 8 scoring chunks plus one final round
+    assert len(completions.prompts) == 9
+    # Inputs are never mutated
+    assert "recommendation_reason" not in candidates[299]
+
+
+def test_token_budget_bounds_prompt_size():
+    engine, completions = make_engine()
+    engine.deepseek_rerank_papers("intent", papers(40), top_n=5, token_budget=2000)
+    assert len(completions.prompts[0]) < 2000 * 4 * 1.5
+
+
+def test_json_array_items_parsed_incrementally():
+    text = '{"recommendations": [{"id": 3, "reason": "uses {braces} and \\"quotes\\""}, {"id": 1, "reason": "]"}], "x": 1}'
+    pieces = (text[i:i + 5] for i in range(0, len(text), 5))
+    items = list(iter_json_array_items(pieces, "recommendations"))
+    assert items == [{"id": 3, "reason": 'uses {braces} and "quotes"'}, {"id": 1, "reason": "]"}]
+
+
+def test_streaming_rerank_yields_before_stream_ends():
+    engine, completions = make_engine()
+    stream = engine.iter_rerank_papers("intent", papers(10), top_n=3)
+    first = next(stream)
+    assert first["title"] == "Paper 9" and first["recommendation_reason"] == "score 9"
+    chunks_at_first = completions.streamed_chunks
+
+    rest = list(stream)
+    assert [p["title"] for p in rest] == ["Paper 8", "Paper 7"]
+    assert chunks_at_first < completions.streamed_chunks
+    assert [p["title"] for p in [first] + rest] == [p["title"] for p in engine.deepseek_rerank_papers("intent", papers(10), top_n=3)]
+
+
+def test_streaming_rerank_falls_back_to_original_order():
+    engine, completions = make_engine()
+    def broken(*args, **kwargs):
+        raise RuntimeError("stream interrupted")
+    completions.create = broken
+    assert [p["title"] for p in engine.iter_rerank_papers("intent", papers(10), top_n=3)] == ["Paper 0", "Paper 1", "Paper 2"]
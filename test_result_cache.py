@@ -0,0 +1,69 @@
+from corpus_cache import CorpusCache
+from embeddings import VectorStore
+from llm_cache import LLMCache
+from result_cache import ResultCache
+from search_engine import SearchEngine
+from test_corpus_cache import make_paper
+
+
+def make_engine(tmp_path, calls):
+    engine = SearchEngine("sk-test")
+    # Keep every cache the engine may write under tmp_path
+    engine.corpus_cache = CorpusCache(str(tmp_path))
+    engine.vector_store = VectorStore(str(tmp_path))
+    engine.llm_cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+
+    def fake_fetch(conference, year, status):
+        calls.append(conference)
+        return [make_paper("Diffusion Models"), make_paper("Graph Networks", keywords=["GNN"])], "v1"
+    engine._fetch_openreview_corpus = fake_fetch
+    return engine
+
+
+def test_keywords_shared_and_normalized(tmp_path):
+    calls = []
+    engine = make_engine(tmp_path, calls)
+    cache = ResultCache()
+
+    results, hits = cache.search_many(engine, "ICLR", "2024", ["diffusion", "gnn"])
+    assert hits == 0 and [len(r) for r in results.values()] == [1, 1]
+
+    # Another session, differently spelled keyword: answered without searching
+    engine.search_many = lambda *args: (_ for _ in ()).throw(AssertionError("should be cached"))
+    results, hits = cache.search_many(engine, "ICLR", "2024", ["  Diffusion "])
+    assert hits == 1 and results["  Diffusion "][0]["title"] == "Diffusion Models"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+    assert calls == ["ICLR"]
+
+
+def test_changed_corpus_invalidates_results(tmp_path):
+    engine = make_engine(tmp_path, [])
+    cache = ResultCache()
+    cache.search(engine, "ICLR", "2024", "diffusion")
+    version = engine.corpus_version("ICLR", "2024")
+    assert cache.get("ICLR", "2024", "Accepted", "diffusion", version) is not None
+
+    # In-place updates (e.g. enriched abstracts) bump the corpus version
+    entry = engine.corpus_cache.load("ICLR", "2024", "Accepted")
+    entry["updated_at"] = 0
+    engine.corpus_cache.persist(entry)
+    assert engine.corpus_version("ICLR", "2024") != version
+    assert cache.get("ICLR", "2024", "Accepted", "diffusion", engine.corpus_version("ICLR", "2024")) is None
+
+
+def test_least_recently_used_rows_evicted():
+    cache = ResultCache(max_rows=5)
+    cache.put("ICLR", "2024", "Accepted", "a", "v", [{}] * 2)
+    cache.put("ICLR", "2024", "Accepted", "b", "v", [{}] * 2)
+    cache.get("ICLR", "2024", "Accepted", "a", "v")
+    cache.put("ICLR", "2024", "Accepted", "c", "v", [{}] * 2)
+    assert cache.get("ICLR", "2024", "Accepted", "b", "v") is None
+    assert cache.get("ICLR", "2024", "Accepted", "a", "v") is not None
+    assert cache.stats()["rows"] == 4 and cache.stats()["evictions"] == 1
+
+
+def test_disk_results_survive_restart(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    ResultCache(path=path).put("CVPR", "2023", "Accepted", "nerf", "v1", [make_paper("NeRF")])
+    assert ResultCache(path=path).get("CVPR", "2023", "Accepted", "NeRF", "v1")[0]["title"] == "NeRF"
+    assert ResultCache(path=path).get("CVPR", "2023", "Accepted", "nerf", "v2") is None
@@ -0,0 +1,42 @@
+from search_index import InvertedIndex, tokenize
+
+
+PAPERS = [
+    {"title": "Denoising Diffusion Models for Video", "abstract": "We study video generation.", "keywords": ["diffusion"]},
+    {"title": "Graph Neural Networks at Scale", "abstract": "Message passing with diffusion of features.", "keywords": ["GNN"]},
+    {"title": "Score-Based Generative Modeling", "abstract": "", "keywords": ["generative models", "SDE"]},
+    {"title": "Vision Transformers", "abstract": "A model. Diffusion appears once.", "keywords": []},
+]
+
+
+def test_tokenize():
+    assert tokenize("Score-Based  Models!") == ["score", "based", "models"]
+    assert tokenize("") == []
+
+
+def test_term_and_prefix_queries():
+    index = InvertedIndex(PAPERS)
+    assert index.term("Diffusion") == {0, 1, 3}
+    assert index.prefix("transform") == {3}
+    assert index.prefix("zzz") == set()
+
+
+def test_phrase_does_not_cross_fields():
+    index = InvertedIndex(PAPERS)
+    assert index.phrase("diffusion models") == {0}
+    assert index.phrase("score based") == {2}
+    # "modeling" ends the title and "generative" starts the keywords; they must not join
+    assert index.phrase("modeling generative") == set()
+
+
+def test_search_prefix_last_and_bm25_order():
+    index = InvertedIndex(PAPERS)
+    assert [doc_id for doc_id, _ in index.search("diffusion model")] == [0]
+    assert {doc_id for doc_id, _ in index.search("generative model")} == {2}
+
+    ranked = index.search("diffusion")
+    # Paper 0 mentions diffusion in title and keywords, so it ranks first
+    assert ranked[0][0] == 0
+    assert {doc_id for doc_id, _ in ranked} == {0, 1, 3}
+    assert index.search("unknown words") == []
+    assert index.search("!!") == []
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from result_cache import ResultCache
+from search_service import SearchService, RemoteSearchEngine, RemoteSearchError, make_server
+from test_rerank import make_engine as make_llm_engine, papers
+from test_result_cache import make_engine
+
+
+def serve(engine, **kwargs):
+    service = SearchService(engine, result_cache=ResultCache(), **kwargs)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = RemoteSearchEngine(f"http://127.0.0.1:{server.server_address[1]}", timeout=10)
+    return service, server, client
+
+
+def stop(service, server):
+    server.shutdown()
+    server.server_close()
+    service.shutdown()
+
+
+def test_search_shared_through_service(tmp_path):
+    calls = []
+    engine = make_engine(tmp_path, calls)
+    # Warm, as the service's prefetcher would (cold iter_search streams from OpenReview itself)
+    engine.get_index("ICLR", "2024")
+    service, server, client = serve(engine)
+    try:
+        assert [p["title"] for p in client.iter_search("ICLR", "2024", "diffusion")] == ["Diffusion Models"]
+        assert client.corpus_version("ICLR", "2024") is not None
+        # A second client (another UI instance) is answered from the service's caches
+        other = RemoteSearchEngine(client.base_url)
+        assert other.search("ICLR", 2024, "diffusion")[0]["title"] == "Diffusion Models"
+        assert other.search_many("ICLR", "2024", ["gnn", "nothing"]) == {
+            "gnn": [client.search("ICLR", "2024", "gnn")[0]], "nothing": []}
+        assert calls == ["ICLR"]
+        assert service.result_cache.stats()["hits"] >= 2
+    finally:
+        stop(service, server)
+
+
+def test_errors_timeouts_and_overload(tmp_path):
+    engine = make_engine(tmp_path, [])
+    release = threading.Event()
+    engine.semantic_search = lambda *args, **kwargs: release.wait(5) and []
+    service, server, client = serve(engine, workers=1, max_pending=1, timeout=0.5)
+    try:
+        with pytest.raises(RemoteSearchError, match="400"):
+            client._call("semantic", {"source": "ICLR"})
+        with pytest.raises(RemoteSearchError, match="404"):
+            client._call("nothing", {})
+        # The only worker is stuck past the deadline: 504, then 503 while it still runs
+        with pytest.raises(RemoteSearchError, match="504"):
+            client.semantic_search("ICLR", "2024", "query")
+        with pytest.raises(RemoteSearchError, match="503"):
+            client.semantic_search("ICLR", "2024", "query")
+        release.set()
+        time.sleep(0.1)
+        assert client.semantic_search("ICLR", "2024", "query") == []
+    finally:
+        release.set()
+        stop(service, server)
+
+
+def test_rerank_streams_with_caller_key():
+    engine, completions = make_llm_engine()
+    service, server, client = serve(engine)
+    try:
+        results = list(client.with_api_key("sk-user").iter_rerank_papers("intent", papers(10), top_n=3))
+        assert [p["title"] for p in results] == ["Paper 9", "Paper 8", "Paper 7"]
+        assert results[0]["recommendation_reason"] == "score 9"
+        assert len(completions.prompts) == 1
+    finally:
+        stop(service, server)